@@ -0,0 +1,122 @@
+"""Compare sanitize_llm_output against the previous quadratic implementation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_json_sanitizer
+"""
+
+import json
+import re
+import time
+
+from src.core.base_agent import sanitize_llm_output
+
+SIZES_KB = (12, 25, 50, 100, 200)
+
+
+def legacy_sanitize_llm_output(text: str) -> str:
+    cleaned = re.sub(r"```json\s*", "", text, flags=re.IGNORECASE)
+    cleaned = cleaned.replace("```", "").strip()
+    previous = None
+    while cleaned != previous:
+        previous = cleaned
+        cleaned = re.sub(r",\s*([}\]])", r"\1", cleaned)
+
+    decoder = json.JSONDecoder()
+    for index, char in enumerate(cleaned):
+        if char not in "{[":
+            continue
+        candidate = cleaned[index:]
+        try:
+            _, end = decoder.raw_decode(candidate)
+        except json.JSONDecodeError:
+            continue
+        return candidate[:end].strip()
+    return cleaned.strip()
+
+
+def build_developer_output(size_kb: int) -> str:
+    """Prose with stray braces followed by a fenced multi-file JSON payload."""
+    target = size_kb * 1024
+    prose_unit = "Each {section} maps to a {component}, see the notes { below.\n"
+    prose = prose_unit * (target // 2 // len(prose_unit))
+    css_rule = ".card { padding: 8px; margin: 0 auto; },\n"
+    files = {
+        "index.html": "<main><h1>Site</h1></main>",
+        "css/styles.css": css_rule * (target // 2 // len(css_rule)),
+        "js/main.js": "document.addEventListener('DOMContentLoaded', () => {});",
+    }
+    return f"{prose}\n```json\n{json.dumps({'files': files}, indent=2)}\n```\nThanks!"
+
+
+def build_truncated_draft_output(size_kb: int) -> str:
+    """A deeply nested draft cut off mid-way, followed by the final JSON answer."""
+    depth = min(400, size_kb * 8)
+    filler = "x" * max(1, size_kb * 1024 // depth - 24)
+    draft = "Draft: " + f'{{"note": "{filler}", "children": [' * depth + '"cut off'
+    answer = json.dumps({"files": {"index.html": "<main></main>", "css/styles.css": "body {}", "js/main.js": ""}})
+    return f"{draft}\n\nFinal answer:\n```json\n{answer}\n```"
+
+
+def _final_answer() -> str:
+    answer = json.dumps({"files": {"index.html": "<main></main>", "css/styles.css": "body {}", "js/main.js": ""}})
+    return f"\n\nFinal answer:\n```json\n{answer}\n```"
+
+
+def build_unbalanced_placeholder_output(size_kb: int) -> str:
+    """Template placeholders with an unclosed brace early on, so the rest of the prose sits in one open group."""
+    unit = "Fill {x} in. "
+    return "Note { " + unit * (size_kb * 1024 // len(unit)) + _final_answer()
+
+
+def build_unclosed_quote_output(size_kb: int) -> str:
+    """A stray quote that shifts every string boundary after it, with brackets in the prose."""
+    unit = 'See "{a}" and [b], '
+    return 'He said "hi {open ' + unit * (size_kb * 1024 // len(unit)) + _final_answer()
+
+
+def build_wide_invalid_group_output(size_kb: int) -> str:
+    """One invalid top-level group holding many small invalid groups."""
+    unit = "{bad: [x]} "
+    return "{" + unit * (size_kb * 1024 // len(unit)) + "}" + _final_answer()
+
+
+def build_nested_invalid_group_output(size_kb: int) -> str:
+    """Deeply nested invalid groups that all close."""
+    depth = size_kb * 1024 // 16
+    return "{bad " * depth + "x" + "}" * depth + _final_answer()
+
+
+SCENARIOS = {
+    "stray braces in prose": build_developer_output,
+    "truncated nested draft": build_truncated_draft_output,
+    "unbalanced placeholders": build_unbalanced_placeholder_output,
+    "unclosed quote": build_unclosed_quote_output,
+    "wide invalid group": build_wide_invalid_group_output,
+    "nested invalid groups": build_nested_invalid_group_output,
+}
+
+
+def _best_of(func, text: str, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    for scenario, build_text in SCENARIOS.items():
+        print(f"\n{scenario}")
+        print(f"{'size':>8} {'legacy (s)':>12} {'scanner (s)':>12} {'speedup':>9}")
+        for size_kb in SIZES_KB:
+            text = build_text(size_kb)
+            assert json.loads(sanitize_llm_output(text)) == json.loads(legacy_sanitize_llm_output(text))
+            legacy = _best_of(legacy_sanitize_llm_output, text)
+            scanner = _best_of(sanitize_llm_output, text)
+            print(f"{size_kb:>6}KB {legacy:>12.4f} {scanner:>12.4f} {legacy / scanner:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
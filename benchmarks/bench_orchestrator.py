@@ -0,0 +1,264 @@
+"""Drive Orchestrator.run end to end on MockLLM and fake services.
+
+Each scenario builds a synthetic site with the given number of pages, so the
+non-LLM work (validation, deterministic QA, persistence) scales with the
+generated_files payload. Reports wall and CPU time, peak traced memory,
+throughput and the CPU time of the heaviest stages.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_orchestrator
+    python -m benchmarks.bench_orchestrator --pages 1 50 --latency-ms 20
+    python -m benchmarks.bench_orchestrator --transcript runs/bakery.jsonl.gz
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from typing import Callable
+
+from src.core.base_agent import sanitize_llm_output
+from src.core.llm import LLMProtocol
+from src.core.llm_transcript import ReplayLLM
+from src.core.llm_transcript import load_transcript
+from src.core.metrics import MetricsRecorder
+from src.core.mock_llm import MockLLM
+from src.core.orchestration.orchestrator import Orchestrator
+from src.core.orchestration.workspace import RunWorkspace
+from tests.conftest import FakeImageGenerator
+from tests.conftest import FakeWebSearchService
+
+PAGE_COUNTS = (1, 10, 50, 200)
+SECTIONS_PER_PAGE = 4
+TOP_STAGES = 4
+
+
+def build_site_structure(page_count: int) -> dict[str, object]:
+    pages = []
+    for page_number in range(1, page_count + 1):
+        sections = [
+            {
+                "heading": f"Topic {page_number}.{section_number} overview",
+                "text": (
+                    f"Section {section_number} of page {page_number} explains how the service works "
+                    "for new visitors, which options are available and what each one costs. " * 3
+                ).strip(),
+                "supporting_points": [
+                    f"Point {point} for page {page_number} section {section_number} is backed by data."
+                    for point in range(1, 4)
+                ],
+            }
+            for section_number in range(1, SECTIONS_PER_PAGE + 1)
+        ]
+        pages.append(
+            {
+                "slug": "/" if page_number == 1 else f"page-{page_number}",
+                "title": f"Synthetic Page {page_number}",
+                "page_goal": f"Explain topic {page_number} to first-time visitors.",
+                "sections": sections,
+            }
+        )
+    return {"site_structure": {"pages": pages}}
+
+
+def build_generated_files(site_structure: dict[str, object]) -> dict[str, object]:
+    files: dict[str, str] = {}
+    for page in site_structure["site_structure"]["pages"]:
+        sections = "".join(
+            f"<section><h2>{section['heading']}</h2><p>{section['text']}</p>"
+            f"<ul>{''.join(f'<li>{point}</li>' for point in section['supporting_points'])}</ul></section>"
+            for section in page["sections"]
+        )
+        path = "index.html" if page["slug"] == "/" else f"{page['slug']}.html"
+        files[path] = (
+            "<!DOCTYPE html><html lang='en'><head><meta charset='UTF-8'>"
+            f"<title>{page['title']}</title><link rel='stylesheet' href='css/styles.css'></head>"
+            f"<body><header><h1>{page['title']}</h1></header><main>{sections}"
+            "<img src='assets/images/hero.png' alt='Hero illustration'></main>"
+            "<script src='js/main.js'></script></body></html>"
+        )
+    files["css/styles.css"] = "".join(
+        f".page-{index} .card {{ padding: 8px; margin: 0 auto; }}\n" for index in range(len(files) * 20)
+    )
+    files["js/main.js"] = "document.addEventListener('DOMContentLoaded', () => {});"
+    return {"files": files}
+
+
+def build_pipeline_responses(page_count: int) -> dict[str, list[str]]:
+    site_structure = build_site_structure(page_count)
+    research_output = {
+        "strategic_insights": {
+            "competitor_patterns": [{"platform": "Example", "key_features": "Clear pricing pages."}],
+            "seo_keywords": ["synthetic benchmark"],
+            "messaging_patterns": ["Plain-language explanations with one call to action."],
+        },
+        "knowledge_base": {
+            "topics": [
+                {
+                    "topic": f"Topic {index}",
+                    "summary": f"Summary of topic {index}.",
+                    "key_points": [f"Key point about topic {index}."],
+                    "facts": [f"Fact about topic {index}."],
+                    "sources": ["https://example.com"],
+                }
+                for index in range(1, min(page_count, 20) + 1)
+            ]
+        },
+    }
+    architecture_spec = {
+        "architecture_spec": {
+            "project_structure": ["index.html", "css/styles.css", "js/main.js", "assets/images/"],
+            "components": [{"name": "Header", "directory": "src/components/Header", "files": ["Header.html"]}],
+            "css_strategy": "Single stylesheet.",
+            "javascript_strategy": "Single main.js file.",
+            "asset_structure": [{"type": "Images", "directory": "assets/images/", "files": ["hero.png"]}],
+        }
+    }
+    design_spec = {
+        "design_system": {
+            "color_palette": dict.fromkeys(
+                ("primary", "secondary", "accent", "background", "surface", "text_primary", "text_secondary"),
+                "#0f172a",
+            ),
+            "typography": {
+                "heading_font": "Roboto Slab",
+                "body_font": "Open Sans",
+                "scale": {"h1": "48px", "h2": "36px", "h3": "28px", "body": "18px"},
+            },
+            "spacing_system": {"base_unit": "8px", "section_padding": "64px", "container_width": "1200px"},
+            "layout_rules": {"grid": "12-column", "max_width": "1200px", "responsive_breakpoints": ["768px"]},
+            "components": dict.fromkeys(
+                ("navbar", "hero_section", "feature_cards", "cta_section", "footer"), "Standard component."
+            ),
+        },
+        "images": [
+            {"filename": f"{name}.png", "prompt": f"Illustration for the {name} section", "alt": f"{name} image"}
+            for name in ("hero", "features", "contact")
+        ],
+    }
+    development_tasks = {
+        "tasks": [
+            {"id": f"task-{index}", "description": f"Build page {index}.", "files_involved": [f"page-{index}.html"]}
+            for index in range(1, page_count + 1)
+        ]
+    }
+    return {
+        "product_manager": ["REQUIREMENTS_READY\n\nSynthetic requirements for the benchmark site."],
+        "researcher.extract_scope": [json.dumps({"primary_topic": "synthetic benchmark"})],
+        "researcher.strategic_queries": ["synthetic strategic query"],
+        "researcher.knowledge_queries": ["synthetic knowledge query"],
+        "researcher": [json.dumps(research_output)],
+        "content_designer": [json.dumps(site_structure)],
+        "architect": [json.dumps(architecture_spec)],
+        "designer": [json.dumps(design_spec)],
+        "planner": [json.dumps(development_tasks)],
+        "developer": [json.dumps(build_generated_files(site_structure))],
+        "qa": ["- Structure matches the site_structure.\nAPPROVED"],
+        "devops": ["1. Build the container.\n2. Run the container."],
+    }
+
+
+def run_pipeline(llm_factory: Callable[[], LLMProtocol], metrics: MetricsRecorder) -> str:
+    with tempfile.TemporaryDirectory() as output_dir:
+        orchestrator = Orchestrator(
+            llm=llm_factory(),
+            workspace=RunWorkspace(output_dir),
+            metrics=metrics,
+            interactive=False,
+            web_search_service=FakeWebSearchService(),
+            image_generator=FakeImageGenerator(),
+        )
+        return orchestrator.run("Build a synthetic benchmark website")
+
+
+def run_scenario(pages: int, payload_bytes: int, llm_factory: Callable[[], LLMProtocol]) -> dict[str, object]:
+    """Time one run, then repeat it under tracemalloc, whose overhead would skew the timings."""
+    metrics = MetricsRecorder()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    result = run_pipeline(llm_factory, metrics)
+    wall_seconds = time.perf_counter() - started
+    cpu_seconds = time.process_time() - cpu_started
+    if result.startswith("ERROR"):
+        raise RuntimeError(f"Benchmark run for {pages} page(s) failed: {result}")
+
+    tracemalloc.start()
+    run_pipeline(llm_factory, MetricsRecorder())
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "pages": pages,
+        "payload_bytes": payload_bytes,
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "peak_bytes": peak_bytes,
+        "stage_cpu_seconds": metrics.snapshot()["stage_cpu_seconds"],
+    }
+
+
+def synthetic_scenario(page_count: int, latency_seconds: float) -> dict[str, object]:
+    responses = build_pipeline_responses(page_count)
+    return run_scenario(
+        page_count,
+        len(responses["developer"][0].encode("utf-8")),
+        partial(MockLLM, responses, latency_seconds=latency_seconds),
+    )
+
+
+def transcript_scenario(path: str, replay_latency: bool) -> dict[str, object]:
+    """Replay a transcript recorded with `python main.py --record ...` (real-world payload sizes)."""
+    records = load_transcript(path)
+    developer_response = next((record["response"] for record in records if record["agent_name"] == "developer"), "")
+    site_structure = next(
+        (record["response"] for record in records if record["agent_name"] == "content_designer"), "{}"
+    )
+    try:
+        pages = len(json.loads(sanitize_llm_output(site_structure))["site_structure"]["pages"])
+    except (json.JSONDecodeError, KeyError, TypeError):
+        pages = 0
+    return run_scenario(
+        pages,
+        len(developer_response.encode("utf-8")),
+        partial(ReplayLLM, path, replay_latency=replay_latency),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=list(PAGE_COUNTS))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected MockLLM latency per call.")
+    parser.add_argument("--transcript", help="Replay a recorded LLM transcript instead of synthetic sites.")
+    parser.add_argument("--replay-latency", action="store_true", help="Sleep for each recorded call latency.")
+    args = parser.parse_args()
+
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.transcript:
+            results.append(transcript_scenario(args.transcript, args.replay_latency))
+        else:
+            results.extend(synthetic_scenario(page_count, args.latency_ms / 1000) for page_count in args.pages)
+
+    print(f"{'pages':>6} {'payload':>10} {'wall (s)':>9} {'cpu (s)':>8} {'peak MB':>8} {'pages/s':>8} {'MB/s':>7}")
+    for result in results:
+        payload_mb = result["payload_bytes"] / 1_000_000
+        print(
+            f"{result['pages']:>6} {payload_mb:>8.2f}MB {result['wall_seconds']:>9.3f} {result['cpu_seconds']:>8.3f} "
+            f"{result['peak_bytes'] / 1_000_000:>8.1f} {result['pages'] / result['wall_seconds']:>8.1f} "
+            f"{payload_mb / result['wall_seconds']:>7.2f}"
+        )
+
+    for result in results:
+        stages = sorted(result["stage_cpu_seconds"].items(), key=lambda item: item[1], reverse=True)[:TOP_STAGES]
+        print(f"\n{result['pages']} page(s), stage CPU time:")
+        for stage, seconds in stages:
+            print(f"  {stage:<24} {seconds:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,66 @@
+import argparse
+import time
+from functools import partial
+
+from src.core.llm import LLM
+from src.core.llm_router import RoutingLLM
+from src.core.llm_transcript import RecordingLLM
+from src.core.llm_transcript import ReplayLLM
 from src.core.orchestration import Orchestrator
+from src.core.orchestration.batch import default_orchestrator_factory
+from src.core.orchestration.batch import load_batch_requirements
+from src.core.orchestration.batch import run_batch
+from src.core.orchestration.batch import write_batch_report
+from src.core.rate_limiter import configure_rate_limiter
+from src.core.web_search import WebSearchService
+from src.core.web_search_cache import CachingWebSearchService
 
 
 def main() -> None:
-    orchestrator = Orchestrator()
+    parser = argparse.ArgumentParser(description="Generate websites with the agent pipeline.")
+    parser.add_argument("--batch", help="JSONL file with one {\"id\", \"requirement\"} object per line.")
+    parser.add_argument("--workers", type=int, default=4, help="Sites built concurrently in batch mode.")
+    parser.add_argument("--output-dir", default="batch_runs", help="Directory for per-site output in batch mode.")
+    parser.add_argument("--record", help="Append every LLM call to this JSONL transcript (.gz to compress).")
+    parser.add_argument(
+        "--replay",
+        help=(
+            "Serve LLM responses from a transcript written by --record. Web search and image generation "
+            "still call OpenAI (use --search-cache to reuse searches)."
+        ),
+    )
+    parser.add_argument("--rpm", type=float, help="OpenAI requests-per-minute budget to stay under.")
+    parser.add_argument("--tpm", type=float, help="OpenAI tokens-per-minute budget to stay under.")
+    parser.add_argument("--search-cache", help="SQLite file that caches web search results across runs.")
+    parser.add_argument("--route-models", action="store_true", help="Run helper calls on a smaller, faster model.")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch_mode(
+            args.batch,
+            args.workers,
+            args.output_dir,
+            args.rpm,
+            args.tpm,
+            args.search_cache,
+            args.route_models,
+        )
+        return
+
+    if args.rpm or args.tpm:
+        configure_rate_limiter(args.rpm, args.tpm)
+
+    web_search_service = None
+    if args.search_cache:
+        web_search_service = CachingWebSearchService(WebSearchService(), cache_path=args.search_cache)
+
+    if args.replay:
+        llm = ReplayLLM(args.replay)
+    else:
+        llm = RoutingLLM() if args.route_models else LLM()
+        if args.record:
+            llm = RecordingLLM(llm, args.record)
+    orchestrator = Orchestrator(llm=llm, web_search_service=web_search_service)
     user_input = input("Enter your website requirement: ").strip()
     result = orchestrator.run(user_input)
     print("\n" + "=" * 50)
@@ -11,5 +69,34 @@ def main() -> None:
     print(result)
 
 
+def run_batch_mode(
+    batch_path: str,
+    workers: int,
+    output_dir: str,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    search_cache_path: str | None = None,
+    route_models: bool = False,
+) -> None:
+    sites = load_batch_requirements(batch_path)
+    started = time.perf_counter()
+    results = run_batch(
+        sites,
+        output_dir=output_dir,
+        max_workers=workers,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        orchestrator_factory=partial(default_orchestrator_factory, search_cache_path, route_models),
+    )
+    report = write_batch_report(results, f"{output_dir}/report.json", wall_time_seconds=time.perf_counter() - started)
+    summary = report["summary"]
+    print("\n" + "=" * 50)
+    print("BATCH RESULT")
+    print("=" * 50)
+    print(f"Sites: {summary['sites']} (succeeded: {summary['succeeded']}, failed: {summary['failed']})")
+    print(f"Wall time: {summary['wall_time_seconds']}s, token usage: {summary['token_usage']}")
+    print(f"Report: {output_dir}/report.json")
+
+
 if __name__ == "__main__":
     main()
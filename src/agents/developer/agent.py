@@ -1,75 +1,141 @@
+from typing import Callable
+
 from src.core.base_agent import BaseAgent
+from src.core.json_stream import StreamingFilesParser
 from src.core.llm import LLMProtocol
+from src.core.schemas import GENERATED_FILES_PATCH_SCHEMA
 from src.core.schemas import GENERATED_FILES_SCHEMA
 
+_DEVELOPER_ROLE = (
+    "You are a senior front-end developer specialized in building "
+    "static websites using HTML, CSS and JavaScript. You write clean, "
+    "responsive, accessible and well-structured code.\n\n"
+    "You will receive an architecture_spec, a design_system payload, "
+    "a site_structure payload, and development_tasks.\n"
+    "Generate a professional multi-file website project.\n\n"
+    "Your role is to render the provided website content into code.\n"
+    "Do not write new website copy.\n"
+    "Do not invent additional textual content beyond what is provided "
+    "in site_structure.\n"
+    "Use site_structure headings, text, and supporting_points as the "
+    "source of truth for page content.\n"
+    "Strictly implement the provided design_system.\n"
+    "Follow the architecture_spec for project structure, component "
+    "organization, naming conventions, CSS architecture, and "
+    "JavaScript organization.\n"
+    "Use development_tasks as the implementation checklist.\n"
+    "Do not invent additional colors.\n"
+    "Do not invent additional fonts.\n"
+    "Use CSS variables for the color system.\n"
+    "Implement a 12-column responsive grid.\n"
+    "Implement consistent spacing based on base_unit.\n"
+    "Use flexbox or grid layout.\n"
+    "Implement hover states for buttons and links.\n"
+    "Implement a responsive navbar.\n"
+    "Implement proper section spacing.\n"
+    "Follow BEM or clear CSS class naming.\n"
+    "Ensure a mobile-first CSS approach.\n\n"
+    "The design specification includes image filenames.\n"
+    "Use those filenames exactly in HTML.\n"
+    "Do not invent image paths.\n"
+    "Assume images exist in assets/images/.\n\n"
+)
+
+_FULL_OUTPUT_FORMAT = (
+    "Return JSON only.\n"
+    "No markdown.\n"
+    "No explanations.\n"
+    "Output format must be exactly:\n"
+    "{\n"
+    "  \"files\": {\n"
+    "    \"index.html\": \"...\",\n"
+    "    \"css/styles.css\": \"...\",\n"
+    "    \"js/main.js\": \"...\"\n"
+    "  }\n"
+    "}\n\n"
+)
+
+# Replaces _FULL_OUTPUT_FORMAT for revisions, so the reviser is never told to
+# return the full file set.
+_PATCH_OUTPUT_FORMAT = (
+    "You will also receive the current generated_files and qa_feedback.\n"
+    "Return only the files you change or add, each with its complete updated contents.\n"
+    "Do not repeat files that stay the same.\n"
+    "List paths of files to remove in deleted_files.\n\n"
+    "Return JSON only.\n"
+    "No markdown.\n"
+    "No explanations.\n"
+    "Output format must be exactly:\n"
+    "{\n"
+    "  \"files\": {\n"
+    "    \"<changed-path>\": \"...\"\n"
+    "  },\n"
+    "  \"deleted_files\": []\n"
+    "}\n\n"
+)
+
+_DEVELOPER_RULES = (
+    "Rules:\n"
+    "- Build the website files.\n"
+    "- Render the content from site_structure.\n"
+    "- Respect architecture_spec and design_system.\n"
+    "- Do not invent additional content.\n"
+    "- index.html must link to css/styles.css.\n"
+    "- index.html must link to js/main.js.\n"
+    "- No inline styles.\n"
+    "- No inline JavaScript.\n"
+    "- Use semantic HTML.\n"
+    "- Use modern responsive CSS.\n"
+    "- Use external Google Fonts.\n"
+    "- All image paths must match the file structure.\n"
+    "- Image src values must use assets/images/<provided-filename>.\n"
+    "- No fake image URLs.\n"
+    "- No broken links.\n"
+    "Return ONLY raw JSON. Do not wrap the response in markdown code blocks. Do not include explanations."
+)
+
 
 class DeveloperAgent(BaseAgent):
     def __init__(self, llm: LLMProtocol | None = None) -> None:
         super().__init__(
             role_name="developer",
-            system_prompt=(
-                "You are a senior front-end developer specialized in building "
-                "static websites using HTML, CSS and JavaScript. You write clean, "
-                "responsive, accessible and well-structured code.\n\n"
-                "You will receive an architecture_spec, a design_system payload, "
-                "a site_structure payload, and development_tasks.\n"
-                "Generate a professional multi-file website project.\n\n"
-                "Your role is to render the provided website content into code.\n"
-                "Do not write new website copy.\n"
-                "Do not invent additional textual content beyond what is provided "
-                "in site_structure.\n"
-                "Use site_structure headings, text, and supporting_points as the "
-                "source of truth for page content.\n"
-                "Strictly implement the provided design_system.\n"
-                "Follow the architecture_spec for project structure, component "
-                "organization, naming conventions, CSS architecture, and "
-                "JavaScript organization.\n"
-                "Use development_tasks as the implementation checklist.\n"
-                "Do not invent additional colors.\n"
-                "Do not invent additional fonts.\n"
-                "Use CSS variables for the color system.\n"
-                "Implement a 12-column responsive grid.\n"
-                "Implement consistent spacing based on base_unit.\n"
-                "Use flexbox or grid layout.\n"
-                "Implement hover states for buttons and links.\n"
-                "Implement a responsive navbar.\n"
-                "Implement proper section spacing.\n"
-                "Follow BEM or clear CSS class naming.\n"
-                "Ensure a mobile-first CSS approach.\n\n"
-                "The design specification includes image filenames.\n"
-                "Use those filenames exactly in HTML.\n"
-                "Do not invent image paths.\n"
-                "Assume images exist in assets/images/.\n\n"
-                "Return JSON only.\n"
-                "No markdown.\n"
-                "No explanations.\n"
-                "Output format must be exactly:\n"
-                "{\n"
-                "  \"files\": {\n"
-                "    \"index.html\": \"...\",\n"
-                "    \"css/styles.css\": \"...\",\n"
-                "    \"js/main.js\": \"...\"\n"
-                "  }\n"
-                "}\n\n"
-                "Rules:\n"
-                "- Build the website files.\n"
-                "- Render the content from site_structure.\n"
-                "- Respect architecture_spec and design_system.\n"
-                "- Do not invent additional content.\n"
-                "- index.html must link to css/styles.css.\n"
-                "- index.html must link to js/main.js.\n"
-                "- No inline styles.\n"
-                "- No inline JavaScript.\n"
-                "- Use semantic HTML.\n"
-                "- Use modern responsive CSS.\n"
-                "- Use external Google Fonts.\n"
-                "- All image paths must match the file structure.\n"
-                "- Image src values must use assets/images/<provided-filename>.\n"
-                "- No fake image URLs.\n"
-                "- No broken links.\n"
-                "Return ONLY raw JSON. Do not wrap the response in markdown code blocks. Do not include explanations."
-            ),
+            system_prompt=_DEVELOPER_ROLE + _FULL_OUTPUT_FORMAT + _DEVELOPER_RULES,
             llm=llm,
             output_schema=GENERATED_FILES_SCHEMA,
             output_format="json",
         )
+        self.reviser = BaseAgent(
+            role_name=f"{self.role_name}.revise",
+            system_prompt=_DEVELOPER_ROLE + _PATCH_OUTPUT_FORMAT + _DEVELOPER_RULES,
+            llm=self.llm,
+            output_schema=GENERATED_FILES_PATCH_SCHEMA,
+            output_format="json",
+        )
+
+    def revise(self, user_input: str) -> str:
+        return self.reviser.run(user_input)
+
+    async def arevise(self, user_input: str) -> str:
+        return await self.reviser.arun(user_input)
+
+    def run_streaming(self, user_input: str, on_file: Callable[[str, str], None]) -> str:
+        generate_stream = getattr(self.llm, "generate_stream", None)
+        if generate_stream is None:
+            return self.run(user_input)
+
+        print(f"[{self.role_name.upper()}] Starting streaming execution...")
+        print(f"[{self.role_name.upper()}] Input length: {len(user_input)} characters")
+        parser = StreamingFilesParser()
+        chunks: list[str] = []
+        for chunk in generate_stream(
+            system_prompt=self.system_prompt,
+            user_input=user_input,
+            agent_name=self.role_name,
+        ):
+            chunks.append(chunk)
+            for path, content in parser.feed(chunk):
+                on_file(path, content)
+
+        response = self._validate_output("".join(chunks), user_input=user_input)
+        print(f"[{self.role_name.upper()}] Execution completed.")
+        return response
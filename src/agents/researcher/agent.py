@@ -1,17 +1,65 @@
+import asyncio
 import json
 
 from src.core.base_agent import BaseAgent
 from src.core.base_agent import sanitize_llm_output
+from src.core.concurrency import run_concurrently
 from src.core.llm import LLMProtocol
 from src.core.schemas import RESEARCH_OUTPUT_SCHEMA
+from src.core.token_budget import TokenBudget
+from src.core.token_budget import summarize_search_results
 from src.core.web_search import WebSearchService
 
 
+_SCOPE_EXTRACTION_PROMPT = (
+    "Extract the research scope from the website requirements.\n"
+    "Return JSON only with this shape:\n"
+    "{\n"
+    "  \"primary_topic\": \"...\",\n"
+    "  \"personas\": [\"...\"],\n"
+    "  \"pain_points\": [\"...\"],\n"
+    "  \"knowledge_topics\": [\"...\"]\n"
+    "}\n"
+    "Use up to 3 personas, up to 5 pain points, and 4 to 6 knowledge topics.\n"
+    "Knowledge topics should represent factual subjects that website content "
+    "may need to explain.\n"
+    "Return ONLY raw JSON. Do not wrap the response in markdown code blocks. Do not include explanations."
+)
+
+_STRATEGIC_QUERIES_PROMPT = (
+    "Based on the research scope, generate 5 high-impact web "
+    "search queries for strategic website research.\n"
+    "Queries must cover:\n"
+    "- competitor website examples\n"
+    "- hero/messaging/CTA patterns\n"
+    "- industry keywords and SEO terms\n"
+    "- differentiation strategies\n"
+    "Return one query per line and no extra text."
+)
+
+_KNOWLEDGE_QUERIES_PROMPT = (
+    "Based on the research scope, generate 5 high-impact web search queries "
+    "for factual domain knowledge research.\n"
+    "Queries must cover:\n"
+    "- foundational concepts\n"
+    "- notable entities, examples, or categories\n"
+    "- adoption, use cases, or practical relevance\n"
+    "- key milestones, events, or history when relevant\n"
+    "Return one query per line and no extra text."
+)
+
+
 class ResearcherAgent(BaseAgent):
+    MAX_SEARCH_WORKERS = 10
+    SEARCH_TIMEOUT_SECONDS = 90.0
+
     def __init__(
         self,
         llm: LLMProtocol | None = None,
         web_search_service: WebSearchService | None = None,
+        max_search_workers: int | None = None,
+        search_timeout: float | None = None,
+        token_budget: TokenBudget | None = None,
     ) -> None:
         super().__init__(
             role_name="researcher",
@@ -69,6 +117,9 @@ class ResearcherAgent(BaseAgent):
             output_format="json",
         )
         self.web_search_service = web_search_service or WebSearchService()
+        self.max_search_workers = max_search_workers or self.MAX_SEARCH_WORKERS
+        self.search_timeout = search_timeout or self.SEARCH_TIMEOUT_SECONDS
+        self.token_budget = token_budget
 
     def run(self, user_input: str) -> str:
         print(f"[{self.role_name.upper()}] Starting execution...")
@@ -78,21 +129,75 @@ class ResearcherAgent(BaseAgent):
         strategic_queries = self._build_strategic_queries(research_scope)
         knowledge_queries = self._build_knowledge_queries(research_scope)
 
-        strategic_results_parts: list[str] = []
-        for index, query in enumerate(strategic_queries, start=1):
-            print(f"[{self.role_name.upper()}] Strategic web search {index}/{len(strategic_queries)}: {query}")
-            result_text = self.web_search_service.search(query)
-            strategic_results_parts.append(f"Query: {query}\n{result_text}")
-
-        knowledge_results_parts: list[str] = []
-        for index, query in enumerate(knowledge_queries, start=1):
-            print(f"[{self.role_name.upper()}] Knowledge web search {index}/{len(knowledge_queries)}: {query}")
-            result_text = self.web_search_service.search(query)
-            knowledge_results_parts.append(f"Query: {query}\n{result_text}")
-
-        strategic_results = "\n\n".join(strategic_results_parts)
-        knowledge_results = "\n\n".join(knowledge_results_parts)
-        dossier_input = (
+        strategic_results, knowledge_results = self._run_web_searches(strategic_queries, knowledge_queries)
+        dossier_input = self._budgeted_dossier_input(user_input, research_scope, strategic_results, knowledge_results)
+        response = self.llm.generate(
+            system_prompt=self.system_prompt,
+            user_input=dossier_input,
+            agent_name=self.role_name,
+        )
+        response = self._validate_output(response, user_input=dossier_input)
+        print(f"[{self.role_name.upper()}] Execution completed.")
+        return response
+
+    async def arun(self, user_input: str) -> str:
+        print(f"[{self.role_name.upper()}] Starting execution...")
+        print(f"[{self.role_name.upper()}] Input length: {len(user_input)} characters")
+
+        research_scope = await self._agenerate(
+            system_prompt=_SCOPE_EXTRACTION_PROMPT,
+            user_input=user_input,
+            agent_name=f"{self.role_name}.extract_scope",
+        )
+        topic = self._primary_topic_label(research_scope)
+        raw_strategic_queries = await self._agenerate(
+            system_prompt=_STRATEGIC_QUERIES_PROMPT,
+            user_input=research_scope,
+            agent_name=f"{self.role_name}.strategic_queries",
+        )
+        strategic_queries = self._normalize_queries(
+            raw_strategic_queries, self._strategic_fallback_queries(topic), limit=5
+        )
+        raw_knowledge_queries = await self._agenerate(
+            system_prompt=_KNOWLEDGE_QUERIES_PROMPT,
+            user_input=research_scope,
+            agent_name=f"{self.role_name}.knowledge_queries",
+        )
+        knowledge_queries = self._normalize_queries(
+            raw_knowledge_queries, self._knowledge_fallback_queries(topic), limit=5
+        )
+
+        strategic_results, knowledge_results = await asyncio.to_thread(
+            self._run_web_searches, strategic_queries, knowledge_queries
+        )
+        dossier_input = self._budgeted_dossier_input(user_input, research_scope, strategic_results, knowledge_results)
+        response = await self._agenerate(
+            system_prompt=self.system_prompt,
+            user_input=dossier_input,
+            agent_name=self.role_name,
+        )
+        response = await self._avalidate_output(response, user_input=dossier_input)
+        print(f"[{self.role_name.upper()}] Execution completed.")
+        return response
+
+    def _budgeted_dossier_input(
+        self, user_input: str, research_scope: str, strategic_results: str, knowledge_results: str
+    ) -> str:
+        """Dossier input, with the search results summarized when they would exceed the token budget."""
+        if self.token_budget is not None:
+            available = self.token_budget.available(
+                self.role_name, self.system_prompt, self._dossier_input(user_input, research_scope, "", "")
+            )
+            if self.token_budget.count(strategic_results, knowledge_results) > available:
+                print(f"[{self.role_name.upper()}] Search results exceed the token budget; summarizing them.")
+                share = max(0, available // 2)
+                strategic_results = summarize_search_results(strategic_results, share, self.token_budget.model)
+                knowledge_results = summarize_search_results(knowledge_results, share, self.token_budget.model)
+        return self._dossier_input(user_input, research_scope, strategic_results, knowledge_results)
+
+    @staticmethod
+    def _dossier_input(user_input: str, research_scope: str, strategic_results: str, knowledge_results: str) -> str:
+        return (
             "Structured website requirements:\n"
             f"{user_input}\n\n"
             "Extracted research scope:\n"
@@ -103,87 +208,74 @@ class ResearcherAgent(BaseAgent):
             f"{knowledge_results}\n\n"
             "Produce the structured research JSON using only these real findings."
         )
-        response = self.llm.generate(
-            system_prompt=self.system_prompt,
-            user_input=dossier_input,
-            agent_name=self.role_name,
+
+    def _run_web_searches(self, strategic_queries: list[str], knowledge_queries: list[str]) -> tuple[str, str]:
+        labeled_queries = [("Strategic", query) for query in strategic_queries]
+        labeled_queries += [("Knowledge", query) for query in knowledge_queries]
+        for label, queries in (("Strategic", strategic_queries), ("Knowledge", knowledge_queries)):
+            for index, query in enumerate(queries, start=1):
+                print(f"[{self.role_name.upper()}] {label} web search {index}/{len(queries)}: {query}")
+
+        outcomes = run_concurrently(
+            self.web_search_service.search,
+            [query for _, query in labeled_queries],
+            max_workers=self.max_search_workers,
+            timeout=self.search_timeout,
         )
-        response = self._validate_output(response, user_input=dossier_input)
-        print(f"[{self.role_name.upper()}] Execution completed.")
-        return response
+
+        results_parts: dict[str, list[str]] = {"Strategic": [], "Knowledge": []}
+        for (label, query), outcome in zip(labeled_queries, outcomes):
+            if not outcome.ok:
+                print(f"[{self.role_name.upper()}] WARNING: {label} web search failed for '{query}': {outcome.error}")
+                continue
+            results_parts[label].append(f"Query: {query}\n{outcome.value}")
+
+        return "\n\n".join(results_parts["Strategic"]), "\n\n".join(results_parts["Knowledge"])
 
     def _extract_research_scope(self, requirements: str) -> str:
-        extraction_prompt = (
-            "Extract the research scope from the website requirements.\n"
-            "Return JSON only with this shape:\n"
-            "{\n"
-            "  \"primary_topic\": \"...\",\n"
-            "  \"personas\": [\"...\"],\n"
-            "  \"pain_points\": [\"...\"],\n"
-            "  \"knowledge_topics\": [\"...\"]\n"
-            "}\n"
-            "Use up to 3 personas, up to 5 pain points, and 4 to 6 knowledge topics.\n"
-            "Knowledge topics should represent factual subjects that website content "
-            "may need to explain.\n"
-            "Return ONLY raw JSON. Do not wrap the response in markdown code blocks. Do not include explanations."
-        )
         return self.llm.generate(
-            system_prompt=extraction_prompt,
+            system_prompt=_SCOPE_EXTRACTION_PROMPT,
             user_input=requirements,
             agent_name=f"{self.role_name}.extract_scope",
         )
 
     def _build_strategic_queries(self, research_scope: str) -> list[str]:
         topic = self._primary_topic_label(research_scope)
-        query_prompt = (
-            "Based on the research scope, generate 5 high-impact web "
-            "search queries for strategic website research.\n"
-            "Queries must cover:\n"
-            "- competitor website examples\n"
-            "- hero/messaging/CTA patterns\n"
-            "- industry keywords and SEO terms\n"
-            "- differentiation strategies\n"
-            "Return one query per line and no extra text."
-        )
         raw_queries = self.llm.generate(
-            system_prompt=query_prompt,
+            system_prompt=_STRATEGIC_QUERIES_PROMPT,
             user_input=research_scope,
             agent_name=f"{self.role_name}.strategic_queries",
         )
-        fallback_queries = [
-            f"top {topic} competitor website homepage examples",
-            f"best {topic} website hero section messaging patterns",
-            f"high-converting {topic} website call to action patterns",
-            f"{topic} SEO keyword clusters",
-            f"{topic} website differentiation strategy examples",
-        ]
-        return self._normalize_queries(raw_queries, fallback_queries, limit=5)
+        return self._normalize_queries(raw_queries, self._strategic_fallback_queries(topic), limit=5)
 
     def _build_knowledge_queries(self, research_scope: str) -> list[str]:
         topic = self._primary_topic_label(research_scope)
-        query_prompt = (
-            "Based on the research scope, generate 5 high-impact web search queries "
-            "for factual domain knowledge research.\n"
-            "Queries must cover:\n"
-            "- foundational concepts\n"
-            "- notable entities, examples, or categories\n"
-            "- adoption, use cases, or practical relevance\n"
-            "- key milestones, events, or history when relevant\n"
-            "Return one query per line and no extra text."
-        )
         raw_queries = self.llm.generate(
-            system_prompt=query_prompt,
+            system_prompt=_KNOWLEDGE_QUERIES_PROMPT,
             user_input=research_scope,
             agent_name=f"{self.role_name}.knowledge_queries",
         )
-        fallback_queries = [
+        return self._normalize_queries(raw_queries, self._knowledge_fallback_queries(topic), limit=5)
+
+    @staticmethod
+    def _strategic_fallback_queries(topic: str) -> list[str]:
+        return [
+            f"top {topic} competitor website homepage examples",
+            f"best {topic} website hero section messaging patterns",
+            f"high-converting {topic} website call to action patterns",
+            f"{topic} SEO keyword clusters",
+            f"{topic} website differentiation strategy examples",
+        ]
+
+    @staticmethod
+    def _knowledge_fallback_queries(topic: str) -> list[str]:
+        return [
             f"{topic} overview and history",
             f"how {topic} works",
             f"major {topic} examples and categories",
             f"{topic} adoption and use cases",
             f"key events and milestones in {topic}",
         ]
-        return self._normalize_queries(raw_queries, fallback_queries, limit=5)
 
     @staticmethod
     def _normalize_queries(raw_queries: str, fallback_queries: list[str], limit: int) -> list[str]:
@@ -1,7 +1,31 @@
 from .base_agent import BaseAgent
 from .image_generator import ImageGenerator
+from .llm import AsyncLLM
 from .llm import LLM
+from .llm_cache import CachingLLM
+from .llm_router import RoutingLLM
+from .llm_transcript import RecordingLLM
+from .llm_transcript import ReplayLLM
+from .metrics import MetricsRecorder
 from .orchestration import Orchestrator
+from .orchestration import RunWorkspace
+from .token_budget import TokenBudget
 from .web_search import WebSearchService
+from .web_search_cache import CachingWebSearchService
 
-__all__ = ["BaseAgent", "ImageGenerator", "LLM", "Orchestrator", "WebSearchService"]
+__all__ = [
+    "AsyncLLM",
+    "BaseAgent",
+    "CachingLLM",
+    "CachingWebSearchService",
+    "ImageGenerator",
+    "LLM",
+    "MetricsRecorder",
+    "Orchestrator",
+    "RecordingLLM",
+    "ReplayLLM",
+    "RoutingLLM",
+    "RunWorkspace",
+    "TokenBudget",
+    "WebSearchService",
+]
@@ -1,22 +1,44 @@
+import asyncio
 import json
 import logging
 import re
+import time
 from typing import Any
 
 from .llm import LLM
 from .llm import LLMProtocol
+from .metrics import MetricsRecorder
 from .schema_validator import SchemaValidationError
 from .schema_validator import validate_schema
 
 logger = logging.getLogger(__name__)
 
 
+_JSON_SCAN_TOKEN = re.compile(r"```(?:json\s*)?|[{}\[\]\",]", re.IGNORECASE)
+_JSON_STRING_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_WHITESPACE = re.compile(r"\s*")
+_MATCHING_OPENERS = {"}": "{", "]": "["}
+_JSON_SCALAR = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null|NaN|-?Infinity")
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_VALID_JSON_STRING = re.compile(r'(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*')
+
+# Grammar states of an open group; see _OpenGroup.
+_KEY_OR_END, _KEY, _COLON, _VALUE, _VALUE_OR_END, _COMMA_OR_END = range(6)
+
+
 def sanitize_llm_output(text: str) -> str:
-    cleaned = re.sub(r"```json\s*", "", text, flags=re.IGNORECASE)
-    cleaned = cleaned.replace("```", "").strip()
-    cleaned = _remove_trailing_commas(cleaned)
-    extracted = _extract_first_json_value(cleaned)
-    return extracted.strip() if extracted is not None else cleaned.strip()
+    stripped = text.strip()
+    if stripped[:1] in ("{", "["):
+        try:
+            json.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+        else:
+            return stripped
+
+    scanner = _JSONTextScanner(text)
+    extracted = scanner.scan()
+    return extracted.strip() if extracted is not None else scanner.cleaned_text().strip()
 
 
 def _sanitize_json_response(response: str) -> str:
@@ -86,27 +108,216 @@ def attempt_schema_repair(data: Any, schema: dict[str, Any]) -> Any:
     return data
 
 
-def _remove_trailing_commas(text: str) -> str:
-    previous = None
-    cleaned = text
-    while cleaned != previous:
-        previous = cleaned
-        cleaned = re.sub(r",\s*([}\]])", r"\1", cleaned)
-    return cleaned
+class _JSONTextScanner:
+    """Single-pass extraction of the first JSON value from LLM text.
+
+    Code fences are dropped and trailing commas before `}`/`]` are removed while
+    scanning; both are left untouched inside JSON strings. Each open `{`/`[`
+    carries a small grammar state that is advanced as its contents stream past,
+    so a group is known to be valid JSON the moment it closes, without parsing
+    it again. If a top-level group is not valid, the earliest valid value nested
+    inside it is used, which matches taking the first position from which a JSON
+    value decodes. A group that never closes may have paired its quotes wrongly
+    (a stray quote in prose shifts every string after it), so the text after its
+    first quote is scanned once more with string boundaries flipped and the
+    earlier candidate wins.
+    """
+
+    def __init__(self, text: str, start: int = 0, flipped: bool = False) -> None:
+        self.text = text
+        self._start = start
+        self._flipped = flipped
+        # The cleaned text is the source from `start` minus dropped fences and
+        # commas: `_pieces` holds it up to `_copied_to`, the rest is still in `text`.
+        self._pieces: list[str] = []
+        self._copied_to = start
+        self._dropped = 0
+        self._openers: list[_OpenGroup] = []
+        self._group_piece_index = 0
+        self._group_offset = 0
+        self._group_first_quote: int | None = None
+        self._best_nested: tuple[int, int, int] | None = None
+        self._pending_text = ""
+
+    def scan(self) -> str | None:
+        found = self._scan()
+        return found[0] if found is not None else None
+
+    def cleaned_text(self) -> str:
+        return "".join(self._pieces) + self.text[self._copied_to :]
+
+    def _scan(self) -> tuple[str, int] | None:
+        text = self.text
+        position = self._start
+        while True:
+            match = _JSON_SCAN_TOKEN.search(text, position) if position < len(text) else None
+            if match is None:
+                return self._resolve_unclosed_group() if self._openers else None
+
+            token = match.group()
+            token_start = match.start()
+            between = text[position:token_start] if self._openers else ""
+            position = match.end()
+
+            if token.startswith("`"):
+                self._drop(token_start, position)
+                # A dropped fence can split a literal, e.g. "1```2".
+                self._pending_text += between
+                continue
+            if self._openers and self._openers[-1].valid:
+                self._openers[-1].feed_text(self._pending_text + between)
+            self._pending_text = ""
+            if not self._openers:
+                if token in "{[":
+                    self._open(token, token_start)
+                elif token == '"' and self._flipped:
+                    position = self._skip_string(position)
+            elif token == '"':
+                if self._group_first_quote is None:
+                    self._group_first_quote = token_start
+                string_start = position
+                position = self._skip_string(position)
+                group = self._openers[-1]
+                if group.valid:
+                    group.feed_string(text[string_start : position - 1])
+            elif token == ",":
+                next_index = _WHITESPACE.match(text, position).end()
+                if next_index < len(text) and text[next_index] in "}]":
+                    self._drop(token_start, position)
+                else:
+                    self._openers[-1].feed_comma()
+            elif token in "{[":
+                self._openers[-1].feed_value()
+                self._open(token, token_start)
+            else:
+                extracted = self._close(token, position)
+                if extracted is not None:
+                    return extracted
+
+    def _cleaned_offset(self, source_index: int) -> int:
+        return source_index - self._start - self._dropped
+
+    def _drop(self, start: int, end: int) -> None:
+        self._pieces.append(self.text[self._copied_to : start])
+        self._copied_to = end
+        self._dropped += end - start
+
+    def _group_text(self, end: int) -> str:
+        return "".join(self._pieces[self._group_piece_index :]) + self.text[self._copied_to : end]
+
+    def _open(self, token: str, source_index: int) -> None:
+        if not self._openers:
+            self._pieces.append(self.text[self._copied_to : source_index])
+            self._copied_to = source_index
+            self._group_piece_index = len(self._pieces)
+            self._group_offset = self._cleaned_offset(source_index)
+            self._group_first_quote = None
+            self._best_nested = None
+        self._openers.append(_OpenGroup(token, self._cleaned_offset(source_index), source_index))
+
+    def _close(self, token: str, end: int) -> tuple[str, int] | None:
+        group = self._openers[-1]
+        if group.opener != _MATCHING_OPENERS[token]:
+            return self._abandon_group(end)
+
+        self._openers.pop()
+        valid = group.closes_validly()
+        if self._openers:
+            if not valid:
+                self._openers[-1].valid = False
+            elif self._best_nested is None or group.source_index < self._best_nested[0]:
+                self._best_nested = (group.source_index, group.start, self._cleaned_offset(end))
+            return None
+
+        if valid:
+            return self._group_text(end), group.source_index
+        return self._best_nested_value(end)
+
+    def _skip_string(self, position: int) -> int:
+        """Position just past the closing quote of the string starting at `position`."""
+        match = _JSON_STRING_REST.match(self.text, position)
+        return match.end() if match is not None else len(self.text)
+
+    def _resolve_unclosed_group(self) -> tuple[str, int] | None:
+        first_quote = self._group_first_quote
+        nested = self._abandon_group(len(self.text))
+        if first_quote is None or self._flipped or (nested is not None and nested[1] < first_quote):
+            return nested
+
+        flipped = _JSONTextScanner(self.text, start=first_quote + 1, flipped=True)._scan()
+        if nested is None or flipped is None:
+            return nested or flipped
+        return min(nested, flipped, key=lambda found: found[1])
+
+    def _abandon_group(self, end: int) -> tuple[str, int] | None:
+        self._openers.clear()
+        return self._best_nested_value(end)
+
+    def _best_nested_value(self, end: int) -> tuple[str, int] | None:
+        best, self._best_nested = self._best_nested, None
+        if best is None:
+            return None
+        source_index, start, stop = best
+        group_text = self._group_text(end)
+        return group_text[start - self._group_offset : stop - self._group_offset], source_index
+
+
+class _OpenGroup:
+    """An open `{`/`[` and where its contents are in the JSON grammar so far.
+
+    `valid` turns False for good at the first token json.loads would reject;
+    the group keeps being scanned so valid values nested in it are still found.
+    """
+
+    __slots__ = ("opener", "start", "source_index", "state", "valid")
+
+    def __init__(self, opener: str, start: int, source_index: int) -> None:
+        self.opener = opener
+        self.start = start
+        self.source_index = source_index
+        self.state = _KEY_OR_END if opener == "{" else _VALUE_OR_END
+        self.valid = True
+
+    def feed_value(self) -> None:
+        if self.state in (_VALUE, _VALUE_OR_END):
+            self.state = _COMMA_OR_END
+        else:
+            self.valid = False
 
+    def feed_string(self, content: str) -> None:
+        if not _VALID_JSON_STRING.fullmatch(content):
+            self.valid = False
+        elif self.state in (_KEY_OR_END, _KEY):
+            self.state = _COLON
+        else:
+            self.feed_value()
 
-def _extract_first_json_value(text: str) -> str | None:
-    decoder = json.JSONDecoder()
-    for index, char in enumerate(text):
-        if char not in "{[":
-            continue
-        candidate = text[index:]
-        try:
-            _, end = decoder.raw_decode(candidate)
-        except json.JSONDecodeError:
-            continue
-        return candidate[:end]
-    return None
+    def feed_comma(self) -> None:
+        if self.state == _COMMA_OR_END:
+            self.state = _KEY if self.opener == "{" else _VALUE
+        else:
+            self.valid = False
+
+    def feed_text(self, text: str) -> None:
+        """Whitespace, `:` and scalar literals found between structural tokens."""
+        position = 0
+        while self.valid:
+            position = _JSON_WHITESPACE.match(text, position).end()
+            if position >= len(text):
+                return
+            if text[position] == ":" and self.state == _COLON:
+                self.state = _VALUE
+                position += 1
+                continue
+            scalar = _JSON_SCALAR.match(text, position)
+            if scalar is None:
+                self.valid = False
+                return
+            self.feed_value()
+            position = scalar.end()
+
+    def closes_validly(self) -> bool:
+        return self.valid and self.state in (_COMMA_OR_END, _KEY_OR_END if self.opener == "{" else _VALUE_OR_END)
 
 
 def _resolve_schema_type(schema: dict[str, Any]) -> str | None:
@@ -174,6 +385,10 @@ def _repair_object_from_string(value: str, properties: dict[str, Any]) -> dict[s
     return {"value": value}
 
 
+class _RetryableOutputError(ValueError):
+    """Raised for JSON output failures that a corrected retry may fix."""
+
+
 class BaseAgent:
     """Base class for all agents."""
 
@@ -191,6 +406,10 @@ class BaseAgent:
         self.output_schema = output_schema
         self.output_format = output_format
 
+    @property
+    def metrics(self) -> MetricsRecorder | None:
+        return getattr(self.llm, "metrics", None)
+
     def run(self, user_input: str) -> str:
         print(f"[{self.role_name.upper()}] Starting execution...")
         print(f"[{self.role_name.upper()}] Input length: {len(user_input)} characters")
@@ -203,7 +422,67 @@ class BaseAgent:
         print(f"[{self.role_name.upper()}] Execution completed.")
         return response
 
+    async def arun(self, user_input: str) -> str:
+        print(f"[{self.role_name.upper()}] Starting execution...")
+        print(f"[{self.role_name.upper()}] Input length: {len(user_input)} characters")
+        response = await self._agenerate(
+            system_prompt=self.system_prompt,
+            user_input=user_input,
+            agent_name=self.role_name,
+        )
+        response = await self._avalidate_output(response, user_input=user_input)
+        print(f"[{self.role_name.upper()}] Execution completed.")
+        return response
+
+    async def _agenerate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        agent_name: str,
+        tools: list[dict[str, Any]] | None = None,
+    ) -> str:
+        agenerate = getattr(self.llm, "agenerate", None)
+        if agenerate is not None:
+            return await agenerate(
+                system_prompt=system_prompt,
+                user_input=user_input,
+                tools=tools,
+                agent_name=agent_name,
+            )
+        return await asyncio.to_thread(
+            self.llm.generate,
+            system_prompt=system_prompt,
+            user_input=user_input,
+            tools=tools,
+            agent_name=agent_name,
+        )
+
     def _validate_output(self, response: str, user_input: str, retry_allowed: bool = True) -> str:
+        try:
+            return self._timed_normalize_output(response)
+        except _RetryableOutputError:
+            if not retry_allowed:
+                raise
+            return self._retry_with_corrected_json(user_input=user_input, invalid_response=response)
+
+    async def _avalidate_output(self, response: str, user_input: str, retry_allowed: bool = True) -> str:
+        try:
+            return self._timed_normalize_output(response)
+        except _RetryableOutputError:
+            if not retry_allowed:
+                raise
+            return await self._aretry_with_corrected_json(user_input=user_input, invalid_response=response)
+
+    def _timed_normalize_output(self, response: str) -> str:
+        started = time.perf_counter()
+        try:
+            return self._normalize_output(response)
+        finally:
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.record_validation(self.role_name, time.perf_counter() - started)
+
+    def _normalize_output(self, response: str) -> str:
         if self.output_schema is None or self.output_format is None:
             return response
 
@@ -216,9 +495,7 @@ class BaseAgent:
             except json.JSONDecodeError as exc:
                 logger.error("[%s] Returned invalid JSON output:\n%s", self.role_name.upper(), response)
                 logger.error("[%s] Sanitized JSON output:\n%s", self.role_name.upper(), cleaned_response)
-                if retry_allowed:
-                    return self._retry_with_corrected_json(user_input=user_input, invalid_response=response)
-                raise ValueError(f"{self.role_name} returned invalid JSON output: {exc.msg}") from exc
+                raise _RetryableOutputError(f"{self.role_name} returned invalid JSON output: {exc.msg}") from exc
 
             repaired_data = attempt_schema_repair(data, self.output_schema)
             if repaired_data != data:
@@ -234,6 +511,7 @@ class BaseAgent:
         except SchemaValidationError as exc:
             logger.error("[%s] Output failed schema validation.", self.role_name.upper())
             logger.error("[%s] Original response:\n%s", self.role_name.upper(), response)
+            message = f"{self.role_name} returned output that failed schema validation: {exc}"
             if self.output_format == "json":
                 logger.error("[%s] Sanitized response:\n%s", self.role_name.upper(), cleaned_response)
                 logger.error(
@@ -241,9 +519,8 @@ class BaseAgent:
                     self.role_name.upper(),
                     json.dumps(data, indent=2, ensure_ascii=True),
                 )
-                if retry_allowed:
-                    return self._retry_with_corrected_json(user_input=user_input, invalid_response=response)
-            raise ValueError(f"{self.role_name} returned output that failed schema validation: {exc}") from exc
+                raise _RetryableOutputError(message) from exc
+            raise ValueError(message) from exc
 
         if self.output_format == "json":
             return json.dumps(data, indent=2)
@@ -251,7 +528,31 @@ class BaseAgent:
 
     def _retry_with_corrected_json(self, user_input: str, invalid_response: str) -> str:
         logger.warning("[%s] Retrying once after JSON/schema failure.", self.role_name.upper())
-        correction_instruction = (
+        self._record_retry()
+        corrected_response = self.llm.generate(
+            system_prompt=self.system_prompt,
+            user_input=self._correction_instruction(user_input, invalid_response),
+            agent_name=self.role_name,
+        )
+        return self._validate_output(corrected_response, user_input=user_input, retry_allowed=False)
+
+    async def _aretry_with_corrected_json(self, user_input: str, invalid_response: str) -> str:
+        logger.warning("[%s] Retrying once after JSON/schema failure.", self.role_name.upper())
+        self._record_retry()
+        corrected_response = await self._agenerate(
+            system_prompt=self.system_prompt,
+            user_input=self._correction_instruction(user_input, invalid_response),
+            agent_name=self.role_name,
+        )
+        return await self._avalidate_output(corrected_response, user_input=user_input, retry_allowed=False)
+
+    def _record_retry(self) -> None:
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.record_retry(self.role_name)
+
+    def _correction_instruction(self, user_input: str, invalid_response: str) -> str:
+        return (
             f"{user_input}\n\n"
             "The previous output failed schema validation. Return corrected JSON matching the schema exactly. "
             "Return ONLY JSON.\n\n"
@@ -260,9 +561,3 @@ class BaseAgent:
             "Target JSON schema:\n"
             f"{json.dumps(self.output_schema, indent=2, ensure_ascii=True)}"
         )
-        corrected_response = self.llm.generate(
-            system_prompt=self.system_prompt,
-            user_input=correction_instruction,
-            agent_name=self.role_name,
-        )
-        return self._validate_output(corrected_response, user_input=user_input, retry_allowed=False)
@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SQLiteCacheStore:
+    """On-disk key/value store with TTL expiry and size-based LRU eviction."""
+
+    DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(
+        self,
+        path: Path | str,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._connection.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        if self.max_bytes is None:
+            return
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        evicted_keys: list[str] = []
+        for key, size in self._connection.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC"):
+            if total_size <= self.max_bytes:
+                break
+            evicted_keys.append(key)
+            total_size -= size
+        self._connection.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted_keys])
@@ -0,0 +1,104 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+from typing import Callable
+from typing import Generic
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class TaskOutcome(Generic[R]):
+    """Result or error of one task submitted to run_concurrently."""
+
+    value: R | None = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_concurrently(
+    func: Callable[[T], R],
+    items: list[T],
+    *,
+    max_workers: int,
+    timeout: float | None = None,
+    on_complete: Callable[[int, TaskOutcome[R]], None] | None = None,
+) -> list[TaskOutcome[R]]:
+    """Run func over items on a bounded thread pool.
+
+    Outcomes are returned in input order. A task that raises, or that runs for
+    longer than `timeout` seconds after it started, is reported as an error
+    instead of aborting its siblings. `on_complete` is called from the calling
+    thread as each task settles. Tasks run in a copy of the caller's context,
+    so context variables such as the rate-limit priority lane carry over.
+    """
+    outcomes: list[TaskOutcome[R] | None] = [None] * len(items)
+    if not items:
+        return []
+
+    started_at: dict[int, float] = {}
+
+    def _invoke(index: int, item: T) -> R:
+        started_at[index] = time.monotonic()
+        return func(item)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+    try:
+        pending: dict[Future[R], int] = {
+            executor.submit(contextvars.copy_context().run, _invoke, index, item): index
+            for index, item in enumerate(items)
+        }
+        while pending:
+            done, _ = wait(pending, timeout=_next_deadline(pending, started_at, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                exc = future.exception()
+                outcome = TaskOutcome(error=exc) if exc is not None else TaskOutcome(value=future.result())
+                outcomes[index] = outcome
+                if on_complete is not None:
+                    on_complete(index, outcome)
+
+            if timeout is None:
+                continue
+            now = time.monotonic()
+            for future, index in list(pending.items()):
+                started = started_at.get(index)
+                if started is None or now - started < timeout:
+                    continue
+                future.cancel()
+                del pending[future]
+                outcome = TaskOutcome(error=TimeoutError(f"Task timed out after {timeout:g}s."))
+                outcomes[index] = outcome
+                if on_complete is not None:
+                    on_complete(index, outcome)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return [outcome if outcome is not None else TaskOutcome() for outcome in outcomes]
+
+
+def _next_deadline(
+    pending: dict[Future[R], int],
+    started_at: dict[int, float],
+    timeout: float | None,
+) -> float | None:
+    if timeout is None:
+        return None
+    now = time.monotonic()
+    remaining = [
+        started_at[index] + timeout - now
+        for index in pending.values()
+        if index in started_at
+    ]
+    if not remaining:
+        return timeout
+    return max(0.0, min(remaining))
@@ -1,24 +1,34 @@
 import base64
-import os
 
 from openai import OpenAI
 
+from .openai_client import shared_openai_client
+from .rate_limiter import RateLimiter
+from .rate_limiter import get_rate_limiter
+
 
 class ImageGenerator:
     """Reusable OpenAI image generation service."""
 
     DEFAULT_MODEL = "gpt-image-1"
 
-    def __init__(self, model: str | None = None) -> None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY is not set.")
-
-        self.client = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        model: str | None = None,
+        client: OpenAI | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.client = client or shared_openai_client()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        if self.rate_limiter is not None:
+            self.client = self.client.with_options(max_retries=0)
         self.model = model or self.DEFAULT_MODEL
 
     def generate_image(self, prompt: str) -> bytes:
-        response = self.client.images.generate(model=self.model, prompt=prompt)
+        if self.rate_limiter is None:
+            response = self.client.images.generate(model=self.model, prompt=prompt)
+        else:
+            response = self.rate_limiter.call(lambda: self.client.images.generate(model=self.model, prompt=prompt))
         image_base64 = response.data[0].b64_json
         if not image_base64:
             raise ValueError("Image generation returned empty image data.")
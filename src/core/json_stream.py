@@ -0,0 +1,99 @@
+import json
+import re
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class StreamingFilesParser:
+    """Incremental parser for `{"files": {"path": "content", ...}}` LLM output.
+
+    Chunks are fed as they stream in; every entry of the top-level `files`
+    object is returned as soon as its string value closes. Text before the
+    first `{` (code fences, prose) and after the root object is ignored.
+    """
+
+    def __init__(self) -> None:
+        self._started = False
+        self._finished = False
+        self._stack: list[dict[str, object]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_parts: list[str] = []
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        completed: list[tuple[str, str]] = []
+        index = 0
+        length = len(chunk)
+        while index < length and not self._finished:
+            if self._in_string:
+                index = self._consume_string(chunk, index, completed)
+                continue
+
+            char = chunk[index]
+            index += 1
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._stack.append({"type": "object", "key": None, "expecting_key": True})
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._escape = False
+                self._string_parts = []
+            elif char in "{[":
+                self._stack.append(
+                    {
+                        "type": "object" if char == "{" else "array",
+                        "key": None,
+                        "expecting_key": char == "{",
+                        "parent_key": self._stack[-1]["key"] if self._stack else None,
+                    }
+                )
+            elif char in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self._finished = True
+            elif char == ":":
+                self._stack[-1]["expecting_key"] = False
+            elif char == ",":
+                top = self._stack[-1]
+                if top["type"] == "object":
+                    top["expecting_key"] = True
+                    top["key"] = None
+        return completed
+
+    def _consume_string(self, chunk: str, index: int, completed: list[tuple[str, str]]) -> int:
+        if self._escape:
+            self._string_parts.append(chunk[index])
+            self._escape = False
+            return index + 1
+
+        match = _STRING_SPECIAL.search(chunk, index)
+        if match is None:
+            self._string_parts.append(chunk[index:])
+            return len(chunk)
+
+        self._string_parts.append(chunk[index : match.start()])
+        if match.group() == "\\":
+            self._string_parts.append("\\")
+            self._escape = True
+            return match.end()
+
+        self._in_string = False
+        self._close_string("".join(self._string_parts), completed)
+        self._string_parts = []
+        return match.end()
+
+    def _close_string(self, raw_value: str, completed: list[tuple[str, str]]) -> None:
+        top = self._stack[-1]
+        if top["type"] == "object" and top["expecting_key"]:
+            top["key"] = json.loads(f'"{raw_value}"', strict=False)
+            return
+
+        if top["type"] == "object" and len(self._stack) == 2 and top.get("parent_key") == "files":
+            completed.append((str(top["key"]), json.loads(f'"{raw_value}"', strict=False)))
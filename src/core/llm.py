@@ -1,9 +1,21 @@
-import os
+import threading
 from typing import Any
+from typing import Iterator
 from typing import Protocol
 
+from openai import AsyncOpenAI
 from openai import OpenAI
 
+from .metrics import LLMCallMetrics
+from .metrics import MetricsRecorder
+from .metrics import track_llm_call
+from .openai_client import build_async_openai_client
+from .openai_client import shared_openai_client
+from .rate_limiter import RateLimiter
+from .rate_limiter import get_rate_limiter
+from .token_budget import TokenBudget
+from .token_budget import count_tokens
+
 
 class LLMProtocol(Protocol):
     def generate(
@@ -15,16 +27,37 @@ class LLMProtocol(Protocol):
     ) -> str: ...
 
 
+class AsyncLLMProtocol(Protocol):
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str: ...
+
+
 class LLM:
     """Minimal OpenAI wrapper used by agents."""
 
-    def __init__(self, model: str = "gpt-4o") -> None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY is not set.")
-
-        self.client = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        metrics: MetricsRecorder | None = None,
+        client: OpenAI | None = None,
+        rate_limiter: RateLimiter | None = None,
+        token_budget: TokenBudget | None = None,
+    ) -> None:
+        self.client = client or shared_openai_client()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        if self.rate_limiter is not None:
+            # The limiter schedules retries for every caller; SDK retries would bypass it.
+            self.client = self.client.with_options(max_retries=0)
         self.model = model
+        self.metrics = metrics
+        self.token_budget = token_budget
+        self.token_usage = {"input_tokens": 0, "output_tokens": 0}
+        self._usage_lock = threading.Lock()
 
     def generate(
         self,
@@ -33,7 +66,46 @@ class LLM:
         tools: list[dict[str, Any]] | None = None,
         agent_name: str | None = None,
     ) -> str:
-        del agent_name
+        self._check_token_budget(agent_name, system_prompt, user_input)
+        request = self._build_request(system_prompt, user_input, tools)
+        with track_llm_call(self.metrics, agent_name) as call:
+            if self.rate_limiter is None:
+                response = self.client.responses.create(**request)
+            else:
+                response = self.rate_limiter.call(
+                    lambda: self.client.responses.create(**request), self._estimated_tokens(request)
+                )
+            self._record_usage(response, call, request)
+        return (response.output_text or "").strip()
+
+    def generate_stream(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> Iterator[str]:
+        self._check_token_budget(agent_name, system_prompt, user_input)
+        request = self._build_request(system_prompt, user_input, tools)
+        with track_llm_call(self.metrics, agent_name) as call:
+            if self.rate_limiter is None:
+                stream = self.client.responses.create(**request, stream=True)
+            else:
+                stream = self.rate_limiter.call(
+                    lambda: self.client.responses.create(**request, stream=True), self._estimated_tokens(request)
+                )
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type == "response.completed":
+                    self._record_usage(event.response, call, request)
+
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None,
+    ) -> dict[str, Any]:
         request: dict[str, Any] = {
             "model": self.model,
             "input": [
@@ -43,6 +115,68 @@ class LLM:
         }
         if tools:
             request["tools"] = tools
+        return request
+
+    def _check_token_budget(self, agent_name: str | None, system_prompt: str, user_input: str) -> None:
+        if self.token_budget is not None:
+            self.token_budget.check(agent_name, system_prompt, user_input, self.metrics)
+
+    @staticmethod
+    def _estimated_tokens(request: dict[str, Any]) -> int:
+        return sum(count_tokens(message["content"]) for message in request["input"])
+
+    def _record_usage(self, response: Any, call: LLMCallMetrics, request: dict[str, Any]) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        call.input_tokens = getattr(usage, "input_tokens", 0) or 0
+        call.output_tokens = getattr(usage, "output_tokens", 0) or 0
+        call.cached_input_tokens = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0
+        with self._usage_lock:
+            self.token_usage["input_tokens"] += call.input_tokens
+            self.token_usage["output_tokens"] += call.output_tokens
+        if self.rate_limiter is not None:
+            self.rate_limiter.settle(self._estimated_tokens(request), call.input_tokens + call.output_tokens)
+
+
+class AsyncLLM(LLM):
+    """LLM that also offers a non-blocking agenerate backed by AsyncOpenAI."""
 
-        response = self.client.responses.create(**request)
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        metrics: MetricsRecorder | None = None,
+        client: OpenAI | None = None,
+        async_client: AsyncOpenAI | None = None,
+        rate_limiter: RateLimiter | None = None,
+        token_budget: TokenBudget | None = None,
+    ) -> None:
+        super().__init__(
+            model=model,
+            metrics=metrics,
+            client=client,
+            rate_limiter=rate_limiter,
+            token_budget=token_budget,
+        )
+        self.async_client = async_client or build_async_openai_client()
+        if self.rate_limiter is not None:
+            self.async_client = self.async_client.with_options(max_retries=0)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        self._check_token_budget(agent_name, system_prompt, user_input)
+        request = self._build_request(system_prompt, user_input, tools)
+        with track_llm_call(self.metrics, agent_name) as call:
+            if self.rate_limiter is None:
+                response = await self.async_client.responses.create(**request)
+            else:
+                response = await self.rate_limiter.acall(
+                    lambda: self.async_client.responses.create(**request), self._estimated_tokens(request)
+                )
+            self._record_usage(response, call, request)
         return (response.output_text or "").strip()
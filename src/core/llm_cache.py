@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from .cache_store import SQLiteCacheStore
+from .llm import LLMProtocol
+from .metrics import MetricsRecorder
+from .token_budget import TokenBudget
+
+
+class CachingLLM:
+    """LLMProtocol wrapper that serves repeated generate and agenerate calls from an on-disk cache."""
+
+    DEFAULT_CACHE_PATH = Path(".cache") / "llm_responses.sqlite3"
+
+    def __init__(
+        self,
+        llm: LLMProtocol,
+        cache_path: Path | str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float | None = SQLiteCacheStore.DEFAULT_TTL_SECONDS,
+        max_bytes: int | None = SQLiteCacheStore.DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.llm = llm
+        self.model = getattr(llm, "model", type(llm).__name__)
+        self.store = SQLiteCacheStore(cache_path, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        key = self.cache_key(system_prompt=system_prompt, user_input=user_input, tools=tools)
+        cached = self._lookup(key, agent_name)
+        if cached is not None:
+            return cached
+
+        response = self.llm.generate(
+            system_prompt=system_prompt,
+            user_input=user_input,
+            tools=tools,
+            agent_name=agent_name,
+        )
+        if response:
+            self.store.set(key, response)
+        return response
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        agenerate = getattr(self.llm, "agenerate", None)
+        if agenerate is None:
+            return await asyncio.to_thread(self.generate, system_prompt, user_input, tools=tools, agent_name=agent_name)
+
+        key = self.cache_key(system_prompt=system_prompt, user_input=user_input, tools=tools)
+        cached = self._lookup(key, agent_name)
+        if cached is not None:
+            return cached
+
+        response = await agenerate(
+            system_prompt=system_prompt,
+            user_input=user_input,
+            tools=tools,
+            agent_name=agent_name,
+        )
+        if response:
+            self.store.set(key, response)
+        return response
+
+    def _lookup(self, key: str, agent_name: str | None) -> str | None:
+        cached = self.store.get(key)
+        with self._stats_lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if cached is not None:
+            print(f"[LLM_CACHE] Hit for {agent_name or 'llm'} ({key[:12]}).")
+        return cached
+
+    def cache_key(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+    ) -> str:
+        material = json.dumps(
+            {
+                "model": self.model,
+                "system_prompt": system_prompt,
+                "user_input": user_input,
+                "tools": tools or [],
+            },
+            sort_keys=True,
+            ensure_ascii=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @property
+    def metrics(self) -> MetricsRecorder | None:
+        return getattr(self.llm, "metrics", None)
+
+    @metrics.setter
+    def metrics(self, metrics: MetricsRecorder | None) -> None:
+        self.llm.metrics = metrics
+
+    @property
+    def token_budget(self) -> TokenBudget | None:
+        return getattr(self.llm, "token_budget", None)
+
+    @token_budget.setter
+    def token_budget(self, token_budget: TokenBudget | None) -> None:
+        self.llm.token_budget = token_budget
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses}
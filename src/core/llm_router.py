@@ -0,0 +1,202 @@
+import asyncio
+import threading
+from typing import Any
+from typing import Callable
+from typing import Iterator
+
+from .llm import AsyncLLM
+from .llm import LLMProtocol
+from .metrics import MetricsRecorder
+from .token_budget import TokenBudget
+
+# The Researcher's helper calls (scope extraction and query lists) and the
+# DevOps hand-off run on the small model; every other agent keeps the
+# default model.
+DEFAULT_ROUTES = {
+    "researcher.extract_scope": "gpt-4o-mini",
+    "researcher.strategic_queries": "gpt-4o-mini",
+    "researcher.knowledge_queries": "gpt-4o-mini",
+    "devops": "gpt-4o-mini",
+}
+DEFAULT_ESCALATIONS = {"gpt-4o-mini": "gpt-4o"}
+
+
+class RoutingLLM:
+    """LLMProtocol that sends each call to the model configured for its `agent_name`.
+
+    Routes are looked up by `agent_name`, then by the part before the first
+    "." (so "researcher" covers every researcher sub-call), then fall back to
+    `default_model`. When a call raises or returns an empty response, it is
+    retried on `escalations[model]`, following the chain until a model has no
+    escalation. Streamed calls escalate only if no chunk was yielded yet.
+    """
+
+    def __init__(
+        self,
+        routes: dict[str, str] | None = None,
+        default_model: str = "gpt-4o",
+        escalations: dict[str, str] | None = None,
+        llm_factory: Callable[[str], LLMProtocol] | None = None,
+    ) -> None:
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.default_model = default_model
+        self.escalations = dict(DEFAULT_ESCALATIONS if escalations is None else escalations)
+        self.llm_factory = llm_factory or _build_llm
+        self._metrics: MetricsRecorder | None = None
+        self._token_budget: TokenBudget | None = None
+        self._llms: dict[str, LLMProtocol] = {}
+        self._llms_lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        # Identifies the whole routing table, e.g. for CachingLLM's cache key.
+        routes = ",".join(f"{name}={model}" for name, model in sorted(self.routes.items()))
+        return f"{self.default_model}[{routes}]"
+
+    @property
+    def metrics(self) -> MetricsRecorder | None:
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: MetricsRecorder | None) -> None:
+        self._metrics = metrics
+        with self._llms_lock:
+            for llm in self._llms.values():
+                llm.metrics = metrics
+
+    @property
+    def token_budget(self) -> TokenBudget | None:
+        return self._token_budget
+
+    @token_budget.setter
+    def token_budget(self, token_budget: TokenBudget | None) -> None:
+        self._token_budget = token_budget
+        with self._llms_lock:
+            for llm in self._llms.values():
+                llm.token_budget = token_budget
+
+    @property
+    def token_usage(self) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        with self._llms_lock:
+            llms = list(self._llms.values())
+        for llm in llms:
+            for name, count in (getattr(llm, "token_usage", None) or {}).items():
+                totals[name] = totals.get(name, 0) + count
+        return totals
+
+    def model_for(self, agent_name: str | None) -> str:
+        name = agent_name or ""
+        if name in self.routes:
+            return self.routes[name]
+        return self.routes.get(name.split(".", 1)[0], self.default_model)
+
+    def model_chain(self, agent_name: str | None) -> list[str]:
+        """The routed model followed by its escalations, without repeats."""
+        models = [self.model_for(agent_name)]
+        while models[-1] in self.escalations and self.escalations[models[-1]] not in models:
+            models.append(self.escalations[models[-1]])
+        return models
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        models = self.model_chain(agent_name)
+        for index, model in enumerate(models):
+            is_last = index == len(models) - 1
+            try:
+                response = self._llm(model).generate(
+                    system_prompt=system_prompt,
+                    user_input=user_input,
+                    tools=tools,
+                    agent_name=agent_name,
+                )
+            except Exception as exc:  # noqa: BLE001
+                if is_last:
+                    raise
+                self._log_escalation(agent_name, model, models[index + 1], str(exc))
+                continue
+            if response.strip() or is_last:
+                return response
+            self._log_escalation(agent_name, model, models[index + 1], "empty response")
+        raise AssertionError("unreachable")
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        request = {"system_prompt": system_prompt, "user_input": user_input, "tools": tools, "agent_name": agent_name}
+        models = self.model_chain(agent_name)
+        for index, model in enumerate(models):
+            is_last = index == len(models) - 1
+            llm = self._llm(model)
+            try:
+                agenerate = getattr(llm, "agenerate", None)
+                if agenerate is not None:
+                    response = await agenerate(**request)
+                else:
+                    response = await asyncio.to_thread(llm.generate, **request)
+            except Exception as exc:  # noqa: BLE001
+                if is_last:
+                    raise
+                self._log_escalation(agent_name, model, models[index + 1], str(exc))
+                continue
+            if response.strip() or is_last:
+                return response
+            self._log_escalation(agent_name, model, models[index + 1], "empty response")
+        raise AssertionError("unreachable")
+
+    def generate_stream(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> Iterator[str]:
+        models = self.model_chain(agent_name)
+        for index, model in enumerate(models):
+            generate_stream = getattr(self._llm(model), "generate_stream", None)
+            if generate_stream is None:
+                yield self.generate(system_prompt, user_input, tools=tools, agent_name=agent_name)
+                return
+            started = False
+            try:
+                for chunk in generate_stream(
+                    system_prompt=system_prompt,
+                    user_input=user_input,
+                    tools=tools,
+                    agent_name=agent_name,
+                ):
+                    started = True
+                    yield chunk
+                return
+            except Exception as exc:  # noqa: BLE001
+                if started or index == len(models) - 1:
+                    raise
+                self._log_escalation(agent_name, model, models[index + 1], str(exc))
+
+    def _llm(self, model: str) -> LLMProtocol:
+        with self._llms_lock:
+            llm = self._llms.get(model)
+            if llm is None:
+                llm = self.llm_factory(model)
+                llm.metrics = self._metrics
+                llm.token_budget = self._token_budget
+                self._llms[model] = llm
+            return llm
+
+    @staticmethod
+    def _log_escalation(agent_name: str | None, model: str, next_model: str, reason: str) -> None:
+        print(f"[LLM_ROUTER] {agent_name or 'llm'} failed on {model} ({reason}); escalating to {next_model}.")
+
+
+def _build_llm(model: str) -> AsyncLLM:
+    # AsyncLLM, so RoutingLLM.agenerate does real async I/O instead of a worker thread per call.
+    return AsyncLLM(model=model)
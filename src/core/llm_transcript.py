@@ -0,0 +1,202 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+from typing import IO
+from typing import Iterator
+
+from .llm import LLMProtocol
+from .metrics import MetricsRecorder
+from .metrics import track_llm_call
+from .mock_llm import MockLLM
+from .token_budget import TokenBudget
+
+
+def open_transcript(path: Path | str, mode: str) -> IO[str]:
+    """Open a JSONL transcript as text, gzip-compressed when the path ends in `.gz`."""
+    transcript_path = Path(path)
+    if transcript_path.suffix == ".gz":
+        return gzip.open(transcript_path, f"{mode}t", encoding="utf-8")
+    return open(transcript_path, mode, encoding="utf-8")
+
+
+def load_transcript(path: Path | str) -> list[dict[str, Any]]:
+    with open_transcript(path, "r") as transcript_file:
+        return [json.loads(line) for line in transcript_file if line.strip()]
+
+
+class RecordingLLM:
+    """LLMProtocol wrapper that appends every call and its response to a JSONL transcript.
+
+    Each line holds `agent_name`, the prompts, `tools`, the `response` and the
+    call's `latency_seconds`. Calls that raise are not recorded. Streaming
+    calls are recorded once the stream is exhausted.
+    """
+
+    def __init__(self, llm: LLMProtocol, path: Path | str) -> None:
+        self.llm = llm
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+
+    @property
+    def metrics(self) -> MetricsRecorder | None:
+        return getattr(self.llm, "metrics", None)
+
+    @metrics.setter
+    def metrics(self, metrics: MetricsRecorder | None) -> None:
+        self.llm.metrics = metrics
+
+    @property
+    def token_budget(self) -> TokenBudget | None:
+        return getattr(self.llm, "token_budget", None)
+
+    @token_budget.setter
+    def token_budget(self, token_budget: TokenBudget | None) -> None:
+        self.llm.token_budget = token_budget
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        started = time.perf_counter()
+        response = self.llm.generate(
+            system_prompt=system_prompt,
+            user_input=user_input,
+            tools=tools,
+            agent_name=agent_name,
+        )
+        self._append(system_prompt, user_input, tools, agent_name, response, time.perf_counter() - started)
+        return response
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        agenerate = getattr(self.llm, "agenerate", None)
+        if agenerate is None:
+            return await asyncio.to_thread(self.generate, system_prompt, user_input, tools=tools, agent_name=agent_name)
+
+        started = time.perf_counter()
+        response = await agenerate(
+            system_prompt=system_prompt,
+            user_input=user_input,
+            tools=tools,
+            agent_name=agent_name,
+        )
+        self._append(system_prompt, user_input, tools, agent_name, response, time.perf_counter() - started)
+        return response
+
+    def generate_stream(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> Iterator[str]:
+        generate_stream = getattr(self.llm, "generate_stream", None)
+        if generate_stream is None:
+            yield self.generate(system_prompt, user_input, tools=tools, agent_name=agent_name)
+            return
+
+        started = time.perf_counter()
+        chunks: list[str] = []
+        for chunk in generate_stream(
+            system_prompt=system_prompt,
+            user_input=user_input,
+            tools=tools,
+            agent_name=agent_name,
+        ):
+            chunks.append(chunk)
+            yield chunk
+        self._append(system_prompt, user_input, tools, agent_name, "".join(chunks), time.perf_counter() - started)
+
+    def _append(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None,
+        agent_name: str | None,
+        response: str,
+        latency_seconds: float,
+    ) -> None:
+        record = {
+            "agent_name": agent_name,
+            "system_prompt": system_prompt,
+            "user_input": user_input,
+            "tools": tools,
+            "response": response,
+            "latency_seconds": round(latency_seconds, 4),
+        }
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._write_lock, open_transcript(self.path, "a") as transcript_file:
+            transcript_file.write(line)
+
+
+class ReplayLLM(MockLLM):
+    """MockLLM that serves the responses of a recorded transcript, per agent, in recorded order.
+
+    With `replay_latency=True` each call sleeps for its recorded latency, so
+    timings resemble the recorded run. With `strict=True` a call whose prompts
+    differ from the recorded ones fails instead of silently replaying.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        replay_latency: bool = False,
+        strict: bool = False,
+        stream_chunk_size: int = 64,
+        metrics: MetricsRecorder | None = None,
+    ) -> None:
+        super().__init__(stream_chunk_size=stream_chunk_size, metrics=metrics)
+        self.replay_latency = replay_latency
+        self.strict = strict
+        self._records_by_agent: dict[str | None, deque[dict[str, Any]]] = {}
+        for record in load_transcript(path):
+            self._records_by_agent.setdefault(record.get("agent_name"), deque()).append(record)
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> str:
+        self.calls.append(
+            {
+                "agent_name": agent_name,
+                "system_prompt": system_prompt,
+                "user_input": user_input,
+                "tools": tools,
+            }
+        )
+        if self.token_budget is not None:
+            self.token_budget.check(agent_name, system_prompt, user_input, self.metrics)
+        with track_llm_call(self.metrics, agent_name):
+            record = self._next_record(agent_name)
+            if self.strict and (record["system_prompt"], record["user_input"]) != (system_prompt, user_input):
+                raise AssertionError(f"ReplayLLM call for agent_name={agent_name!r} differs from the recorded prompts.")
+            if self.replay_latency:
+                time.sleep(record.get("latency_seconds") or 0.0)
+            return record["response"]
+
+    def _next_record(self, agent_name: str | None) -> dict[str, Any]:
+        records = self._records_by_agent.get(agent_name)
+        if records:
+            return records.popleft()
+        raise AssertionError(
+            "ReplayLLM received more calls than the transcript recorded. "
+            f"agent_name={agent_name!r}, recorded_agents={sorted(map(str, self._records_by_agent))}"
+        )
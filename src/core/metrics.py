@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+
+@dataclass
+class LLMCallMetrics:
+    """Token counts of one LLM call, filled in by the client once the response arrives."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+
+
+@dataclass
+class _CallStats:
+    calls: int = 0
+    failed_calls: int = 0
+    wall_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    json_retries: int = 0
+    budget_warnings: int = 0
+    validations: int = 0
+    validation_seconds: float = 0.0
+
+
+class MetricsRecorder:
+    """Thread-safe counters for LLM calls, JSON retries and stage timings.
+
+    LLM metrics are keyed by the `agent_name` passed to the LLM, i.e. the
+    agent's `role_name` or a sub-call such as `researcher.extract_scope`.
+    `export` writes a JSON snapshot, or Prometheus text exposition format when
+    the path ends in `.prom`.
+    """
+
+    PROMETHEUS_PREFIX = "agentic"
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _CallStats] = {}
+        self._stage_seconds: dict[str, float] = {}
+        self._stage_cpu_seconds: dict[str, float] = {}
+        self._payload_tokens: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_llm_call(
+        self,
+        name: str,
+        wall_seconds: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        failed: bool = False,
+        cached_input_tokens: int = 0,
+    ) -> None:
+        with self._lock:
+            stats = self._calls.setdefault(name, _CallStats())
+            stats.calls += 1
+            stats.failed_calls += int(failed)
+            stats.wall_seconds += wall_seconds
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cached_input_tokens += cached_input_tokens
+
+    def record_retry(self, name: str) -> None:
+        with self._lock:
+            self._calls.setdefault(name, _CallStats()).json_retries += 1
+
+    def record_budget_warning(self, name: str) -> None:
+        with self._lock:
+            self._calls.setdefault(name, _CallStats()).budget_warnings += 1
+
+    def record_validation(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._calls.setdefault(name, _CallStats())
+            stats.validations += 1
+            stats.validation_seconds += seconds
+
+    def record_stage(self, name: str, seconds: float, cpu_seconds: float | None = None) -> None:
+        with self._lock:
+            self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + seconds
+            if cpu_seconds is not None:
+                self._stage_cpu_seconds[name] = self._stage_cpu_seconds.get(name, 0.0) + cpu_seconds
+
+    def record_payload(self, stage_name: str, tokens: int) -> None:
+        """Add the estimated tokens of an input payload the orchestrator built for `stage_name`."""
+        with self._lock:
+            self._payload_tokens[stage_name] = self._payload_tokens.get(stage_name, 0) + tokens
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            calls = {name: asdict(stats) for name, stats in sorted(self._calls.items())}
+            stages = dict(self._stage_seconds)
+            stage_cpu = dict(self._stage_cpu_seconds)
+            payload_tokens = dict(self._payload_tokens)
+
+        totals = {
+            key: sum(stats[key] for stats in calls.values())
+            for key in (
+                "calls",
+                "failed_calls",
+                "wall_seconds",
+                "input_tokens",
+                "output_tokens",
+                "cached_input_tokens",
+                "json_retries",
+                "budget_warnings",
+            )
+        }
+        for stats in (*calls.values(), totals):
+            stats["cached_token_ratio"] = _cached_token_ratio(stats)
+        return {
+            "llm_calls": calls,
+            "stage_seconds": stages,
+            "stage_cpu_seconds": stage_cpu,
+            "payload_tokens": payload_tokens,
+            "totals": totals,
+        }
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines: list[str] = []
+        metric_fields = (
+            ("llm_calls_total", "calls", "counter", "LLM calls."),
+            ("llm_failed_calls_total", "failed_calls", "counter", "LLM calls that raised."),
+            ("llm_call_seconds_total", "wall_seconds", "counter", "Wall time spent in LLM calls."),
+            ("llm_input_tokens_total", "input_tokens", "counter", "Input tokens reported by the API."),
+            ("llm_output_tokens_total", "output_tokens", "counter", "Output tokens reported by the API."),
+            ("llm_cached_input_tokens_total", "cached_input_tokens", "counter", "Input tokens served from the prompt cache."),
+            ("llm_cached_token_ratio", "cached_token_ratio", "gauge", "Share of input tokens served from the prompt cache."),
+            ("json_retries_total", "json_retries", "counter", "Corrected-JSON retries after invalid output."),
+            ("token_budget_warnings_total", "budget_warnings", "counter", "LLM calls whose prompt exceeded the token budget."),
+            ("validation_seconds_total", "validation_seconds", "counter", "Time spent parsing, repairing and validating output."),
+        )
+        for metric_name, field_name, metric_type, help_text in metric_fields:
+            full_name = f"{self.PROMETHEUS_PREFIX}_{metric_name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for agent, stats in snapshot["llm_calls"].items():
+                lines.append(f'{full_name}{{agent="{_escape_label(agent)}"}} {stats[field_name]}')
+
+        stage_fields = (
+            ("stage_seconds_total", "stage_seconds", "Wall time spent in pipeline stages."),
+            ("stage_cpu_seconds_total", "stage_cpu_seconds", "CPU time of the thread running each pipeline stage."),
+            ("payload_tokens_total", "payload_tokens", "Estimated tokens of the input payloads built for each stage."),
+        )
+        for metric_name, snapshot_key, help_text in stage_fields:
+            full_name = f"{self.PROMETHEUS_PREFIX}_{metric_name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} counter")
+            for stage, value in snapshot[snapshot_key].items():
+                lines.append(f'{full_name}{{stage="{_escape_label(stage)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Path | str) -> Path:
+        target_path = Path(path)
+        if target_path.suffix == ".prom":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = target_path.with_name(f".{target_path.name}.{uuid.uuid4().hex}.partial")
+        partial_path.write_text(content, encoding="utf-8")
+        partial_path.replace(target_path)
+        return target_path
+
+
+@contextmanager
+def track_llm_call(metrics: MetricsRecorder | None, agent_name: str | None) -> Iterator[LLMCallMetrics]:
+    """Time the enclosed LLM call and record it on `metrics` (a no-op when it is None)."""
+    call = LLMCallMetrics()
+    started = time.perf_counter()
+    failed = True
+    try:
+        yield call
+        failed = False
+    finally:
+        if metrics is not None:
+            metrics.record_llm_call(
+                agent_name or "llm",
+                time.perf_counter() - started,
+                input_tokens=call.input_tokens,
+                output_tokens=call.output_tokens,
+                failed=failed,
+                cached_input_tokens=call.cached_input_tokens,
+            )
+
+
+def _cached_token_ratio(stats: dict[str, object]) -> float:
+    input_tokens = stats["input_tokens"]
+    return round(stats["cached_input_tokens"] / input_tokens, 4) if input_tokens else 0.0
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
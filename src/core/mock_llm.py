@@ -1,5 +1,11 @@
+import time
 from collections import deque
 from typing import Any
+from typing import Iterator
+
+from .metrics import MetricsRecorder
+from .metrics import track_llm_call
+from .token_budget import TokenBudget
 
 
 class MockLLM:
@@ -10,8 +16,16 @@ class MockLLM:
         responses: list[str] | dict[str, list[str]] | None = None,
         *,
         default_responses: list[str] | None = None,
+        stream_chunk_size: int = 64,
+        metrics: MetricsRecorder | None = None,
+        latency_seconds: float = 0.0,
+        token_budget: TokenBudget | None = None,
     ) -> None:
+        self.metrics = metrics
+        self.token_budget = token_budget
+        self.latency_seconds = latency_seconds
         self.calls: list[dict[str, object]] = []
+        self.stream_chunk_size = stream_chunk_size
         self._default_responses = deque(default_responses or [])
         self._responses_by_agent: dict[str, deque[str]] = {}
 
@@ -38,7 +52,30 @@ class MockLLM:
                 "tools": tools,
             }
         )
+        if self.token_budget is not None:
+            self.token_budget.check(agent_name, system_prompt, user_input, self.metrics)
+        with track_llm_call(self.metrics, agent_name):
+            if self.latency_seconds > 0:
+                time.sleep(self.latency_seconds)
+            return self._next_response(agent_name)
+
+    def generate_stream(
+        self,
+        system_prompt: str,
+        user_input: str,
+        tools: list[dict[str, Any]] | None = None,
+        agent_name: str | None = None,
+    ) -> Iterator[str]:
+        response = self.generate(
+            system_prompt=system_prompt,
+            user_input=user_input,
+            tools=tools,
+            agent_name=agent_name,
+        )
+        for start in range(0, len(response), self.stream_chunk_size):
+            yield response[start : start + self.stream_chunk_size]
 
+    def _next_response(self, agent_name: str | None) -> str:
         if agent_name and agent_name in self._responses_by_agent:
             responses = self._responses_by_agent[agent_name]
             if responses:
@@ -0,0 +1,56 @@
+import importlib.util
+import os
+import threading
+
+import httpx
+from openai import AsyncOpenAI
+from openai import OpenAI
+
+# Enough keep-alive connections for a batch worker's parallel stages, image
+# jobs and web searches; idle connections stay warm between pipeline stages.
+DEFAULT_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120.0)
+DEFAULT_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+_shared_clients: dict[tuple[int, str], OpenAI] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def shared_openai_client() -> OpenAI:
+    """Process-wide OpenAI client, so LLM, WebSearchService and ImageGenerator share one connection pool.
+
+    Clients are keyed by process id and API key: a forked batch worker builds
+    its own instead of reusing the parent's sockets.
+    """
+    api_key = _require_api_key()
+    key = (os.getpid(), api_key)
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=api_key, http_client=build_http_client())
+            _shared_clients[key] = client
+        return client
+
+
+def build_http_client() -> httpx.Client:
+    return httpx.Client(limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=http2_available())
+
+
+def build_async_openai_client() -> AsyncOpenAI:
+    # httpx.AsyncClient connections belong to the event loop that opened them,
+    # so async clients are not shared process-wide.
+    return AsyncOpenAI(
+        api_key=_require_api_key(),
+        http_client=httpx.AsyncClient(limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=http2_available()),
+    )
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs `h2` (in requirements.txt); without it httpx stays on HTTP/1.1."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _require_api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is not set.")
+    return api_key
@@ -1,3 +1,4 @@
 from .orchestrator import Orchestrator
+from .workspace import RunWorkspace
 
-__all__ = ["Orchestrator"]
+__all__ = ["Orchestrator", "RunWorkspace"]
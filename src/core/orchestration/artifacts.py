@@ -0,0 +1,26 @@
+import json
+from typing import Any
+
+
+class JSONArtifact:
+    """A validated stage artifact held as its parsed JSON value.
+
+    Stages read `value` directly. The pretty-printed `text` is only built when
+    something needs the serialized form, and is then cached; the value must
+    not be mutated after it is wrapped.
+    """
+
+    __slots__ = ("value", "_text")
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        self._text: str | None = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = json.dumps(self.value, indent=2)
+        return self._text
+
+    def __str__(self) -> str:
+        return self.text
@@ -0,0 +1,205 @@
+import contextlib
+import copy
+import json
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Callable
+from typing import TextIO
+
+from ..llm_router import RoutingLLM
+from ..rate_limiter import configure_rate_limiter
+from ..web_search import WebSearchService
+from ..web_search_cache import CachingWebSearchService
+from .orchestrator import Orchestrator
+
+_SITE_ID_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass(frozen=True)
+class BatchSite:
+    site_id: str
+    requirement: str
+
+
+@dataclass
+class BatchSiteResult:
+    site_id: str
+    status: str
+    latency_seconds: float
+    site_dir: str
+    token_usage: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+
+
+class _LockedLog:
+    """A run.log writer that several orchestrator threads can print to at once.
+
+    CPython's TextIOWrapper is not thread-safe, so concurrent prints to the
+    bare file could interleave partial writes and leave stray bytes in it.
+    """
+
+    def __init__(self, log_file: TextIO) -> None:
+        self._log_file = log_file
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            return self._log_file.write(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._log_file.flush()
+
+
+def load_batch_requirements(path: Path | str) -> list[BatchSite]:
+    """Read one site per JSONL line: `{"id": "...", "requirement": "..."}` (`id` is optional)."""
+    sites: list[BatchSite] = []
+    seen_ids: set[str] = set()
+    for line_number, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        requirement = entry.get("requirement") if isinstance(entry, dict) else None
+        if not isinstance(requirement, str) or not requirement.strip():
+            raise ValueError(f"Line {line_number} of {path} has no 'requirement' string.")
+
+        site_id = _SITE_ID_UNSAFE.sub("-", str(entry.get("id") or f"site-{len(sites) + 1:04d}")).strip("-.")
+        if not site_id or site_id in seen_ids:
+            raise ValueError(f"Line {line_number} of {path} has an empty or duplicate site id '{site_id}'.")
+        seen_ids.add(site_id)
+        sites.append(BatchSite(site_id=site_id, requirement=requirement.strip()))
+    return sites
+
+
+def default_orchestrator_factory(
+    search_cache_path: Path | str | None = None,
+    route_models: bool = False,
+) -> Orchestrator:
+    """Batch orchestrator; with `search_cache_path`, workers share one on-disk web search cache.
+
+    `route_models` sends helper calls to a smaller model through `RoutingLLM`.
+    """
+    web_search_service = None
+    if search_cache_path is not None:
+        web_search_service = CachingWebSearchService(WebSearchService(), cache_path=search_cache_path)
+    return Orchestrator(
+        llm=RoutingLLM() if route_models else None,
+        interactive=False,
+        web_search_service=web_search_service,
+    )
+
+
+def run_batch(
+    sites: list[BatchSite],
+    output_dir: Path | str,
+    max_workers: int = 4,
+    orchestrator_factory: Callable[[], Orchestrator] = default_orchestrator_factory,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+) -> list[BatchSiteResult]:
+    """Build every site in its own directory under `output_dir`, at most `max_workers` at a time.
+
+    Sites run in worker processes so each one can capture the orchestrator's
+    output in its own `run.log`; every orchestrator publishes into its site's
+    directory through a `RunWorkspace` rooted there. `orchestrator_factory`
+    must be picklable (a module-level function or a partial of one).
+
+    `requests_per_minute` and `tokens_per_minute` are the account-wide OpenAI
+    budgets; each worker process rate-limits its calls to an equal share.
+    """
+    output_root = Path(output_dir).resolve()
+    output_root.mkdir(parents=True, exist_ok=True)
+    results: dict[str, BatchSiteResult] = {}
+    worker_count = max(1, min(max_workers, len(sites)))
+    rate_limits = (
+        requests_per_minute / worker_count if requests_per_minute else None,
+        tokens_per_minute / worker_count if tokens_per_minute else None,
+    )
+
+    with ProcessPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(_build_site, site, output_root / site.site_id, orchestrator_factory, rate_limits): site
+            for site in sites
+        }
+        for future in as_completed(futures):
+            site = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:  # noqa: BLE001
+                result = BatchSiteResult(
+                    site_id=site.site_id,
+                    status="failed",
+                    latency_seconds=0.0,
+                    site_dir=str(output_root / site.site_id),
+                    error=f"Worker process failed: {exc}",
+                )
+            results[site.site_id] = result
+            print(f"[BATCH] {result.site_id}: {result.status} in {result.latency_seconds:.1f}s ({len(results)}/{len(sites)})")
+
+    return [results[site.site_id] for site in sites]
+
+
+def write_batch_report(results: list[BatchSiteResult], path: Path | str, wall_time_seconds: float) -> dict[str, object]:
+    token_totals: dict[str, int] = {}
+    for result in results:
+        for name, count in result.token_usage.items():
+            token_totals[name] = token_totals.get(name, 0) + count
+
+    latencies = sorted(result.latency_seconds for result in results)
+    report = {
+        "summary": {
+            "sites": len(results),
+            "succeeded": sum(result.status == "succeeded" for result in results),
+            "failed": sum(result.status != "succeeded" for result in results),
+            "wall_time_seconds": round(wall_time_seconds, 3),
+            "median_latency_seconds": latencies[len(latencies) // 2] if latencies else 0.0,
+            "max_latency_seconds": latencies[-1] if latencies else 0.0,
+            "token_usage": token_totals,
+        },
+        "sites": [asdict(result) for result in results],
+    }
+    report_path = Path(path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+def _build_site(
+    site: BatchSite,
+    site_dir: Path,
+    orchestrator_factory: Callable[[], Orchestrator],
+    rate_limits: tuple[float | None, float | None] = (None, None),
+) -> BatchSiteResult:
+    site_dir.mkdir(parents=True, exist_ok=True)
+    if any(rate_limits):
+        configure_rate_limiter(*rate_limits)
+    started = time.perf_counter()
+    orchestrator: Orchestrator | None = None
+    log_path = site_dir / "run.log"
+    with open(log_path, "w", encoding="utf-8") as log_file, contextlib.redirect_stdout(_LockedLog(log_file)):
+        try:
+            orchestrator = orchestrator_factory()
+            # Keep the factory's workspace settings (per_run, keep_runs, cleanup); only move the root.
+            orchestrator.workspace = copy.copy(orchestrator.workspace)
+            orchestrator.workspace.root = site_dir
+            output = orchestrator.run(site.requirement)
+            error = output if output.startswith("ERROR") else None
+        except Exception as exc:  # noqa: BLE001
+            error = f"{type(exc).__name__}: {exc}"
+
+    token_usage = getattr(orchestrator.llm, "token_usage", None) if orchestrator is not None else None
+    return BatchSiteResult(
+        site_id=site.site_id,
+        status="failed" if error else "succeeded",
+        latency_seconds=round(time.perf_counter() - started, 3),
+        site_dir=str(site_dir),
+        token_usage=dict(token_usage) if isinstance(token_usage, dict) else {},
+        error=error,
+    )
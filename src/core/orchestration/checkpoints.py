@@ -0,0 +1,160 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from .artifacts import JSONArtifact
+
+
+class RunCheckpoint:
+    """Persists the validated artifacts of one pipeline run for later resumption.
+
+    Artifact values are stored content-addressed under `<root>/<run_id>/artifacts/`
+    and `manifest.json` records, for every stage that succeeded, the hashes of
+    the inputs it consumed and the outputs it produced, plus the content hash
+    of every file its outputs point at. A stage can be restored instead of
+    re-run when its current input hashes match the recorded ones and those
+    files are unchanged.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, root: Path | str, run_id: str | None = None) -> None:
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.directory = Path(root) / self.run_id
+        self._artifacts_dir = self.directory / "artifacts"
+        self._manifest_path = self.directory / self.MANIFEST_NAME
+        self._lock = threading.Lock()
+        self._initial: dict[str, str] = {}
+        self._stages: dict[str, dict[str, dict[str, str]]] = {}
+        self._current: dict[str, str] = {}
+
+    @classmethod
+    def create(cls, root: Path | str) -> "RunCheckpoint":
+        checkpoint = cls(root)
+        checkpoint._artifacts_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint._write_manifest()
+        return checkpoint
+
+    @classmethod
+    def open(cls, root: Path | str, run_id: str) -> "RunCheckpoint":
+        checkpoint = cls(root, run_id=run_id)
+        if not checkpoint._manifest_path.exists():
+            raise FileNotFoundError(f"No checkpoint manifest for run '{run_id}' in {checkpoint.directory}")
+        manifest = json.loads(checkpoint._manifest_path.read_text(encoding="utf-8"))
+        checkpoint._initial = manifest.get("initial_artifacts", {})
+        checkpoint._stages = manifest.get("stages", {})
+        checkpoint._current = dict(checkpoint._initial)
+        return checkpoint
+
+    def save_initial(self, name: str, value: object) -> None:
+        digest = self._store(value)
+        with self._lock:
+            self._initial[name] = digest
+            self._current[name] = digest
+            self._write_manifest()
+
+    def load_initial(self, name: str) -> object:
+        with self._lock:
+            digest = self._initial.get(name)
+        if digest is None:
+            raise KeyError(f"Checkpoint for run '{self.run_id}' has no initial artifact '{name}'")
+        return self._load(digest)
+
+    def input_hashes(self, names: tuple[str, ...]) -> dict[str, str]:
+        with self._lock:
+            return {name: self._current.get(name, "") for name in names}
+
+    def record_stage(self, stage_name: str, input_hashes: dict[str, str], outputs: dict[str, object]) -> None:
+        output_hashes = {name: self._store(value) for name, value in outputs.items()}
+        file_hashes = {str(path): _file_digest(path) for value in outputs.values() for path in _output_paths(value)}
+        with self._lock:
+            self._stages[stage_name] = {"inputs": input_hashes, "outputs": output_hashes, "files": file_hashes}
+            self._current.update(output_hashes)
+            self._write_manifest()
+
+    def restore_stage(self, stage_name: str, input_hashes: dict[str, str]) -> dict[str, object] | None:
+        """Return the recorded outputs of `stage_name` if it can be skipped, else None."""
+        with self._lock:
+            record = self._stages.get(stage_name)
+        if record is None or record["inputs"] != input_hashes:
+            return None
+
+        # Output files must still hold what this run wrote, not another run's files at the same path.
+        file_hashes = record.get("files", {})
+        outputs: dict[str, object] = {}
+        for name, digest in record["outputs"].items():
+            if not self._blob_path(digest).exists():
+                return None
+            value = self._load(digest)
+            if not all(file_hashes.get(str(path)) == _file_digest(path) for path in _output_paths(value)):
+                return None
+            outputs[name] = value
+
+        with self._lock:
+            self._current.update(record["outputs"])
+        return outputs
+
+    def _store(self, value: object) -> str:
+        encoded = json.dumps(_encode_value(value), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            self._artifacts_dir.mkdir(parents=True, exist_ok=True)
+            partial_path = blob_path.with_name(f".{blob_path.name}.{uuid.uuid4().hex}.partial")
+            partial_path.write_text(encoded, encoding="utf-8")
+            partial_path.replace(blob_path)
+        return digest
+
+    def _load(self, digest: str) -> object:
+        return _decode_value(json.loads(self._blob_path(digest).read_text(encoding="utf-8")))
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._artifacts_dir / f"{digest}.json"
+
+    def _write_manifest(self) -> None:
+        manifest = {"run_id": self.run_id, "initial_artifacts": self._initial, "stages": self._stages}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        partial_path = self._manifest_path.with_name(f".{self.MANIFEST_NAME}.partial")
+        partial_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        partial_path.replace(self._manifest_path)
+
+
+def _output_paths(value: object) -> list[Path]:
+    if isinstance(value, Path):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, Path)]
+    return []
+
+
+def _file_digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _encode_value(value: object) -> dict[str, object]:
+    if isinstance(value, JSONArtifact):
+        return {"kind": "json", "value": value.value}
+    if isinstance(value, Path):
+        return {"kind": "path", "value": str(value)}
+    if isinstance(value, list) and all(isinstance(item, Path) for item in value):
+        return {"kind": "paths", "value": [str(item) for item in value]}
+    if value is None or isinstance(value, str):
+        return {"kind": "text", "value": value}
+    raise TypeError(f"Cannot checkpoint artifact of type {type(value).__name__}")
+
+
+def _decode_value(payload: dict[str, object]) -> object:
+    kind = payload["kind"]
+    if kind == "json":
+        return JSONArtifact(payload["value"])
+    if kind == "path":
+        return Path(str(payload["value"]))
+    if kind == "paths":
+        return [Path(str(item)) for item in payload["value"]]
+    return payload["value"]
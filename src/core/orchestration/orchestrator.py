@@ -1,6 +1,10 @@
+import asyncio
 import json
 import re
+import threading
+import time
 from dataclasses import dataclass, field
+from functools import partial
 from html.parser import HTMLParser
 from pathlib import Path
 
@@ -13,17 +17,49 @@ from src.agents.planner import PlannerAgent
 from src.agents.product_manager import ProductManagerAgent
 from src.agents.qa import QAAgent
 from src.agents.researcher import ResearcherAgent
+from src.core.base_agent import BaseAgent
+from src.core.concurrency import TaskOutcome
+from src.core.concurrency import run_concurrently
 from src.core.image_generator import ImageGenerator
 from src.core.llm import LLM
 from src.core.llm import LLMProtocol
+from src.core.metrics import MetricsRecorder
+from src.core.rate_limiter import priority_lane
+from src.core.orchestration.artifacts import JSONArtifact
+from src.core.orchestration.checkpoints import RunCheckpoint
+from src.core.orchestration.payloads import PayloadEncoder
+from src.core.orchestration.stage_graph import PipelineStage
+from src.core.orchestration.stage_graph import StageGraph
+from src.core.orchestration.workspace import RunWorkspace
+from src.core.orchestration.workspace import StagedWorkspace
 from src.core.schema_validator import SchemaValidationError
 from src.core.schema_validator import validate_schema
 from src.core.schemas import ARCHITECTURE_SPEC_SCHEMA
 from src.core.schemas import DESIGN_SPEC_SCHEMA
 from src.core.schemas import DEVELOPMENT_TASKS_SCHEMA
+from src.core.schemas import GENERATED_FILES_PATCH_SCHEMA
 from src.core.schemas import GENERATED_FILES_SCHEMA
 from src.core.schemas import RESEARCH_OUTPUT_SCHEMA
 from src.core.schemas import SITE_STRUCTURE_SCHEMA
+from src.core.token_budget import TokenBudget
+from src.core.token_budget import count_tokens
+from src.core.token_budget import drop_unchanged_files
+from src.core.token_budget import truncate_log
+from src.core.web_search import WebSearchService
+
+
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+# Free-text payload entries that are truncated first when a payload is over its token budget.
+_LOG_PAYLOAD_ENTRIES = ("qa_feedback", "deterministic_validation")
+# Stages that can work from the files their feedback mentions. QA judges the
+# whole site, so it is never shown a subset.
+_FILE_OMITTING_STAGES = ("DeveloperAgentRevision", "DevOpsAgent")
+
+_NON_INTERACTIVE_CLARIFICATION = (
+    "No further details are available. Make reasonable assumptions for every open "
+    "question, state them in the document, and finalize the requirements."
+)
 
 
 @dataclass
@@ -31,18 +67,114 @@ class _RenderedHTMLDocument:
     path: str
     title_text: str
     visible_text: str
+    normalized_title: str = ""
+    normalized_text: str = ""
+
+
+@dataclass
+class _DeterministicQACache:
+    # Rendered HTML by path (keyed with the content it was rendered from) and
+    # page findings by page index (keyed with the document they were checked
+    # against), so a revision only re-checks the documents it changed.
+    documents: dict[str, tuple[str, _RenderedHTMLDocument]] = field(default_factory=dict)
+    page_findings: dict[int, tuple[_RenderedHTMLDocument, list[str]]] = field(default_factory=dict)
 
 
 @dataclass
 class _PipelineArtifacts:
+    user_input: str = ""
     product_requirements: str = ""
-    research_output: str = ""
-    site_structure: str = ""
-    architecture_spec: str = ""
-    design_spec: str = ""
-    development_tasks: str = ""
-    generated_files: str = ""
+    research_output: JSONArtifact | None = None
+    site_structure: JSONArtifact | None = None
+    architecture_spec: JSONArtifact | None = None
+    design_spec: JSONArtifact | None = None
+    development_tasks: JSONArtifact | None = None
+    provisional_architecture_spec: JSONArtifact | None = None
+    speculative_design_spec: JSONArtifact | None = None
+    generated_files: JSONArtifact | None = None
     generated_image_paths: list[Path] = field(default_factory=list)
+    qa_feedback: str = ""
+    written_paths: list[Path] = field(default_factory=list)
+    dockerfile_path: Path | None = None
+    deployment_instructions: str = ""
+
+
+@dataclass(frozen=True)
+class _AgentStageSpec:
+    number: int
+    stage_name: str
+    agent_attr: str
+    output: str
+    inputs: tuple[str, ...]
+    schema: dict[str, object]
+    streams_files: bool = False
+
+
+_AGENT_STAGES = (
+    _AgentStageSpec(
+        number=2,
+        stage_name="ResearcherAgent",
+        agent_attr="researcher",
+        output="research_output",
+        inputs=("product_requirements",),
+        schema=RESEARCH_OUTPUT_SCHEMA,
+    ),
+    _AgentStageSpec(
+        number=3,
+        stage_name="ContentDesignerAgent",
+        agent_attr="content_designer",
+        output="site_structure",
+        inputs=("product_requirements", "research_output"),
+        schema=SITE_STRUCTURE_SCHEMA,
+    ),
+    _AgentStageSpec(
+        number=4,
+        stage_name="ArchitectAgent",
+        agent_attr="architect",
+        output="architecture_spec",
+        inputs=("product_requirements", "research_output", "site_structure"),
+        schema=ARCHITECTURE_SPEC_SCHEMA,
+    ),
+    _AgentStageSpec(
+        number=5,
+        stage_name="DesignerAgent",
+        agent_attr="designer",
+        output="design_spec",
+        inputs=("architecture_spec", "site_structure"),
+        schema=DESIGN_SPEC_SCHEMA,
+    ),
+    _AgentStageSpec(
+        number=6,
+        stage_name="PlannerAgent",
+        agent_attr="planner",
+        output="development_tasks",
+        inputs=("architecture_spec", "site_structure", "design_spec"),
+        schema=DEVELOPMENT_TASKS_SCHEMA,
+    ),
+    _AgentStageSpec(
+        number=7,
+        stage_name="DeveloperAgent",
+        agent_attr="developer",
+        output="generated_files",
+        inputs=("architecture_spec", "design_spec", "site_structure", "development_tasks"),
+        schema=GENERATED_FILES_SCHEMA,
+        streams_files=True,
+    ),
+)
+
+_DESIGNER_STAGE = next(spec for spec in _AGENT_STAGES if spec.agent_attr == "designer")
+
+# With speculative_design, the Designer starts from a provisional architecture
+# derived from site_structure while the Architect runs; DesignReconcile then
+# keeps its output unless it conflicts with the final architecture_spec.
+_SPECULATIVE_DESIGNER_STAGE = _AgentStageSpec(
+    number=5,
+    stage_name="DesignerAgent",
+    agent_attr="designer",
+    output="speculative_design_spec",
+    inputs=("provisional_architecture_spec", "site_structure"),
+    schema=DESIGN_SPEC_SCHEMA,
+)
 
 
 class _HTMLTextExtractor(HTMLParser):
@@ -86,172 +218,483 @@ class _HTMLTextExtractor(HTMLParser):
 
 
 class Orchestrator:
-    """Simple sequential orchestrator for V1."""
-
-    def __init__(self, llm: LLMProtocol | None = None) -> None:
+    """Runs the agent pipeline as a dependency graph of stages."""
+
+    def __init__(
+        self,
+        llm: LLMProtocol | None = None,
+        max_parallel_stages: int = 3,
+        image_concurrency: int = 3,
+        image_retries: int = 1,
+        image_timeout: float = 180.0,
+        stream_generated_files: bool = False,
+        patch_revisions: bool = True,
+        checkpoint_dir: Path | str | None = None,
+        interactive: bool = True,
+        workspace: RunWorkspace | None = None,
+        metrics: MetricsRecorder | None = None,
+        metrics_path: Path | str | None = None,
+        web_search_service: WebSearchService | None = None,
+        image_generator: ImageGenerator | None = None,
+        payload_encoder: PayloadEncoder | None = None,
+        token_budget: TokenBudget | None = None,
+        speculative_design: bool = False,
+    ) -> None:
+        self.max_parallel_stages = max_parallel_stages
+        self.image_concurrency = image_concurrency
+        self.image_retries = image_retries
+        self.image_timeout = image_timeout
+        self._image_publish_lock = threading.Lock()
+        self.stream_generated_files = stream_generated_files
+        self.patch_revisions = patch_revisions
+        self.speculative_design = speculative_design
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir is not None else None
+        self.interactive = interactive
+        # Batch runs yield to interactive ones when they share a rate limiter.
+        self.priority_lane = "interactive" if interactive else "batch"
+        self.workspace = workspace or RunWorkspace()
+        self.payload_encoder = payload_encoder or PayloadEncoder()
+        self.metrics_path = Path(metrics_path) if metrics_path is not None else None
         shared_llm = llm or LLM()
+        if metrics is None and self.metrics_path is not None:
+            metrics = getattr(shared_llm, "metrics", None) or MetricsRecorder()
+        # An LLM shared by several orchestrators keeps the recorder and budget
+        # it already has; a different one is refused instead of taken over.
+        self.metrics = self._attach_to_llm(shared_llm, "metrics", metrics)
+        self.token_budget = self._attach_to_llm(shared_llm, "token_budget", token_budget)
+        self.llm = shared_llm
         self.product_manager = ProductManagerAgent(llm=shared_llm)
-        self.researcher = ResearcherAgent(llm=shared_llm)
+        self.researcher = ResearcherAgent(
+            llm=shared_llm,
+            web_search_service=web_search_service,
+            token_budget=self.token_budget,
+        )
         self.content_designer = ContentDesignerAgent(llm=shared_llm)
         self.architect = ArchitectAgent(llm=shared_llm)
         self.designer = DesignerAgent(llm=shared_llm)
-        self.image_generator = ImageGenerator()
+        self.image_generator = image_generator or ImageGenerator()
         self.planner = PlannerAgent(llm=shared_llm)
         self.developer = DeveloperAgent(llm=shared_llm)
         self.qa = QAAgent(llm=shared_llm)
         self.devops = DevOpsAgent(llm=shared_llm)
 
-    def run(self, user_input: str) -> str:
-        artifacts = _PipelineArtifacts()
-
-        print("[ORCHESTRATOR] Stage 1: ProductManagerAgent -> product_requirements")
-        artifacts.product_requirements = self._refine_requirements(user_input)
-        self._log_artifact("ProductManagerAgent", "product_requirements", artifacts.product_requirements)
+    @staticmethod
+    def _attach_to_llm(llm: LLMProtocol, name: str, value: object) -> object:
+        """Set `llm.<name>` to `value`, or adopt the LLM's own when `value` is None."""
+        current = getattr(llm, name, None)
+        if value is None or current is value:
+            return current
+        if current is not None:
+            raise ValueError(
+                f"The LLM passed to Orchestrator already has a different {name}. "
+                f"Pass that {name} to this Orchestrator too, or give it its own LLM."
+            )
+        setattr(llm, name, value)
+        return value
 
-        print("[ORCHESTRATOR] Stage 2: ResearcherAgent -> research_output")
-        self._log_stage_inputs("ResearcherAgent", product_requirements=artifacts.product_requirements)
-        research_input = self._artifact_payload(
-            product_requirements=artifacts.product_requirements,
-        )
-        artifacts.research_output = self.researcher.run(research_input)
-        self._log_artifact("ResearcherAgent", "research_output", artifacts.research_output)
-        artifacts.research_output, research_error = self._validate_stage_output(
-            stage_name="ResearcherAgent",
-            stage_output=artifacts.research_output,
-            schema=RESEARCH_OUTPUT_SCHEMA,
+    def run(self, user_input: str) -> str:
+        artifacts, staged, stage_graph = self._start_stage_graph(user_input)
+        with staged, priority_lane(self.priority_lane):
+            error = stage_graph.run(max_workers=self.max_parallel_stages)
+            staged.failed = error is not None
+        return self._finish_run(artifacts, error)
+
+    async def arun(self, user_input: str) -> str:
+        artifacts, staged, stage_graph = self._start_stage_graph(user_input)
+        with staged, priority_lane(self.priority_lane):
+            error = await stage_graph.arun(max_workers=self.max_parallel_stages)
+            staged.failed = error is not None
+        return self._finish_run(artifacts, error)
+
+    def resume(self, run_id: str, from_stage: str | None = None) -> str:
+        """Re-run a checkpointed run, restoring every stage whose inputs are unchanged.
+
+        `from_stage` forces that stage and everything downstream of it to run again.
+        """
+        artifacts, staged, stage_graph = self._resume_stage_graph(run_id, from_stage)
+        with staged, priority_lane(self.priority_lane):
+            error = stage_graph.run(max_workers=self.max_parallel_stages)
+            staged.failed = error is not None
+        return self._finish_run(artifacts, error)
+
+    async def aresume(self, run_id: str, from_stage: str | None = None) -> str:
+        artifacts, staged, stage_graph = self._resume_stage_graph(run_id, from_stage)
+        with staged, priority_lane(self.priority_lane):
+            error = await stage_graph.arun(max_workers=self.max_parallel_stages)
+            staged.failed = error is not None
+        return self._finish_run(artifacts, error)
+
+    def _start_stage_graph(self, user_input: str) -> tuple[_PipelineArtifacts, StagedWorkspace, StageGraph]:
+        artifacts = _PipelineArtifacts(user_input=user_input)
+        checkpoint = self._start_checkpoint(user_input)
+        staged = self.workspace.begin(checkpoint.run_id if checkpoint is not None else None)
+        return artifacts, staged, self._build_stage_graph(artifacts, staged, checkpoint)
+
+    def _start_checkpoint(self, user_input: str) -> RunCheckpoint | None:
+        if self.checkpoint_dir is None:
+            return None
+        checkpoint = RunCheckpoint.create(self.checkpoint_dir)
+        checkpoint.save_initial("user_input", user_input)
+        print(f"[ORCHESTRATOR] Checkpointing run {checkpoint.run_id} to {checkpoint.directory}")
+        return checkpoint
+
+    def _resume_stage_graph(
+        self, run_id: str, from_stage: str | None
+    ) -> tuple[_PipelineArtifacts, StagedWorkspace, StageGraph]:
+        if self.checkpoint_dir is None:
+            raise ValueError("Orchestrator.resume requires checkpoint_dir.")
+        checkpoint = RunCheckpoint.open(self.checkpoint_dir, run_id)
+        artifacts = _PipelineArtifacts(user_input=str(checkpoint.load_initial("user_input")))
+        print(f"[ORCHESTRATOR] Resuming run {run_id}" + (f" from stage {from_stage}" if from_stage else ""))
+        # Restored stages point at files in the run's staging directory; seed it
+        # from this run's own published output if it already published.
+        staged = self.workspace.begin(run_id, seed_from_published=True)
+        return artifacts, staged, self._build_stage_graph(artifacts, staged, checkpoint, from_stage)
+
+    def _finish_run(self, artifacts: _PipelineArtifacts, error: str | None) -> str:
+        self._log_cache_stats()
+        self._export_metrics()
+        if error is not None:
+            return error
+
+        written_paths_summary = "\n".join(f"- {path}" for path in artifacts.written_paths)
+        generated_images_summary = "\n".join(f"- {path}" for path in artifacts.generated_image_paths)
+        return (
+            "Created files:\n"
+            f"{generated_images_summary}\n"
+            f"{written_paths_summary}\n"
+            f"- {artifacts.dockerfile_path}\n\n"
+            "Deployment instructions:\n"
+            f"{artifacts.deployment_instructions}"
         )
-        if research_error:
-            return research_error
-        self._log_artifact("ResearcherAgentValidated", "research_output", artifacts.research_output)
 
-        print("[ORCHESTRATOR] Stage 3: ContentDesignerAgent -> site_structure")
-        self._log_stage_inputs(
-            "ContentDesignerAgent",
-            product_requirements=artifacts.product_requirements,
-            research_output=artifacts.research_output,
-        )
-        content_designer_input = self._artifact_payload(
-            product_requirements=artifacts.product_requirements,
-            research_output=artifacts.research_output,
+    def _build_stage_graph(
+        self,
+        artifacts: _PipelineArtifacts,
+        staged: StagedWorkspace,
+        checkpoint: RunCheckpoint | None = None,
+        from_stage: str | None = None,
+    ) -> StageGraph:
+        stages = [
+            PipelineStage(
+                name="ProductManagerAgent",
+                inputs=("user_input",),
+                outputs=("product_requirements",),
+                run=partial(self._run_requirements_stage, artifacts),
+            )
+        ]
+        agent_stages = _AGENT_STAGES
+        if self.speculative_design:
+            agent_stages = tuple(
+                _SPECULATIVE_DESIGNER_STAGE if spec is _DESIGNER_STAGE else spec for spec in _AGENT_STAGES
+            )
+        stages.extend(
+            PipelineStage(
+                name=spec.stage_name,
+                inputs=spec.inputs,
+                outputs=(spec.output,),
+                run=partial(self._run_agent_stage, artifacts, staged, spec),
+                arun=partial(self._arun_agent_stage, artifacts, staged, spec),
+            )
+            for spec in agent_stages
         )
-        artifacts.site_structure = self.content_designer.run(content_designer_input)
-        self._log_artifact("ContentDesignerAgent", "site_structure", artifacts.site_structure)
-        artifacts.site_structure, content_error = self._validate_stage_output(
-            stage_name="ContentDesignerAgent",
-            stage_output=artifacts.site_structure,
-            schema=SITE_STRUCTURE_SCHEMA,
+        if self.speculative_design:
+            stages.extend(
+                [
+                    PipelineStage(
+                        name="ProvisionalArchitecture",
+                        inputs=("site_structure",),
+                        outputs=("provisional_architecture_spec",),
+                        run=partial(self._run_provisional_architecture_stage, artifacts),
+                    ),
+                    PipelineStage(
+                        name="DesignReconcile",
+                        inputs=("architecture_spec", "site_structure", "speculative_design_spec"),
+                        outputs=("design_spec",),
+                        run=partial(self._run_design_reconcile_stage, artifacts, staged),
+                        arun=partial(self._arun_design_reconcile_stage, artifacts, staged),
+                    ),
+                ]
+            )
+        stages.extend(
+            [
+                PipelineStage(
+                    name="ImageGeneration",
+                    inputs=("design_spec",),
+                    outputs=("generated_image_paths",),
+                    run=partial(self._run_image_stage, artifacts, staged),
+                ),
+                PipelineStage(
+                    name="QAAgent",
+                    inputs=("architecture_spec", "site_structure", "design_spec", "development_tasks", "generated_files"),
+                    outputs=("generated_files", "qa_feedback"),
+                    run=partial(self._run_qa_stage, artifacts),
+                    arun=partial(self._arun_qa_stage, artifacts),
+                ),
+                PipelineStage(
+                    name="PersistGeneratedFiles",
+                    inputs=("generated_files", "qa_feedback", "generated_image_paths"),
+                    outputs=("written_paths", "dockerfile_path", "generated_image_paths"),
+                    run=partial(self._run_persist_stage, artifacts, staged),
+                ),
+                PipelineStage(
+                    name="DevOpsAgent",
+                    inputs=("qa_feedback", "generated_files", "written_paths", "dockerfile_path"),
+                    outputs=("deployment_instructions",),
+                    run=partial(self._run_devops_stage, artifacts),
+                    arun=partial(self._arun_devops_stage, artifacts),
+                ),
+            ]
         )
-        if content_error:
-            return content_error
-        self._log_artifact("ContentDesignerAgentValidated", "site_structure", artifacts.site_structure)
+        stage_graph = StageGraph(stages, initial_artifacts=("user_input",))
+        if checkpoint is None and self.metrics is None:
+            return stage_graph
+
+        if checkpoint is not None:
+            rerun_stages = stage_graph.downstream_of(from_stage) if from_stage else set()
+            stages = [
+                self._checkpointed_stage(artifacts, checkpoint, stage, force_rerun=stage.name in rerun_stages)
+                for stage in stages
+            ]
+        if self.metrics is not None:
+            stages = [self._timed_stage(self.metrics, stage) for stage in stages]
+        return StageGraph(stages, initial_artifacts=stage_graph.initial_artifacts)
 
-        print("[ORCHESTRATOR] Stage 4: ArchitectAgent -> architecture_spec")
-        self._log_stage_inputs(
-            "ArchitectAgent",
-            product_requirements=artifacts.product_requirements,
-            research_output=artifacts.research_output,
-            site_structure=artifacts.site_structure,
-        )
-        architect_input = self._artifact_payload(
-            product_requirements=artifacts.product_requirements,
-            research_output=artifacts.research_output,
-            site_structure=artifacts.site_structure,
-        )
-        artifacts.architecture_spec = self.architect.run(architect_input)
-        self._log_artifact("ArchitectAgent", "architecture_spec", artifacts.architecture_spec)
-        artifacts.architecture_spec, architecture_error = self._validate_stage_output(
-            stage_name="ArchitectAgent",
-            stage_output=artifacts.architecture_spec,
-            schema=ARCHITECTURE_SPEC_SCHEMA,
-        )
-        if architecture_error:
-            return architecture_error
-        self._log_artifact("ArchitectAgentValidated", "architecture_spec", artifacts.architecture_spec)
+    @staticmethod
+    def _timed_stage(metrics: MetricsRecorder, stage: PipelineStage) -> PipelineStage:
+        def run() -> str | None:
+            started = time.perf_counter()
+            cpu_started = time.thread_time()
+            try:
+                return stage.run()
+            finally:
+                metrics.record_stage(stage.name, time.perf_counter() - started, time.thread_time() - cpu_started)
 
-        print("[ORCHESTRATOR] Stage 5: DesignerAgent -> design_spec")
-        self._log_stage_inputs(
-            "DesignerAgent",
-            architecture_spec=artifacts.architecture_spec,
-            site_structure=artifacts.site_structure,
-        )
-        designer_input = self._artifact_payload(
-            architecture_spec=artifacts.architecture_spec,
-            site_structure=artifacts.site_structure,
+        async def arun() -> str | None:
+            # The event loop thread interleaves other stages, so only wall time is meaningful here.
+            started = time.perf_counter()
+            try:
+                return await stage.arun()
+            finally:
+                metrics.record_stage(stage.name, time.perf_counter() - started)
+
+        return PipelineStage(
+            name=stage.name,
+            inputs=stage.inputs,
+            outputs=stage.outputs,
+            run=run,
+            arun=arun if stage.arun is not None else None,
         )
-        artifacts.design_spec = self.designer.run(designer_input)
-        self._log_artifact("DesignerAgent", "design_spec", artifacts.design_spec)
-        artifacts.design_spec, design_error = self._validate_stage_output(
-            stage_name="DesignerAgent",
-            stage_output=artifacts.design_spec,
-            schema=DESIGN_SPEC_SCHEMA,
+
+    def _checkpointed_stage(
+        self,
+        artifacts: _PipelineArtifacts,
+        checkpoint: RunCheckpoint,
+        stage: PipelineStage,
+        force_rerun: bool,
+    ) -> PipelineStage:
+        def run() -> str | None:
+            input_hashes = checkpoint.input_hashes(stage.inputs)
+            if not force_rerun and self._restore_stage(artifacts, checkpoint, stage, input_hashes):
+                return None
+            return self._record_stage(artifacts, checkpoint, stage, input_hashes, stage.run())
+
+        async def arun() -> str | None:
+            input_hashes = checkpoint.input_hashes(stage.inputs)
+            if not force_rerun and self._restore_stage(artifacts, checkpoint, stage, input_hashes):
+                return None
+            return self._record_stage(artifacts, checkpoint, stage, input_hashes, await stage.arun())
+
+        return PipelineStage(
+            name=stage.name,
+            inputs=stage.inputs,
+            outputs=stage.outputs,
+            run=run,
+            arun=arun if stage.arun is not None else None,
         )
-        if design_error:
-            return design_error
-        self._log_artifact("DesignerAgentValidated", "design_spec", artifacts.design_spec)
 
-        print("[ORCHESTRATOR] Stage 6: PlannerAgent -> development_tasks")
-        self._log_stage_inputs(
-            "PlannerAgent",
-            architecture_spec=artifacts.architecture_spec,
-            site_structure=artifacts.site_structure,
-            design_spec=artifacts.design_spec,
+    @staticmethod
+    def _restore_stage(
+        artifacts: _PipelineArtifacts,
+        checkpoint: RunCheckpoint,
+        stage: PipelineStage,
+        input_hashes: dict[str, str],
+    ) -> bool:
+        outputs = checkpoint.restore_stage(stage.name, input_hashes)
+        if outputs is None:
+            return False
+        for name, value in outputs.items():
+            setattr(artifacts, name, value)
+        print(f"[ORCHESTRATOR] Stage {stage.name} restored from checkpoint {checkpoint.run_id}.")
+        return True
+
+    @staticmethod
+    def _record_stage(
+        artifacts: _PipelineArtifacts,
+        checkpoint: RunCheckpoint,
+        stage: PipelineStage,
+        input_hashes: dict[str, str],
+        error: str | None,
+    ) -> str | None:
+        if error is None:
+            checkpoint.record_stage(stage.name, input_hashes, {name: getattr(artifacts, name) for name in stage.outputs})
+        return error
+
+    def _run_requirements_stage(self, artifacts: _PipelineArtifacts) -> str | None:
+        print("[ORCHESTRATOR] Stage 1: ProductManagerAgent -> product_requirements")
+        artifacts.product_requirements = self._refine_requirements(artifacts.user_input)
+        self._log_artifact("ProductManagerAgent", "product_requirements", artifacts.product_requirements)
+        return None
+
+    def _run_agent_stage(
+        self, artifacts: _PipelineArtifacts, staged: StagedWorkspace, spec: _AgentStageSpec
+    ) -> str | None:
+        agent: BaseAgent = getattr(self, spec.agent_attr)
+        stage_input = self._agent_stage_input(artifacts, spec)
+        if spec.streams_files and self.stream_generated_files:
+            on_file = partial(self._write_streamed_file, staged.site_dir)
+            stage_output = agent.run_streaming(stage_input, on_file=on_file)
+        else:
+            stage_output = agent.run(stage_input)
+        return self._finish_agent_stage(artifacts, spec, stage_output)
+
+    async def _arun_agent_stage(
+        self, artifacts: _PipelineArtifacts, staged: StagedWorkspace, spec: _AgentStageSpec
+    ) -> str | None:
+        agent: BaseAgent = getattr(self, spec.agent_attr)
+        stage_input = self._agent_stage_input(artifacts, spec)
+        if spec.streams_files and self.stream_generated_files:
+            on_file = partial(self._write_streamed_file, staged.site_dir)
+            stage_output = await asyncio.to_thread(agent.run_streaming, stage_input, on_file=on_file)
+        else:
+            stage_output = await agent.arun(stage_input)
+        return self._finish_agent_stage(artifacts, spec, stage_output)
+
+    def _agent_stage_input(self, artifacts: _PipelineArtifacts, spec: _AgentStageSpec) -> str:
+        print(f"[ORCHESTRATOR] Stage {spec.number}: {spec.stage_name} -> {spec.output}")
+        stage_inputs = {name: getattr(artifacts, name) for name in spec.inputs}
+        self._log_stage_inputs(spec.stage_name, **stage_inputs)
+        return self._artifact_payload(spec.stage_name, getattr(self, spec.agent_attr), **stage_inputs)
+
+    def _finish_agent_stage(self, artifacts: _PipelineArtifacts, spec: _AgentStageSpec, stage_output: str) -> str | None:
+        self._log_artifact(spec.stage_name, spec.output, stage_output)
+        artifact, stage_error = self._validate_stage_output(
+            stage_name=spec.stage_name,
+            stage_output=stage_output,
+            schema=spec.schema,
         )
-        planner_input = self._artifact_payload(
-            architecture_spec=artifacts.architecture_spec,
-            site_structure=artifacts.site_structure,
-            design_spec=artifacts.design_spec,
+        if stage_error:
+            return stage_error
+        setattr(artifacts, spec.output, artifact)
+        self._log_artifact(f"{spec.stage_name}Validated", spec.output, artifact)
+        return None
+
+    def _run_provisional_architecture_stage(self, artifacts: _PipelineArtifacts) -> str | None:
+        print("[ORCHESTRATOR] Speculative design: deriving a provisional architecture from site_structure")
+        artifacts.provisional_architecture_spec = JSONArtifact(
+            self._provisional_architecture(artifacts.site_structure.value)
         )
-        artifacts.development_tasks = self.planner.run(planner_input)
-        self._log_artifact("PlannerAgent", "development_tasks", artifacts.development_tasks)
-        artifacts.development_tasks, planner_error = self._validate_stage_output(
-            stage_name="PlannerAgent",
-            stage_output=artifacts.development_tasks,
-            schema=DEVELOPMENT_TASKS_SCHEMA,
+        return None
+
+    def _run_design_reconcile_stage(self, artifacts: _PipelineArtifacts, staged: StagedWorkspace) -> str | None:
+        if self._reconcile_speculative_design(artifacts):
+            return None
+        return self._run_agent_stage(artifacts, staged, _DESIGNER_STAGE)
+
+    async def _arun_design_reconcile_stage(self, artifacts: _PipelineArtifacts, staged: StagedWorkspace) -> str | None:
+        if self._reconcile_speculative_design(artifacts):
+            return None
+        return await self._arun_agent_stage(artifacts, staged, _DESIGNER_STAGE)
+
+    def _reconcile_speculative_design(self, artifacts: _PipelineArtifacts) -> bool:
+        conflict = self._design_architecture_conflict(
+            artifacts.architecture_spec.value,
+            artifacts.speculative_design_spec.value,
         )
-        if planner_error:
-            return planner_error
-        self._log_artifact("PlannerAgentValidated", "development_tasks", artifacts.development_tasks)
+        if conflict is None:
+            print("[ORCHESTRATOR] DesignReconcile: speculative design_spec matches architecture_spec; keeping it.")
+            artifacts.design_spec = artifacts.speculative_design_spec
+            return True
+        print(f"[ORCHESTRATOR] DesignReconcile: {conflict}; re-running DesignerAgent with the final architecture.")
+        return False
 
+    @staticmethod
+    def _provisional_architecture(site_structure: object) -> dict[str, object]:
+        pages = site_structure.get("site_structure", {}).get("pages", []) if isinstance(site_structure, dict) else []
+        page_files = []
+        for page in pages:
+            slug = str(page.get("slug") or "").strip("/") if isinstance(page, dict) else ""
+            page_files.append(f"{slug}.html" if slug and slug != "index" else "index.html")
+        return {
+            "architecture_spec": {
+                "status": "Provisional summary derived from site_structure; the final architecture is in progress.",
+                "project_structure": list(dict.fromkeys(page_files)) + ["css/styles.css", "js/main.js", "assets/images/"],
+                "css_strategy": "One shared stylesheet built on design tokens.",
+                "javascript_strategy": "One main.js for navigation and small interactions.",
+                "asset_structure": [{"type": "Images", "directory": "assets/images/", "files": []}],
+            }
+        }
+
+    @staticmethod
+    def _design_architecture_conflict(architecture_spec: object, design_spec: object) -> str | None:
+        """Why a design made against the provisional architecture does not fit the final one, or None.
+
+        Generated images are always written to assets/images/, so the design
+        only conflicts when the architecture keeps images elsewhere or expects
+        image files the design does not define.
+        """
+        architecture = architecture_spec.get("architecture_spec", {}) if isinstance(architecture_spec, dict) else {}
+        asset_structure = architecture.get("asset_structure", []) if isinstance(architecture, dict) else []
+        image_entries = [
+            entry
+            for entry in asset_structure
+            if isinstance(entry, dict)
+            and ("image" in str(entry.get("type", "")).lower() or "image" in str(entry.get("directory", "")).lower())
+        ]
+        directories = {str(entry.get("directory", "")).strip("/") for entry in image_entries}
+        if directories and "assets/images" not in directories:
+            return f"architecture keeps images in {', '.join(sorted(directories))}"
+
+        expected_images = {
+            file_name
+            for entry in image_entries
+            if str(entry.get("directory", "")).strip("/") == "assets/images"
+            for file_name in entry.get("files", [])
+            if isinstance(file_name, str)
+        }
+        images = design_spec.get("images", []) if isinstance(design_spec, dict) else []
+        defined_images = {image.get("filename") for image in images if isinstance(image, dict)}
+        missing_images = sorted(expected_images - defined_images)
+        if missing_images:
+            return f"architecture expects images the design does not define ({', '.join(missing_images)})"
+        return None
+
+    def _run_image_stage(self, artifacts: _PipelineArtifacts, staged: StagedWorkspace) -> str | None:
         print("[ORCHESTRATOR] Auxiliary: Image generation from design_spec")
-        artifacts.generated_image_paths = self._generate_design_images(artifacts.design_spec)
+        artifacts.generated_image_paths = self._generate_design_images(artifacts.design_spec, staged.site_dir)
         self._log_generated_images(artifacts.generated_image_paths)
+        return None
 
-        print("[ORCHESTRATOR] Stage 7: DeveloperAgent -> generated_files")
-        self._log_stage_inputs(
-            "DeveloperAgent",
-            architecture_spec=artifacts.architecture_spec,
-            design_spec=artifacts.design_spec,
-            site_structure=artifacts.site_structure,
-            development_tasks=artifacts.development_tasks,
-        )
-        developer_input = self._artifact_payload(
-            architecture_spec=artifacts.architecture_spec,
-            design_spec=artifacts.design_spec,
-            site_structure=artifacts.site_structure,
-            development_tasks=artifacts.development_tasks,
-        )
-        artifacts.generated_files = self.developer.run(developer_input)
-        self._log_artifact("DeveloperAgent", "generated_files", artifacts.generated_files)
-        artifacts.generated_files, generated_files_error = self._validate_generated_files_output(
-            stage_name="DeveloperAgent",
-            stage_output=artifacts.generated_files,
-        )
-        if generated_files_error:
-            return generated_files_error
-        self._log_artifact("DeveloperAgentValidated", "generated_files", artifacts.generated_files)
+    def _run_qa_stage(self, artifacts: _PipelineArtifacts) -> str | None:
+        print("[ORCHESTRATOR] Stage 8: QAAgent revision loop")
+        artifacts.generated_files, artifacts.qa_feedback = self._run_qa_revision_loop(artifacts)
+        if not artifacts.generated_files:
+            return artifacts.qa_feedback
+        return None
 
+    async def _arun_qa_stage(self, artifacts: _PipelineArtifacts) -> str | None:
         print("[ORCHESTRATOR] Stage 8: QAAgent revision loop")
-        artifacts.generated_files, qa_feedback = self._run_qa_revision_loop(artifacts)
+        artifacts.generated_files, artifacts.qa_feedback = await self._arun_qa_revision_loop(artifacts)
         if not artifacts.generated_files:
-            return qa_feedback
+            return artifacts.qa_feedback
+        return None
 
+    def _run_persist_stage(self, artifacts: _PipelineArtifacts, staged: StagedWorkspace) -> str | None:
         print("[ORCHESTRATOR] Stage 9: Persisting generated_files artifact")
-        workspace_dir = Path("workspace")
-        docker_dir = Path("docker")
-        workspace_dir.mkdir(parents=True, exist_ok=True)
-        docker_dir.mkdir(parents=True, exist_ok=True)
+        workspace_dir = staged.site_dir
+        docker_dir = staged.docker_dir
 
-        files = self._parse_project_files(artifacts.generated_files)
+        files = self._parse_project_files(artifacts.generated_files.value if artifacts.generated_files else None)
         if files is None:
             print("[ORCHESTRATOR] ERROR: Invalid generated_files artifact. Aborting deployment.")
             return (
@@ -262,6 +705,11 @@ class Orchestrator:
 
         written_paths: list[Path] = []
         protected_image_paths = {path.resolve() for path in artifacts.generated_image_paths}
+        # Streamed drafts, JSON retries and revisions may have dropped or renamed files; publish only the final set.
+        self._remove_stale_site_files(
+            workspace_dir,
+            {(workspace_dir / relative_path).resolve() for relative_path in files} | protected_image_paths,
+        )
         for relative_path, content in files.items():
             target_path = workspace_dir / relative_path
             if target_path.resolve() in protected_image_paths:
@@ -276,35 +724,42 @@ class Orchestrator:
         dockerfile_path.write_text(self._dockerfile_content(), encoding="utf-8")
         print(f"[ORCHESTRATOR] Wrote file: {dockerfile_path}")
 
+        staged.publish()
+        print(f"[ORCHESTRATOR] Published workspace and docker directories to {staged.output_dir}")
+        artifacts.written_paths = [staged.published_path(path) for path in written_paths]
+        artifacts.dockerfile_path = staged.published_path(dockerfile_path)
+        artifacts.generated_image_paths = [staged.published_path(path) for path in artifacts.generated_image_paths]
+        return None
+
+    def _run_devops_stage(self, artifacts: _PipelineArtifacts) -> str | None:
+        artifacts.deployment_instructions = self.devops.run(self._devops_stage_input(artifacts))
+        self._log_artifact("DevOpsAgent", "deployment_instructions", artifacts.deployment_instructions)
+        return None
+
+    async def _arun_devops_stage(self, artifacts: _PipelineArtifacts) -> str | None:
+        artifacts.deployment_instructions = await self.devops.arun(self._devops_stage_input(artifacts))
+        self._log_artifact("DevOpsAgent", "deployment_instructions", artifacts.deployment_instructions)
+        return None
+
+    def _devops_stage_input(self, artifacts: _PipelineArtifacts) -> str:
         print("[ORCHESTRATOR] Stage 10: DevOpsAgent deployment handoff")
-        written_files = [str(path) for path in written_paths]
+        written_files = [str(path) for path in artifacts.written_paths]
         self._log_stage_inputs(
             "DevOpsAgent",
-            qa_feedback=qa_feedback,
+            qa_feedback=artifacts.qa_feedback,
             generated_files=artifacts.generated_files,
         )
-        devops_input = self._artifact_payload(
-            qa_feedback=qa_feedback,
+        return self._artifact_payload(
+            "DevOpsAgent",
+            self.devops,
+            qa_feedback=artifacts.qa_feedback,
             generated_files=artifacts.generated_files,
             written_files=written_files,
             docker_artifact={
-                "path": str(dockerfile_path),
+                "path": str(artifacts.dockerfile_path),
                 "contents": self._dockerfile_content(),
             },
         )
-        deployment_instructions = self.devops.run(devops_input)
-        self._log_artifact("DevOpsAgent", "deployment_instructions", deployment_instructions)
-
-        written_paths_summary = "\n".join(f"- {path}" for path in written_paths)
-        generated_images_summary = "\n".join(f"- {path}" for path in artifacts.generated_image_paths)
-        return (
-            "Created files:\n"
-            f"{generated_images_summary}\n"
-            f"{written_paths_summary}\n"
-            f"- {dockerfile_path}\n\n"
-            "Deployment instructions:\n"
-            f"{deployment_instructions}"
-        )
 
     def _refine_requirements(self, initial_input: str) -> str:
         latest_input = initial_input
@@ -321,7 +776,11 @@ class Orchestrator:
 
             print("[ORCHESTRATOR] ProductManager requested clarifications:")
             print(latest_output)
-            additional_input = input("Additional details for ProductManager: ").strip()
+            if self.interactive:
+                additional_input = input("Additional details for ProductManager: ").strip()
+            else:
+                print("[ORCHESTRATOR] Non-interactive run: asking ProductManager to assume answers.")
+                additional_input = _NON_INTERACTIVE_CLARIFICATION
             if additional_input:
                 latest_input = (
                     f"{latest_input}\n\n"
@@ -335,89 +794,195 @@ class Orchestrator:
         )
         return latest_output
 
-    def _run_qa_revision_loop(self, artifacts: _PipelineArtifacts) -> tuple[str, str]:
+    def _run_qa_revision_loop(self, artifacts: _PipelineArtifacts) -> tuple[JSONArtifact | None, str]:
         generated_files = artifacts.generated_files
         qa_feedback = ""
+        qa_cache = _DeterministicQACache()
 
         for iteration in range(1, 4):
-            print(f"[ORCHESTRATOR] QA iteration {iteration}/3")
-            deterministic_feedback, deterministic_has_failures = self._build_deterministic_qa_feedback(
-                site_structure=artifacts.site_structure,
-                generated_files=generated_files,
+            qa_input, deterministic_feedback, deterministic_has_failures = self._qa_iteration_input(
+                artifacts, generated_files, iteration, qa_cache
             )
-            self._log_stage_inputs(
-                f"QAAgent iteration {iteration}",
-                architecture_spec=artifacts.architecture_spec,
-                site_structure=artifacts.site_structure,
-                generated_files=generated_files,
+            qa_feedback = self._merge_qa_feedback(
+                llm_feedback=self.qa.run(qa_input),
+                deterministic_feedback=deterministic_feedback,
+                force_needs_changes=deterministic_has_failures,
             )
-            qa_input = self._artifact_payload(
-                architecture_spec=artifacts.architecture_spec,
-                site_structure=artifacts.site_structure,
-                generated_files=generated_files,
-                deterministic_validation=deterministic_feedback,
+            if not self._qa_requests_revision(qa_feedback, iteration):
+                return generated_files, qa_feedback
+
+            if iteration < 3:
+                revision_input = self._revision_input(artifacts, generated_files, qa_feedback)
+                if self.patch_revisions:
+                    revision_output = self.developer.revise(revision_input)
+                else:
+                    revision_output = self.developer.run(revision_input)
+                generated_files, generated_files_error = self._finish_revision(generated_files, revision_output)
+                if generated_files_error:
+                    return generated_files, generated_files_error
+
+        return self._finish_qa_without_approval(generated_files, qa_feedback)
+
+    async def _arun_qa_revision_loop(self, artifacts: _PipelineArtifacts) -> tuple[JSONArtifact | None, str]:
+        generated_files = artifacts.generated_files
+        qa_feedback = ""
+        qa_cache = _DeterministicQACache()
+
+        for iteration in range(1, 4):
+            qa_input, deterministic_feedback, deterministic_has_failures = self._qa_iteration_input(
+                artifacts, generated_files, iteration, qa_cache
             )
-            qa_feedback = self.qa.run(qa_input)
             qa_feedback = self._merge_qa_feedback(
-                llm_feedback=qa_feedback,
+                llm_feedback=await self.qa.arun(qa_input),
                 deterministic_feedback=deterministic_feedback,
                 force_needs_changes=deterministic_has_failures,
             )
-            self._log_stage_output("QAAgent", qa_feedback)
-            qa_decision = self._extract_qa_decision(qa_feedback)
-            print(f"[ORCHESTRATOR] QA decision on iteration {iteration}: {qa_decision}")
-
-            if qa_decision != "NEEDS_CHANGES":
+            if not self._qa_requests_revision(qa_feedback, iteration):
                 return generated_files, qa_feedback
 
             if iteration < 3:
-                print("[ORCHESTRATOR] Sending QA feedback back to DeveloperAgent for revision")
-                revision_input = self._artifact_payload(
-                    architecture_spec=artifacts.architecture_spec,
-                    design_spec=artifacts.design_spec,
-                    site_structure=artifacts.site_structure,
-                    development_tasks=artifacts.development_tasks,
-                    generated_files=generated_files,
-                    qa_feedback=self._strip_qa_decision(qa_feedback),
-                    revision_instruction=(
-                        "Revise the project to address all QA issues while preserving "
-                        "the provided site_structure content and return the complete "
-                        "updated JSON with all files."
-                    ),
-                )
-                generated_files = self.developer.run(revision_input)
-                self._log_artifact("DeveloperAgentRevision", "generated_files", generated_files)
-                generated_files, generated_files_error = self._validate_generated_files_output(
-                    stage_name="DeveloperAgentRevision",
-                    stage_output=generated_files,
-                )
+                revision_input = self._revision_input(artifacts, generated_files, qa_feedback)
+                if self.patch_revisions:
+                    revision_output = await self.developer.arevise(revision_input)
+                else:
+                    revision_output = await self.developer.arun(revision_input)
+                generated_files, generated_files_error = self._finish_revision(generated_files, revision_output)
                 if generated_files_error:
                     return generated_files, generated_files_error
-                self._log_artifact("DeveloperAgentRevisionValidated", "generated_files", generated_files)
 
+        return self._finish_qa_without_approval(generated_files, qa_feedback)
+
+    def _qa_iteration_input(
+        self,
+        artifacts: _PipelineArtifacts,
+        generated_files: JSONArtifact,
+        iteration: int,
+        qa_cache: _DeterministicQACache | None = None,
+    ) -> tuple[str, str, bool]:
+        print(f"[ORCHESTRATOR] QA iteration {iteration}/3")
+        deterministic_feedback, deterministic_has_failures = self._build_deterministic_qa_feedback(
+            site_structure=artifacts.site_structure,
+            generated_files=generated_files,
+            qa_cache=qa_cache,
+        )
+        self._log_stage_inputs(
+            f"QAAgent iteration {iteration}",
+            architecture_spec=artifacts.architecture_spec,
+            site_structure=artifacts.site_structure,
+            generated_files=generated_files,
+        )
+        qa_input = self._artifact_payload(
+            "QAAgent",
+            self.qa,
+            architecture_spec=artifacts.architecture_spec,
+            site_structure=artifacts.site_structure,
+            generated_files=generated_files,
+            deterministic_validation=deterministic_feedback,
+        )
+        return qa_input, deterministic_feedback, deterministic_has_failures
+
+    def _qa_requests_revision(self, qa_feedback: str, iteration: int) -> bool:
+        self._log_stage_output("QAAgent", qa_feedback)
+        qa_decision = self._extract_qa_decision(qa_feedback)
+        print(f"[ORCHESTRATOR] QA decision on iteration {iteration}: {qa_decision}")
+        return qa_decision == "NEEDS_CHANGES"
+
+    def _revision_input(self, artifacts: _PipelineArtifacts, generated_files: JSONArtifact, qa_feedback: str) -> str:
+        print("[ORCHESTRATOR] Sending QA feedback back to DeveloperAgent for revision")
+        return self._artifact_payload(
+            "DeveloperAgentRevision",
+            self.developer.reviser if self.patch_revisions else self.developer,
+            architecture_spec=artifacts.architecture_spec,
+            design_spec=artifacts.design_spec,
+            site_structure=artifacts.site_structure,
+            development_tasks=artifacts.development_tasks,
+            generated_files=generated_files,
+            qa_feedback=self._strip_qa_decision(qa_feedback),
+            revision_instruction=(
+                "Revise the project to address all QA issues while preserving "
+                "the provided site_structure content and return only the changed "
+                "files with their complete contents."
+                if self.patch_revisions
+                else "Revise the project to address all QA issues while preserving "
+                "the provided site_structure content and return the complete "
+                "updated JSON with all files."
+            ),
+        )
+
+    def _finish_revision(
+        self,
+        previous_files: JSONArtifact,
+        revision_output: str,
+    ) -> tuple[JSONArtifact | None, str | None]:
+        self._log_artifact("DeveloperAgentRevision", "generated_files", revision_output)
+        if self.patch_revisions:
+            generated_files, generated_files_error = self._apply_generated_files_patch(previous_files, revision_output)
+        else:
+            generated_files, generated_files_error = self._validate_generated_files_output(
+                stage_name="DeveloperAgentRevision",
+                stage_output=revision_output,
+            )
+        if not generated_files_error:
+            self._log_artifact("DeveloperAgentRevisionValidated", "generated_files", generated_files)
+        return generated_files, generated_files_error
+
+    @classmethod
+    def _apply_generated_files_patch(
+        cls,
+        previous_files: JSONArtifact,
+        patch_output: str,
+    ) -> tuple[JSONArtifact | None, str | None]:
+        patch, patch_error = cls._validate_stage_output(
+            stage_name="DeveloperAgentRevision",
+            stage_output=patch_output,
+            schema=GENERATED_FILES_PATCH_SCHEMA,
+        )
+        if patch_error:
+            return None, patch_error
+
+        changed_files: dict[str, str] = patch.value["files"]
+        deleted_files: list[str] = patch.value.get("deleted_files", [])
+        files = dict(previous_files.value["files"])
+        files.update(changed_files)
+        for path in deleted_files:
+            files.pop(path, None)
+
+        changed_paths = sorted(set(changed_files) | set(deleted_files))
+        print(f"[ORCHESTRATOR] DeveloperAgentRevision patched {len(changed_paths)} file(s): {', '.join(changed_paths)}")
+        return cls._validate_stage_value(
+            stage_name="DeveloperAgentRevision",
+            value={"files": files},
+            schema=GENERATED_FILES_SCHEMA,
+        )
+
+    @staticmethod
+    def _finish_qa_without_approval(generated_files: JSONArtifact, qa_feedback: str) -> tuple[JSONArtifact, str]:
         print(
             "[ORCHESTRATOR] WARNING: QA returned NEEDS_CHANGES after 3 iterations. "
             "Proceeding with deployment anyway."
         )
         return generated_files, qa_feedback
 
-    def _generate_design_images(self, design_spec: str) -> list[Path]:
-        workspace_dir = Path("workspace")
+    def _generate_design_images(self, design_spec: JSONArtifact | str, workspace_dir: Path) -> list[Path]:
         assets_dir = workspace_dir / "assets" / "images"
         assets_dir.mkdir(parents=True, exist_ok=True)
         image_paths: list[Path] = []
 
-        try:
-            payload = json.loads(design_spec)
-        except json.JSONDecodeError:
-            print("[ORCHESTRATOR] WARNING: Invalid design specification JSON. Skipping image generation.")
-            return image_paths
+        if isinstance(design_spec, JSONArtifact):
+            payload = design_spec.value
+        else:
+            try:
+                payload = json.loads(design_spec)
+            except json.JSONDecodeError:
+                print("[ORCHESTRATOR] WARNING: Invalid design specification JSON. Skipping image generation.")
+                return image_paths
 
         images = self._extract_design_images(payload)
         if not images:
             print("[ORCHESTRATOR] WARNING: No supported image definitions found in design spec. Skipping image generation.")
             return image_paths
 
+        image_jobs: list[tuple[int, str, Path, threading.Event]] = []
         for index, image_def in enumerate(images, start=1):
             if not isinstance(image_def, dict):
                 print(f"[ORCHESTRATOR] WARNING: Invalid image definition at index {index}. Skipping.")
@@ -433,16 +998,81 @@ class Orchestrator:
                 print(f"[ORCHESTRATOR] WARNING: Invalid image filename at index {index}. Skipping.")
                 continue
 
-            try:
-                print(f"[ORCHESTRATOR] Generating image {index}: {target_path}")
-                image_bytes = self.image_generator.generate_image(prompt.strip())
-                target_path.write_bytes(image_bytes)
-                image_paths.append(target_path)
+            image_jobs.append((index, prompt.strip(), target_path, threading.Event()))
+
+        def _report(job_index: int, outcome: TaskOutcome[Path]) -> None:
+            _, _, target_path, cancelled = image_jobs[job_index]
+            if isinstance(outcome.error, TimeoutError):
+                # The worker thread keeps running; stop it from publishing the file late.
+                with self._image_publish_lock:
+                    cancelled.set()
+            if outcome.ok:
                 print(f"[ORCHESTRATOR] Image generated: {target_path}")
+            else:
+                print(f"[ORCHESTRATOR] WARNING: Failed to generate {target_path}: {outcome.error}")
+
+        outcomes = run_concurrently(
+            self._generate_image_file,
+            image_jobs,
+            max_workers=self.image_concurrency,
+            timeout=self.image_timeout,
+            on_complete=_report,
+        )
+        image_paths.extend(outcome.value for outcome in outcomes if outcome.ok and outcome.value is not None)
+        return image_paths
+
+    def _generate_image_file(self, image_job: tuple[int, str, Path, threading.Event]) -> Path:
+        index, prompt, target_path, cancelled = image_job
+        started = time.monotonic()
+        attempts = max(1, self.image_retries + 1)
+        for attempt in range(1, attempts + 1):
+            print(f"[ORCHESTRATOR] Generating image {index}: {target_path}")
+            try:
+                image_bytes = self.image_generator.generate_image(prompt)
+                break
             except Exception as exc:  # noqa: BLE001
-                print(f"[ORCHESTRATOR] WARNING: Failed to generate {target_path}: {exc}")
+                if attempt == attempts:
+                    raise
+                print(f"[ORCHESTRATOR] WARNING: Image {index} attempt {attempt}/{attempts} failed: {exc}. Retrying.")
+
+        partial_path = target_path.with_name(f".{target_path.name}.partial")
+        partial_path.write_bytes(image_bytes)
+        with self._image_publish_lock:
+            if cancelled.is_set() or time.monotonic() - started >= self.image_timeout:
+                partial_path.unlink(missing_ok=True)
+                raise TimeoutError(f"Image {index} finished after the {self.image_timeout:g}s timeout; discarded.")
+            partial_path.replace(target_path)
+        return target_path
 
-        return image_paths
+    @staticmethod
+    def _remove_stale_site_files(workspace_dir: Path, keep_paths: set[Path]) -> None:
+        for path in sorted(workspace_dir.rglob("*"), reverse=True):
+            if path.is_dir() and not path.is_symlink():
+                if not any(path.iterdir()):
+                    path.rmdir()
+            elif path.resolve() not in keep_paths:
+                path.unlink()
+                print(f"[ORCHESTRATOR] Removed file not in final generated_files: {path}")
+
+    def _write_streamed_file(self, workspace_dir: Path, relative_path: str, content: str) -> None:
+        relative_name = Path(relative_path)
+        if not relative_path or relative_name.is_absolute() or ".." in relative_name.parts:
+            print(f"[ORCHESTRATOR] WARNING: Skipping streamed file with unsafe path: {relative_path!r}")
+            return
+        if relative_name.parts[:2] == ("assets", "images"):
+            return
+
+        file_schemas = GENERATED_FILES_SCHEMA["properties"]["files"]["properties"]
+        try:
+            validate_schema(content, file_schemas.get(relative_path, {"type": "string"}))
+        except SchemaValidationError as exc:
+            print(f"[ORCHESTRATOR] WARNING: Streamed file {relative_path} failed validation: {exc}")
+            return
+
+        target_path = workspace_dir / relative_name
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        target_path.write_text(content, encoding="utf-8")
+        print(f"[ORCHESTRATOR] Streamed file: {target_path}")
 
     @staticmethod
     def _extract_design_images(payload: object) -> list[dict[str, object]]:
@@ -483,12 +1113,7 @@ class Orchestrator:
         )
 
     @staticmethod
-    def _parse_project_files(project_json: str) -> dict[str, str] | None:
-        try:
-            payload = json.loads(project_json)
-        except json.JSONDecodeError:
-            return None
-
+    def _parse_project_files(payload: object) -> dict[str, str] | None:
         files = payload.get("files") if isinstance(payload, dict) else None
         if not isinstance(files, dict):
             return None
@@ -504,23 +1129,64 @@ class Orchestrator:
     def _validate_generated_files_output(
         stage_name: str,
         stage_output: str,
-    ) -> tuple[str, str | None]:
+    ) -> tuple[JSONArtifact | None, str | None]:
         return Orchestrator._validate_stage_output(
             stage_name=stage_name,
             stage_output=stage_output,
             schema=GENERATED_FILES_SCHEMA,
         )
 
-    @staticmethod
-    def _artifact_payload(**artifacts: object) -> str:
+    def _artifact_payload(self, stage_name: str, agent: BaseAgent | None = None, **artifacts: object) -> str:
         payload = {
             name: Orchestrator._artifact_to_json_value(value)
             for name, value in artifacts.items()
         }
-        return json.dumps(payload, indent=2)
+        encoded = self.payload_encoder.encode(payload, stage_name)
+        if self.token_budget is None:
+            tokens = count_tokens(encoded)
+        else:
+            if agent is not None:
+                encoded = self._fit_payload_to_budget(stage_name, agent, payload, encoded)
+            tokens = self.token_budget.count(encoded)
+        print(f"[ORCHESTRATOR] {stage_name} payload: {len(encoded)} chars, ~{tokens} tokens")
+        if self.metrics is not None:
+            self.metrics.record_payload(stage_name, tokens)
+        return encoded
+
+    def _fit_payload_to_budget(self, stage_name: str, agent: BaseAgent, payload: dict[str, object], encoded: str) -> str:
+        """Truncate long feedback logs, then drop files the feedback does not mention, until the payload fits."""
+        budget = self.token_budget
+        available = budget.available(agent.role_name, agent.system_prompt)
+        if budget.count(encoded) <= available:
+            return encoded
+
+        print(f"[ORCHESTRATOR] {stage_name} payload exceeds the {available}-token budget; truncating feedback logs.")
+        payload = {
+            name: truncate_log(value, budget.log_tokens, budget.model)
+            if name in _LOG_PAYLOAD_ENTRIES and isinstance(value, str)
+            else value
+            for name, value in payload.items()
+        }
+        encoded = self.payload_encoder.encode(payload, stage_name)
+        generated_files = payload.get("generated_files")
+        if budget.count(encoded) <= available or not isinstance(generated_files, dict):
+            return encoded
+        if stage_name not in _FILE_OMITTING_STAGES or (stage_name == "DeveloperAgentRevision" and not self.patch_revisions):
+            # QA must see every file, and a full rewrite would lose every file it was not shown.
+            print(f"[ORCHESTRATOR] WARNING: {stage_name} payload still exceeds the budget; sending every file.")
+            return encoded
+
+        print(f"[ORCHESTRATOR] {stage_name} payload still exceeds the budget; omitting files the feedback does not mention.")
+        feedback = "\n".join(value for value in payload.values() if isinstance(value, str))
+        files = generated_files.get("files")
+        keep_paths = {path for path in files if path in feedback} if isinstance(files, dict) else set()
+        payload["generated_files"] = drop_unchanged_files(generated_files, keep_paths)
+        return self.payload_encoder.encode(payload, stage_name)
 
     @staticmethod
     def _artifact_to_json_value(value: object) -> object:
+        if isinstance(value, JSONArtifact):
+            return value.value
         if isinstance(value, str):
             try:
                 return json.loads(value)
@@ -551,6 +1217,31 @@ class Orchestrator:
         if isinstance(artifact_value, str):
             Orchestrator._log_stage_output(f"{stage_name}.{artifact_name}", artifact_value)
 
+    def _log_cache_stats(self) -> None:
+        stats = getattr(self.llm, "stats", None)
+        if callable(stats):
+            cache_stats = stats()
+            print(f"[ORCHESTRATOR] LLM cache hits: {cache_stats['hits']}, misses: {cache_stats['misses']}")
+        search_stats = getattr(self.researcher.web_search_service, "stats", None)
+        if callable(search_stats):
+            cache_stats = search_stats()
+            print(
+                f"[ORCHESTRATOR] Web search cache hits: {cache_stats['hits']}, misses: {cache_stats['misses']}, "
+                f"deduplicated: {cache_stats['deduplicated']}"
+            )
+
+    def _export_metrics(self) -> None:
+        if self.metrics is None:
+            return
+        totals = self.metrics.snapshot()["totals"]
+        print(
+            f"[ORCHESTRATOR] LLM calls: {totals['calls']}, input tokens: {totals['input_tokens']}, "
+            f"output tokens: {totals['output_tokens']}, cached input tokens: {totals['cached_input_tokens']} "
+            f"({totals['cached_token_ratio']:.0%}), JSON retries: {totals['json_retries']}"
+        )
+        if self.metrics_path is not None:
+            print(f"[ORCHESTRATOR] Wrote metrics: {self.metrics.export(self.metrics_path)}")
+
     @staticmethod
     def _log_generated_images(image_paths: list[Path]) -> None:
         print(f"[ORCHESTRATOR] Generated image count: {len(image_paths)}")
@@ -566,6 +1257,8 @@ class Orchestrator:
                 lines = artifact_value.count("\n") + 1 if artifact_value else 0
                 return f"text, {len(artifact_value)} chars, {lines} lines"
             return Orchestrator._describe_json_value(parsed)
+        if isinstance(artifact_value, JSONArtifact):
+            return Orchestrator._describe_json_value(artifact_value.value)
         if isinstance(artifact_value, Path):
             return f"path '{artifact_value}'"
         if isinstance(artifact_value, list):
@@ -588,12 +1281,14 @@ class Orchestrator:
     @classmethod
     def _build_deterministic_qa_feedback(
         cls,
-        site_structure: str,
-        generated_files: str,
+        site_structure: JSONArtifact,
+        generated_files: JSONArtifact,
+        qa_cache: _DeterministicQACache | None = None,
     ) -> tuple[str, bool]:
         findings = cls._deterministic_site_structure_findings(
             site_structure=site_structure,
             generated_files=generated_files,
+            qa_cache=qa_cache,
         )
         if findings:
             lines = ["Deterministic validation findings:"]
@@ -611,39 +1306,36 @@ class Orchestrator:
     @classmethod
     def _deterministic_site_structure_findings(
         cls,
-        site_structure: str,
-        generated_files: str,
+        site_structure: JSONArtifact,
+        generated_files: JSONArtifact,
+        qa_cache: _DeterministicQACache | None = None,
     ) -> list[str]:
+        qa_cache = qa_cache or _DeterministicQACache()
         findings: list[str] = []
-        files = cls._parse_project_files(generated_files)
+        files = cls._parse_project_files(generated_files.value)
         if files is None:
             return ["Developer output is not valid JSON with a string-only files map."]
 
-        try:
-            content_payload = json.loads(site_structure)
-        except json.JSONDecodeError as exc:
-            return [f"Site structure could not be parsed for deterministic validation: {exc.msg}."]
-
+        content_payload = site_structure.value
         try:
             validate_schema(content_payload, SITE_STRUCTURE_SCHEMA)
         except SchemaValidationError as exc:
             return [f"Site structure could not be validated for deterministic validation: {exc}."]
 
-        html_documents = cls._extract_html_documents(files)
+        html_documents = cls._extract_html_documents(files, qa_cache.documents)
         if not html_documents:
             return ["No HTML files were generated, so site_structure content cannot be verified."]
 
         placeholder_terms = ("lorem ipsum", "placeholder", "tbd", "coming soon")
         for document in html_documents.values():
-            normalized_text = cls._normalize_match_text(document.visible_text)
             for term in placeholder_terms:
-                if cls._normalize_match_text(term) in normalized_text:
+                if cls._normalize_match_text(term) in document.normalized_text:
                     findings.append(
                         f"{document.path} contains placeholder text ('{term}') in rendered content."
                     )
                     break
 
-        for page in content_payload["site_structure"]["pages"]:
+        for page_index, page in enumerate(content_payload["site_structure"]["pages"]):
             matched_document = cls._match_page_to_html_document(page, html_documents)
             if matched_document is None:
                 findings.append(
@@ -651,42 +1343,60 @@ class Orchestrator:
                 )
                 continue
 
-            searchable_text = " ".join([matched_document.title_text, matched_document.visible_text])
+            cached_page = qa_cache.page_findings.get(page_index)
+            if cached_page is not None and cached_page[0] is matched_document:
+                findings.extend(cached_page[1])
+                continue
+
+            page_findings_start = len(findings)
+            searchable_text = f"{matched_document.normalized_title} {matched_document.normalized_text}"
             if not cls._contains_normalized_text(searchable_text, page["title"]):
                 findings.append(
                     f"Page '{page['slug']}' is missing the page title '{page['title']}' in {matched_document.path}."
                 )
 
             for section in page["sections"]:
-                if not cls._contains_normalized_text(matched_document.visible_text, section["heading"]):
+                if not cls._contains_normalized_text(matched_document.normalized_text, section["heading"]):
                     findings.append(
                         f"Page '{page['slug']}' is missing section heading '{section['heading']}' in {matched_document.path}."
                     )
-                if not cls._contains_normalized_text(matched_document.visible_text, section["text"]):
+                if not cls._contains_normalized_text(matched_document.normalized_text, section["text"]):
                     findings.append(
                         f"Page '{page['slug']}' is missing section body text for '{section['heading']}' in {matched_document.path}."
                     )
                 for point in section["supporting_points"]:
-                    if not cls._contains_normalized_text(matched_document.visible_text, point):
+                    if not cls._contains_normalized_text(matched_document.normalized_text, point):
                         findings.append(
                             f"Page '{page['slug']}' is missing supporting point '{point}' in {matched_document.path}."
                         )
+            qa_cache.page_findings[page_index] = (matched_document, findings[page_findings_start:])
 
         return findings
 
     @staticmethod
-    def _extract_html_documents(files: dict[str, str]) -> dict[str, _RenderedHTMLDocument]:
+    def _extract_html_documents(
+        files: dict[str, str],
+        rendered_cache: dict[str, tuple[str, _RenderedHTMLDocument]] | None = None,
+    ) -> dict[str, _RenderedHTMLDocument]:
         html_documents: dict[str, _RenderedHTMLDocument] = {}
         for path, content in files.items():
             if not path.endswith(".html"):
                 continue
+            cached = rendered_cache.get(path) if rendered_cache is not None else None
+            if cached is not None and cached[0] == content:
+                html_documents[path] = cached[1]
+                continue
             parser = _HTMLTextExtractor()
             parser.feed(content)
             html_documents[path] = _RenderedHTMLDocument(
                 path=path,
                 title_text=parser.title_text,
                 visible_text=parser.visible_text,
+                normalized_title=Orchestrator._normalize_match_text(parser.title_text),
+                normalized_text=Orchestrator._normalize_match_text(parser.visible_text),
             )
+            if rendered_cache is not None:
+                rendered_cache[path] = (content, html_documents[path])
         return html_documents
 
     @classmethod
@@ -716,15 +1426,13 @@ class Orchestrator:
         for path, document in html_documents.items():
             score = 0
             normalized_path = path.lower()
-            normalized_title = cls._normalize_match_text(document.title_text)
-            normalized_text = cls._normalize_match_text(document.visible_text)
             if slug_key and slug_key in normalized_path:
                 score += 1
-            if page_title and page_title in normalized_title:
+            if page_title and page_title in document.normalized_title:
                 score += 5
-            if page_title and page_title in normalized_text:
+            if page_title and page_title in document.normalized_text:
                 score += 4
-            if first_heading and first_heading in normalized_text:
+            if first_heading and first_heading in document.normalized_text:
                 score += 3
             if score > best_score:
                 best_score = score
@@ -747,8 +1455,7 @@ class Orchestrator:
         ]
 
     @staticmethod
-    def _contains_normalized_text(haystack: str, needle: str) -> bool:
-        normalized_haystack = Orchestrator._normalize_match_text(haystack)
+    def _contains_normalized_text(normalized_haystack: str, needle: str) -> bool:
         normalized_needle = Orchestrator._normalize_match_text(needle)
         if not normalized_needle:
             return True
@@ -756,22 +1463,20 @@ class Orchestrator:
 
     @staticmethod
     def _normalize_match_text(value: str) -> str:
-        lowered = value.lower()
-        alphanumeric = re.sub(r"[^a-z0-9]+", " ", lowered)
-        return re.sub(r"\s+", " ", alphanumeric).strip()
+        return _NON_ALPHANUMERIC.sub(" ", value.lower()).strip()
 
     @staticmethod
     def _validate_stage_output(
         stage_name: str,
         stage_output: str,
         schema: dict[str, object],
-    ) -> tuple[str, str | None]:
+    ) -> tuple[JSONArtifact | None, str | None]:
         try:
             parsed = json.loads(stage_output)
         except json.JSONDecodeError as exc:
             print(f"[ORCHESTRATOR] ERROR: {stage_name} returned invalid JSON.")
             return (
-                "",
+                None,
                 (
                     f"ERROR: {stage_name} returned invalid structured output.\n"
                     "Validation details:\n"
@@ -780,12 +1485,20 @@ class Orchestrator:
                 ),
             )
 
+        return Orchestrator._validate_stage_value(stage_name=stage_name, value=parsed, schema=schema)
+
+    @staticmethod
+    def _validate_stage_value(
+        stage_name: str,
+        value: object,
+        schema: dict[str, object],
+    ) -> tuple[JSONArtifact | None, str | None]:
         try:
-            validate_schema(parsed, schema)
+            validate_schema(value, schema)
         except SchemaValidationError as exc:
             print(f"[ORCHESTRATOR] ERROR: {stage_name} failed JSON schema validation.")
             return (
-                "",
+                None,
                 (
                     f"ERROR: {stage_name} returned invalid structured output.\n"
                     "Validation details:\n"
@@ -793,7 +1506,7 @@ class Orchestrator:
                     "Pipeline aborted before downstream stages."
                 ),
             )
-        return json.dumps(parsed, indent=2), None
+        return JSONArtifact(value), None
 
     @staticmethod
     def _extract_requirements_document(product_manager_output: str) -> str:
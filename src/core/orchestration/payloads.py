@@ -0,0 +1,82 @@
+import json
+from dataclasses import dataclass
+from dataclasses import field
+
+# Long-lived artifacts, from the longest-lived to the most frequently replaced.
+# Every stage payload lists the ones it uses in this order, ahead of per-call
+# entries such as qa_feedback, so repeated calls to an agent (QA iterations,
+# Developer revisions, JSON retries) share a byte-identical prompt prefix that
+# the provider can serve from its prompt cache.
+STABLE_ARTIFACT_ORDER = (
+    "product_requirements",
+    "research_output",
+    "site_structure",
+    "architecture_spec",
+    "design_spec",
+    "development_tasks",
+    "generated_files",
+)
+
+# Image prompts only matter to the image generator; later stages need the
+# filename and alt text.
+DEFAULT_PRUNED_FIELDS: dict[str, tuple[str, ...]] = {
+    "PlannerAgent": ("design_spec.images[].prompt",),
+    "DeveloperAgent": ("design_spec.images[].prompt",),
+    "DeveloperAgentRevision": ("design_spec.images[].prompt",),
+}
+
+
+def order_payload(payload: dict[str, object]) -> dict[str, object]:
+    """Stable artifacts in canonical order, then the per-call entries in the order given."""
+    stable_names = [name for name in STABLE_ARTIFACT_ORDER if name in payload]
+    delta_names = [name for name in payload if name not in STABLE_ARTIFACT_ORDER]
+    return {name: payload[name] for name in stable_names + delta_names}
+
+
+@dataclass(frozen=True)
+class PayloadEncoder:
+    """Serializes stage payloads for LLM prompts.
+
+    By default payloads are minified, keys inside each artifact are sorted
+    (top-level entries keep the `order_payload` order) and non-ASCII text is
+    kept as-is rather than escaped. `pruned_fields` maps a stage name to
+    dotted paths that stage does not need, where `name[]` applies the rest of
+    the path to every item of a list: `"design_spec.images[].prompt"`.
+    """
+
+    indent: int | None = None
+    sort_keys: bool = True
+    pruned_fields: dict[str, tuple[str, ...]] = field(default_factory=lambda: dict(DEFAULT_PRUNED_FIELDS))
+
+    def encode(self, payload: dict[str, object], stage_name: str | None = None) -> str:
+        for path in self.pruned_fields.get(stage_name or "", ()):
+            payload = _without_field(payload, path.split("."))
+        ordered = order_payload(payload)
+        if self.sort_keys:
+            ordered = {name: _sorted_keys(value) for name, value in ordered.items()}
+        separators = (",", ":") if self.indent is None else None
+        return json.dumps(ordered, indent=self.indent, separators=separators, ensure_ascii=False)
+
+
+def _without_field(value: object, segments: list[str]) -> object:
+    """Copy of `value` without the field at `segments`; the original is left untouched."""
+    key = segments[0].removesuffix("[]")
+    if not isinstance(value, dict) or key not in value:
+        return value
+    pruned = dict(value)
+    rest = segments[1:]
+    if not rest:
+        del pruned[key]
+    elif segments[0].endswith("[]") and isinstance(value[key], list):
+        pruned[key] = [_without_field(item, rest) for item in value[key]]
+    else:
+        pruned[key] = _without_field(value[key], rest)
+    return pruned
+
+
+def _sorted_keys(value: object) -> object:
+    if isinstance(value, dict):
+        return {key: _sorted_keys(value[key]) for key in sorted(value, key=str)}
+    if isinstance(value, list):
+        return [_sorted_keys(item) for item in value]
+    return value
@@ -0,0 +1,168 @@
+import asyncio
+import contextvars
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+from typing import Awaitable
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """One node of the pipeline graph.
+
+    `run` returns None on success or an error message that aborts the pipeline.
+    `arun` is the optional coroutine variant used by StageGraph.arun; stages
+    without it are run in a worker thread.
+    """
+
+    name: str
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    run: Callable[[], str | None]
+    arun: Callable[[], Awaitable[str | None]] | None = None
+
+
+class StageGraph:
+    """Runs pipeline stages as soon as their input artifacts are available.
+
+    An artifact becomes available once any stage listing it in `outputs` has
+    finished successfully. Stages that revise an existing artifact declare it as
+    an output alongside a new one, and consumers of the revision depend on both.
+    """
+
+    def __init__(self, stages: list[PipelineStage], initial_artifacts: tuple[str, ...] = ()) -> None:
+        names = [stage.name for stage in stages]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate pipeline stage names: {', '.join(duplicates)}")
+
+        self.stages = list(stages)
+        self.initial_artifacts = tuple(initial_artifacts)
+        self._check_reachable()
+
+    def run(self, max_workers: int = 1) -> str | None:
+        state = _GraphRunState(self.stages, self.initial_artifacts, max_workers)
+        running: dict[Future[str | None], PipelineStage] = {}
+
+        with ThreadPoolExecutor(max_workers=state.max_workers) as executor:
+            while True:
+                for stage in state.next_ready(len(running)):
+                    running[executor.submit(contextvars.copy_context().run, stage.run)] = stage
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    state.record(running.pop(future), future.exception(), future)
+
+        return state.first_failure()
+
+    async def arun(self, max_workers: int = 1) -> str | None:
+        state = _GraphRunState(self.stages, self.initial_artifacts, max_workers)
+        running: dict[asyncio.Task[str | None], PipelineStage] = {}
+
+        while True:
+            for stage in state.next_ready(len(running)):
+                running[asyncio.ensure_future(self._arun_stage(stage))] = stage
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                state.record(running.pop(task), task.exception(), task)
+
+        return state.first_failure()
+
+    def downstream_of(self, stage_name: str) -> set[str]:
+        """Names of `stage_name` and every stage that consumes its outputs, transitively."""
+        if stage_name not in {stage.name for stage in self.stages}:
+            raise ValueError(
+                f"Unknown pipeline stage '{stage_name}'. Known stages: {', '.join(stage.name for stage in self.stages)}"
+            )
+
+        selected = {stage_name}
+        produced = {name for stage in self.stages if stage.name == stage_name for name in stage.outputs}
+        progressed = True
+        while progressed:
+            progressed = False
+            for stage in self.stages:
+                if stage.name not in selected and produced.intersection(stage.inputs):
+                    selected.add(stage.name)
+                    produced.update(stage.outputs)
+                    progressed = True
+        return selected
+
+    @staticmethod
+    async def _arun_stage(stage: PipelineStage) -> str | None:
+        if stage.arun is not None:
+            return await stage.arun()
+        return await asyncio.to_thread(stage.run)
+
+    def _check_reachable(self) -> None:
+        available = set(self.initial_artifacts)
+        remaining = list(self.stages)
+        progressed = True
+        while remaining and progressed:
+            progressed = False
+            for stage in list(remaining):
+                if all(name in available for name in stage.inputs):
+                    available.update(stage.outputs)
+                    remaining.remove(stage)
+                    progressed = True
+
+        if remaining:
+            blocked = ", ".join(
+                f"{stage.name} (missing {', '.join(sorted(set(stage.inputs) - available))})" for stage in remaining
+            )
+            raise ValueError(f"Pipeline stages can never run: {blocked}")
+
+
+class _GraphRunState:
+    def __init__(self, stages: list[PipelineStage], initial_artifacts: tuple[str, ...], max_workers: int) -> None:
+        self.stages = stages
+        self.max_workers = max(1, max_workers)
+        self.available = set(initial_artifacts)
+        self.pending = list(stages)
+        self.failures: dict[str, str | BaseException] = {}
+
+    def next_ready(self, running_count: int) -> list[PipelineStage]:
+        if self.failures:
+            return []
+        ready: list[PipelineStage] = []
+        for stage in list(self.pending):
+            if running_count + len(ready) >= self.max_workers:
+                break
+            if all(name in self.available for name in stage.inputs):
+                self.pending.remove(stage)
+                ready.append(stage)
+        return ready
+
+    def record(
+        self,
+        stage: PipelineStage,
+        exc: BaseException | None,
+        result: "Future[str | None] | asyncio.Task[str | None]",
+    ) -> None:
+        if exc is not None:
+            self.failures[stage.name] = exc
+            return
+        error = result.result()
+        if error is not None:
+            print(f"[ORCHESTRATOR] Stage {stage.name} failed. No new stages will be started.")
+            self.failures[stage.name] = error
+            return
+        self.available.update(stage.outputs)
+
+    def first_failure(self) -> str | None:
+        for stage in self.stages:
+            failure = self.failures.get(stage.name)
+            if isinstance(failure, BaseException):
+                raise failure
+            if failure is not None:
+                return failure
+        return None
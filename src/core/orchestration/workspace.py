@@ -0,0 +1,185 @@
+import contextlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishes are serialized within one process only.
+    fcntl = None
+
+_PUBLISH_THREAD_LOCK = threading.Lock()
+
+
+class RunWorkspace:
+    """Where pipeline runs build and publish their site and Docker files.
+
+    Every run writes into its own staging directory, `<root>/.staging/<run_key>/`,
+    and `StagedWorkspace.publish` moves it, with one rename, to a directory no
+    other run writes to. By default that is a release, `<root>/.releases/<name>/`,
+    and `<root>/workspace` and `<root>/docker` are symlinks through
+    `<root>/.current`, a single symlink that publish switches with `os.replace`.
+    Readers therefore always see one run's complete site next to the same
+    run's Docker files. The previous release is kept for readers that resolved
+    the old pointer; older ones are deleted. With `per_run=True` runs publish
+    to `<root>/<run_key>/` instead, keeping at most `keep_runs` of them.
+    Publishes into the same root are serialized with a lock file. A real
+    `workspace/` or `docker/` directory already in the root is never replaced:
+    `begin` and `publish` raise FileExistsError until it is moved away.
+
+    `cleanup` decides what happens to the staging directory of a run that
+    failed before publishing: "keep_failed" leaves it for inspection (and for
+    `resume`), "always" deletes it.
+    """
+
+    CLEANUP_POLICIES = ("keep_failed", "always")
+    STAGING_DIRNAME = ".staging"
+    RELEASES_DIRNAME = ".releases"
+    CURRENT_LINK_NAME = ".current"
+    LOCK_NAME = ".publish.lock"
+    # Outside the source tree's tracked workspace/ and docker/ sample output.
+    DEFAULT_ROOT = Path("output")
+
+    def __init__(
+        self,
+        root: Path | str = DEFAULT_ROOT,
+        per_run: bool = False,
+        cleanup: str = "keep_failed",
+        keep_runs: int | None = None,
+    ) -> None:
+        if cleanup not in self.CLEANUP_POLICIES:
+            raise ValueError(f"Unknown cleanup policy '{cleanup}'. Expected one of: {', '.join(self.CLEANUP_POLICIES)}")
+        if keep_runs is not None and (not per_run or keep_runs < 1):
+            raise ValueError("keep_runs requires per_run=True and must be at least 1.")
+        self.root = Path(root)
+        self.per_run = per_run
+        self.cleanup = cleanup
+        self.keep_runs = keep_runs
+
+    def begin(self, run_key: str | None = None, seed_from_published: bool = False) -> "StagedWorkspace":
+        """Start a run. `seed_from_published` copies this run's last published output into a fresh staging dir."""
+        run_key = run_key or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        if not self.per_run:
+            self._check_no_real_output_dirs()
+        staged = StagedWorkspace(self.root / self.STAGING_DIRNAME / run_key, run_key, self)
+        published = self._published_output(run_key)
+        if seed_from_published and published is not None and not staged.staging_dir.exists():
+            shutil.copytree(published, staged.staging_dir, symlinks=True)
+        staged.site_dir.mkdir(parents=True, exist_ok=True)
+        staged.docker_dir.mkdir(parents=True, exist_ok=True)
+        return staged
+
+    def _published_output(self, run_key: str) -> Path | None:
+        """The newest directory `run_key` published to, if it still exists."""
+        if self.per_run:
+            run_dir = self.root / run_key
+            return run_dir if run_dir.is_dir() else None
+        releases_dir = self.root / self.RELEASES_DIRNAME
+        if not releases_dir.is_dir():
+            return None
+        releases = [path for path in releases_dir.iterdir() if path.name.rsplit("-", 1)[0] == run_key]
+        return max(releases, key=lambda path: path.stat().st_mtime, default=None)
+
+    @contextlib.contextmanager
+    def _publish_lock(self) -> Iterator[None]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _PUBLISH_THREAD_LOCK, open(self.root / self.LOCK_NAME, "a", encoding="utf-8") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _check_no_real_output_dirs(self) -> None:
+        for dirname in (StagedWorkspace.SITE_DIRNAME, StagedWorkspace.DOCKER_DIRNAME):
+            path = self.root / dirname
+            if path.exists() and not path.is_symlink():
+                raise FileExistsError(
+                    f"{path} is a real directory, not a link to a published release. Move it away "
+                    "or publish to another RunWorkspace root; it is never deleted or replaced."
+                )
+
+    def _switch_current(self, release_dir: Path) -> None:
+        current_link = self.root / self.CURRENT_LINK_NAME
+        pending_link = self.root / f"{self.CURRENT_LINK_NAME}.{uuid.uuid4().hex[:8]}"
+        pending_link.symlink_to(release_dir.relative_to(self.root), target_is_directory=True)
+        os.replace(pending_link, current_link)
+        for dirname in (StagedWorkspace.SITE_DIRNAME, StagedWorkspace.DOCKER_DIRNAME):
+            self._link_through_current(dirname)
+
+    def _link_through_current(self, dirname: str) -> None:
+        link_path = self.root / dirname
+        target = Path(self.CURRENT_LINK_NAME) / dirname
+        if link_path.is_symlink() and Path(os.readlink(link_path)) == target:
+            return
+        pending_link = link_path.with_name(f".{dirname}.{uuid.uuid4().hex[:8]}")
+        pending_link.symlink_to(target, target_is_directory=True)
+        os.replace(pending_link, link_path)
+
+    def _prune_releases(self, current_dir: Path, previous_dir: Path | None) -> None:
+        keep = {current_dir.name, previous_dir.name if previous_dir is not None else None}
+        for release_dir in (self.root / self.RELEASES_DIRNAME).iterdir():
+            if release_dir.name not in keep:
+                shutil.rmtree(release_dir, ignore_errors=True)
+
+    def _prune_runs(self) -> None:
+        if self.keep_runs is None:
+            return
+        run_dirs = sorted(
+            (path for path in self.root.iterdir() if path.is_dir() and not path.name.startswith(".")),
+            key=lambda path: path.stat().st_mtime,
+        )
+        for run_dir in run_dirs[: -self.keep_runs]:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+class StagedWorkspace:
+    SITE_DIRNAME = "workspace"
+    DOCKER_DIRNAME = "docker"
+
+    def __init__(self, staging_dir: Path, run_key: str, workspace: RunWorkspace) -> None:
+        self.staging_dir = staging_dir
+        self.run_key = run_key
+        self.output_dir = workspace.root / run_key if workspace.per_run else workspace.root
+        self.site_dir = staging_dir / self.SITE_DIRNAME
+        self.docker_dir = staging_dir / self.DOCKER_DIRNAME
+        self.published = False
+        self.failed = False
+        self._workspace = workspace
+
+    def __enter__(self) -> "StagedWorkspace":
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc_info: object) -> None:
+        if self.published:
+            return
+        if not (self.failed or exc_type is not None) or self._workspace.cleanup == "always":
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def published_path(self, staged_path: Path) -> Path:
+        return self.output_dir / staged_path.relative_to(self.staging_dir)
+
+    def publish(self) -> None:
+        workspace = self._workspace
+        with workspace._publish_lock():
+            if workspace.per_run:
+                release_dir = self.output_dir
+                if release_dir.exists():
+                    # Re-publishing a resumed run; no other run writes here.
+                    previous_dir = release_dir.with_name(f".{release_dir.name}.previous-{uuid.uuid4().hex[:8]}")
+                    release_dir.rename(previous_dir)
+                    shutil.rmtree(previous_dir, ignore_errors=True)
+                self.staging_dir.rename(release_dir)
+                workspace._prune_runs()
+            else:
+                workspace._check_no_real_output_dirs()
+                current_link = workspace.root / workspace.CURRENT_LINK_NAME
+                previous_dir = current_link.resolve() if current_link.is_symlink() else None
+                release_dir = workspace.root / workspace.RELEASES_DIRNAME / f"{self.run_key}-{uuid.uuid4().hex[:8]}"
+                release_dir.parent.mkdir(parents=True, exist_ok=True)
+                self.staging_dir.rename(release_dir)
+                workspace._switch_current(release_dir)
+                workspace._prune_releases(release_dir, previous_dir)
+        self.published = True
@@ -0,0 +1,228 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable
+from typing import Callable
+from typing import Iterator
+from typing import TypeVar
+
+from openai import APIConnectionError
+from openai import APIError
+from openai import InternalServerError
+from openai import RateLimitError
+
+T = TypeVar("T")
+
+# Services hand their retries to the limiter (max_retries=0 on the client), so it
+# must also retry what the SDK would have: 429s, 5xx and connection failures or
+# timeouts (APITimeoutError is an APIConnectionError).
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+PRIORITY_LANES = {"interactive": 0, "batch": 1}
+
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("rate_limit_lane", default="interactive")
+
+
+@contextmanager
+def priority_lane(lane: str) -> Iterator[None]:
+    """Route the OpenAI calls made in this context (and threads it hands work to) through `lane`."""
+    if lane not in PRIORITY_LANES:
+        raise ValueError(f"Unknown priority lane '{lane}'. Expected one of: {', '.join(PRIORITY_LANES)}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class RateLimiter:
+    """Token buckets for requests and tokens per minute, shared by every OpenAI call in the process.
+
+    Callers wait in priority order, so an interactive run's calls are admitted
+    before queued batch calls. `call` retries rate-limited requests: a 429
+    pauses every caller for the server's Retry-After (or a jittered exponential
+    backoff) and temporarily lowers the refill rate, which then recovers with
+    each successful call. Server errors, timeouts and connection failures are
+    retried with the same backoff, but only the failed caller waits. Either
+    budget may be None to leave it unlimited.
+    """
+
+    MIN_RATE_SCALE = 0.25
+    RATE_DECREASE = 0.7
+    RATE_RECOVERY = 0.02
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._available_requests = float(requests_per_minute or 0)
+        self._available_tokens = float(tokens_per_minute or 0)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._rate_scale = 1.0
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        ticket = (PRIORITY_LANES[_current_lane.get()], next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    delay = self._admission_delay(ticket, estimated_tokens)
+                    if delay == 0:
+                        break
+                    self._condition.wait(timeout=delay)
+                heapq.heappop(self._waiters)
+                if self.requests_per_minute:
+                    self._available_requests -= 1
+                if self.tokens_per_minute:
+                    self._available_tokens -= min(estimated_tokens, self.tokens_per_minute)
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                raise
+            finally:
+                self._condition.notify_all()
+
+    async def aacquire(self, estimated_tokens: int = 0) -> None:
+        await asyncio.to_thread(self.acquire, estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the API reports how many tokens a call really used."""
+        if not self.tokens_per_minute or actual_tokens == estimated_tokens:
+            return
+        with self._condition:
+            self._refill()
+            self._available_tokens -= actual_tokens - estimated_tokens
+            self._condition.notify_all()
+
+    def call(self, func: Callable[[], T], estimated_tokens: int = 0) -> T:
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated_tokens)
+            try:
+                result = func()
+            except RETRYABLE_ERRORS as exc:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._back_off(exc, attempt))
+                continue
+            self._recover()
+            return result
+        raise AssertionError("unreachable")
+
+    async def acall(self, func: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        for attempt in range(self.max_retries + 1):
+            await self.aacquire(estimated_tokens)
+            try:
+                result = await func()
+            except RETRYABLE_ERRORS as exc:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._back_off(exc, attempt))
+                continue
+            self._recover()
+            return result
+        raise AssertionError("unreachable")
+
+    def _admission_delay(self, ticket: tuple[int, int], estimated_tokens: int) -> float | None:
+        """Seconds until `ticket` can be admitted, or None while a higher-priority caller is ahead."""
+        if self._waiters[0] != ticket:
+            return None
+        self._refill()
+        delays = [self._paused_until - time.monotonic()]
+        if self.requests_per_minute:
+            delays.append((1 - self._available_requests) / self._per_second(self.requests_per_minute))
+        if self.tokens_per_minute:
+            needed = min(estimated_tokens, self.tokens_per_minute)
+            delays.append((needed - self._available_tokens) / self._per_second(self.tokens_per_minute))
+        return max(0.0, *delays)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        if self.requests_per_minute:
+            self._available_requests = min(
+                self.requests_per_minute, self._available_requests + elapsed * self._per_second(self.requests_per_minute)
+            )
+        if self.tokens_per_minute:
+            self._available_tokens = min(
+                self.tokens_per_minute, self._available_tokens + elapsed * self._per_second(self.tokens_per_minute)
+            )
+
+    def _per_second(self, per_minute: float) -> float:
+        return per_minute * self._rate_scale / 60
+
+    def _back_off(self, exc: APIError, attempt: int) -> float:
+        """Schedule the retry of a failed call; returns how long the failed caller should sleep first."""
+        retry_after = _retry_after_seconds(exc)
+        if retry_after is None:
+            delay = min(self.max_delay, self.base_delay * 2**attempt) * random.uniform(0.5, 1.0)
+        else:
+            delay = min(self.max_delay, retry_after) * random.uniform(1.0, 1.1)
+        if not isinstance(exc, RateLimitError):
+            print(
+                f"[RATE_LIMIT] {type(exc).__name__} from OpenAI; retrying in {delay:.1f}s "
+                f"(retry {attempt + 1}/{self.max_retries})."
+            )
+            return delay
+        print(f"[RATE_LIMIT] 429 from OpenAI; pausing calls for {delay:.1f}s (retry {attempt + 1}/{self.max_retries}).")
+        with self._condition:
+            self._refill()
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._rate_scale = max(self.MIN_RATE_SCALE, self._rate_scale * self.RATE_DECREASE)
+            self._condition.notify_all()
+        return 0.0
+
+    def _recover(self) -> None:
+        if self._rate_scale < 1.0:
+            with self._condition:
+                self._refill()
+                self._rate_scale = min(1.0, self._rate_scale + self.RATE_RECOVERY)
+
+
+def _retry_after_seconds(exc: APIError) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) / scale)
+        except ValueError:
+            continue
+    return None
+
+
+_process_rate_limiter: RateLimiter | None = None
+
+
+def configure_rate_limiter(
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    max_retries: int = 5,
+) -> RateLimiter:
+    """Install the process-wide limiter that OpenAI services created afterwards use by default."""
+    global _process_rate_limiter
+    _process_rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute, max_retries=max_retries)
+    return _process_rate_limiter
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    return _process_rate_limiter
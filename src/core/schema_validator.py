@@ -1,30 +1,54 @@
 import json
 import logging
+import threading
+from collections import OrderedDict
 from typing import Any
 
 from jsonschema import Draft202012Validator
-from jsonschema import ValidationError
 
 logger = logging.getLogger(__name__)
 
+_VALIDATOR_CACHE_SIZE = 128
+_validators: "OrderedDict[int, tuple[dict[str, Any], Draft202012Validator]]" = OrderedDict()
+_validators_lock = threading.Lock()
+
 
 class SchemaValidationError(ValueError):
     """Raised when data fails JSON Schema validation."""
 
 
 def validate_schema(data: Any, schema: dict[str, Any]) -> None:
-    validator = Draft202012Validator(schema)
-    errors = sorted(validator.iter_errors(data), key=lambda error: list(error.absolute_path))
-    if not errors:
+    validator = _compiled_validator(schema)
+    if validator.is_valid(data):
         return
 
-    first_error = errors[0]
+    first_error = min(validator.iter_errors(data), key=lambda error: list(error.absolute_path))
     path = ".".join(str(part) for part in first_error.absolute_path) or "<root>"
     logger.error("Schema validation failed at %s: %s", path, first_error.message)
     logger.error("Invalid output for debugging:\n%s", _format_debug_output(data))
     raise SchemaValidationError(f"Schema validation failed at {path}: {first_error.message}")
 
 
+def _compiled_validator(schema: dict[str, Any]) -> Draft202012Validator:
+    # Schemas are module-level constants, so identity is a cheap key. The entry
+    # keeps the schema alive and is checked against it, so a recycled id() of a
+    # short-lived schema never returns another schema's validator.
+    key = id(schema)
+    with _validators_lock:
+        entry = _validators.get(key)
+        if entry is not None and entry[0] is schema:
+            _validators.move_to_end(key)
+            return entry[1]
+
+    validator = Draft202012Validator(schema)
+    with _validators_lock:
+        _validators[key] = (schema, validator)
+        _validators.move_to_end(key)
+        while len(_validators) > _VALIDATOR_CACHE_SIZE:
+            _validators.popitem(last=False)
+    return validator
+
+
 def _format_debug_output(data: Any) -> str:
     try:
         return json.dumps(data, indent=2, ensure_ascii=True)
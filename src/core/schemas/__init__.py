@@ -229,6 +229,27 @@ GENERATED_FILES_SCHEMA = {
     },
 }
 
+GENERATED_FILES_PATCH_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["files"],
+    "properties": {
+        "files": {
+            "type": "object",
+            "patternProperties": {
+                r"^.+$": {
+                    "type": "string",
+                }
+            },
+            "additionalProperties": True,
+        },
+        "deleted_files": {
+            "type": "array",
+            "items": NON_EMPTY_STRING,
+        },
+    },
+}
+
 OUTPUT_SCHEMAS = {
     "product_requirements": PRODUCT_REQUIREMENTS_SCHEMA,
     "research_output": RESEARCH_OUTPUT_SCHEMA,
@@ -243,6 +264,7 @@ __all__ = [
     "ARCHITECTURE_SPEC_SCHEMA",
     "DESIGN_SPEC_SCHEMA",
     "DEVELOPMENT_TASKS_SCHEMA",
+    "GENERATED_FILES_PATCH_SCHEMA",
     "GENERATED_FILES_SCHEMA",
     "OUTPUT_SCHEMAS",
     "PRODUCT_REQUIREMENTS_SCHEMA",
@@ -0,0 +1,152 @@
+import functools
+import re
+from typing import Any
+
+from .metrics import MetricsRecorder
+
+# Characters per token for the fallback estimate when tiktoken or its encoding
+# files (downloaded on first use) are unavailable.
+# Slightly below OpenAI's ~4 for English so the estimate errs on the large side.
+_HEURISTIC_CHARS_PER_TOKEN = 3.5
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_URL = re.compile(r"https?://")
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str) -> Any:
+    """tiktoken encoding for `model`, or None when it cannot be loaded."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # noqa: BLE001
+        # tiktoken downloads encodings on first use; offline, fall back to the estimate.
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return int(len(text) / _HEURISTIC_CHARS_PER_TOKEN + 0.5)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4o", from_end: bool = False) -> str:
+    """Longest prefix (or suffix, with `from_end`) of `text` that fits in `max_tokens`."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding(model)
+    if encoding is None:
+        max_chars = int(max_tokens * _HEURISTIC_CHARS_PER_TOKEN)
+        return text[-max_chars:] if from_end else text[:max_chars]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[-max_tokens:] if from_end else tokens[:max_tokens])
+
+
+class TokenBudget:
+    """Per-agent limits on prompt size, counted with tiktoken.
+
+    `agent_limits` is looked up by `agent_name`, then by the part before the
+    first "." (so "researcher" also covers "researcher.extract_scope"), then
+    falls back to `max_input_tokens`. `check` runs before every LLM call and
+    only warns; callers that build large prompts trim them with `fits` and the
+    trimming policies below before the call is made.
+    """
+
+    DEFAULT_MAX_INPUT_TOKENS = 120_000
+    DEFAULT_LOG_TOKENS = 2_000
+
+    def __init__(
+        self,
+        max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
+        agent_limits: dict[str, int] | None = None,
+        model: str = "gpt-4o",
+        log_tokens: int = DEFAULT_LOG_TOKENS,
+    ) -> None:
+        self.max_input_tokens = max_input_tokens
+        self.agent_limits = dict(agent_limits or {})
+        self.model = model
+        self.log_tokens = log_tokens
+
+    def limit_for(self, agent_name: str | None) -> int:
+        name = agent_name or ""
+        if name in self.agent_limits:
+            return self.agent_limits[name]
+        return self.agent_limits.get(name.split(".", 1)[0], self.max_input_tokens)
+
+    def count(self, *texts: str) -> int:
+        return sum(count_tokens(text, self.model) for text in texts)
+
+    def available(self, agent_name: str | None, *fixed_texts: str) -> int:
+        """Tokens left for the variable part of a prompt once `fixed_texts` are counted."""
+        return self.limit_for(agent_name) - self.count(*fixed_texts)
+
+    def check(
+        self,
+        agent_name: str | None,
+        system_prompt: str,
+        user_input: str,
+        metrics: MetricsRecorder | None = None,
+    ) -> bool:
+        tokens = self.count(system_prompt, user_input)
+        limit = self.limit_for(agent_name)
+        if tokens <= limit:
+            return True
+        name = agent_name or "llm"
+        print(f"[TOKEN_BUDGET] WARNING: {name} prompt is ~{tokens} tokens, over its {limit}-token budget.")
+        if metrics is not None:
+            metrics.record_budget_warning(name)
+        return False
+
+
+def summarize_search_results(results: str, max_tokens: int, model: str = "gpt-4o") -> str:
+    """Shrink `Query: ...` search result blocks to fit `max_tokens`.
+
+    Query and URL lines are kept and every other line is cut to its first
+    sentence. If that is not enough, each query block gets an equal share of
+    the budget so every query stays represented.
+    """
+    if count_tokens(results, model) <= max_tokens:
+        return results
+    condensed = "\n".join(
+        line if line.startswith("Query:") or _URL.search(line) else _first_sentence(line)
+        for line in results.splitlines()
+    )
+    if count_tokens(condensed, model) <= max_tokens:
+        return condensed
+    blocks = condensed.split("\n\nQuery:")
+    share = max_tokens // len(blocks)
+    return "\n\nQuery:".join(truncate_to_tokens(block, share, model) for block in blocks)
+
+
+def drop_unchanged_files(generated_files: dict[str, Any], keep_paths: set[str]) -> dict[str, Any]:
+    """Copy of a generated_files value that keeps only `keep_paths` and lists the rest as omitted."""
+    files = generated_files.get("files")
+    if not isinstance(files, dict):
+        return generated_files
+    trimmed = dict(generated_files)
+    trimmed["files"] = {path: content for path, content in files.items() if path in keep_paths}
+    trimmed["omitted_files"] = sorted(path for path in files if path not in keep_paths)
+    return trimmed
+
+
+def truncate_log(text: str, max_tokens: int, model: str = "gpt-4o") -> str:
+    """Keep the head and tail of a long log, where the summary and the final errors usually are."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    head = truncate_to_tokens(text, max_tokens // 2, model)
+    tail = truncate_to_tokens(text, max_tokens // 2, model, from_end=True)
+    omitted = len(text) - len(head) - len(tail)
+    return f"{head}\n[... {omitted} characters truncated ...]\n{tail}"
+
+
+def _first_sentence(line: str, max_chars: int = 200) -> str:
+    sentence = _SENTENCE_END.split(line, maxsplit=1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars].rstrip() + "..."
@@ -1,21 +1,41 @@
-import os
+from typing import Any
 
 from openai import OpenAI
 
+from .openai_client import shared_openai_client
+from .rate_limiter import RateLimiter
+from .rate_limiter import get_rate_limiter
+from .token_budget import count_tokens
+
 
 class WebSearchService:
     """Reusable web search service powered by OpenAI tool calling."""
 
-    def __init__(self, model: str = "gpt-4o") -> None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY is not set.")
-
-        self.client = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        client: OpenAI | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.client = client or shared_openai_client()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        if self.rate_limiter is not None:
+            self.client = self.client.with_options(max_retries=0)
         self.model = model
 
     def search(self, query: str) -> str:
-        response = self.client.responses.create(
+        if self.rate_limiter is None:
+            response = self._create_response(query)
+        else:
+            estimated_tokens = count_tokens(query)
+            response = self.rate_limiter.call(lambda: self._create_response(query), estimated_tokens)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self.rate_limiter.settle(estimated_tokens, (usage.input_tokens or 0) + (usage.output_tokens or 0))
+        return (response.output_text or "").strip()
+
+    def _create_response(self, query: str) -> Any:
+        return self.client.responses.create(
             model=self.model,
             tools=[{"type": "web_search_preview"}],
             input=[
@@ -30,4 +50,3 @@ class WebSearchService:
                 {"role": "user", "content": query},
             ],
         )
-        return (response.output_text or "").strip()
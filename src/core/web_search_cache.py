@@ -0,0 +1,103 @@
+import hashlib
+import json
+import threading
+import unicodedata
+from concurrent.futures import Future
+from pathlib import Path
+
+from .cache_store import SQLiteCacheStore
+from .web_search import WebSearchService
+
+_TRAILING_PUNCTUATION = "?!.,;"
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query, ignoring trailing punctuation.
+
+    Other punctuation is kept: "C++" and "C#" are different searches, and so
+    are operators such as `site:` and `-term`.
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split()).rstrip(_TRAILING_PUNCTUATION).rstrip()
+
+
+class CachingWebSearchService:
+    """WebSearchService wrapper that serves repeated queries from an on-disk cache.
+
+    Queries are keyed on their normalized text and the search model, so
+    "Bakery websites?" and "bakery  websites" share an entry. Concurrent
+    searches for the same key (e.g. pipelines sharing this service) wait for
+    the one request already in flight instead of issuing their own.
+    """
+
+    DEFAULT_CACHE_PATH = Path(".cache") / "web_search.sqlite3"
+    DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+    def __init__(
+        self,
+        service: WebSearchService,
+        cache_path: Path | str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        max_bytes: int | None = SQLiteCacheStore.DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.service = service
+        self.model = getattr(service, "model", type(service).__name__)
+        self.store = SQLiteCacheStore(cache_path, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self._stats_lock = threading.Lock()
+        self._in_flight: dict[str, Future[str]] = {}
+        self._in_flight_lock = threading.Lock()
+
+    def search(self, query: str) -> str:
+        key = self.cache_key(query)
+        cached = self.store.get(key)
+        if cached is not None:
+            return self._serve_hit(query, key, cached)
+
+        with self._in_flight_lock:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = self._in_flight[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            with self._stats_lock:
+                self.deduplicated += 1
+            print(f"[WEB_SEARCH_CACHE] Waiting on in-flight search for '{query}' ({key[:12]}).")
+            return pending.result()
+
+        try:
+            # Another caller may have finished and stored this key since the lookup above.
+            cached = self.store.get(key)
+            if cached is not None:
+                pending.set_result(cached)
+                return self._serve_hit(query, key, cached)
+            with self._stats_lock:
+                self.misses += 1
+            result = self.service.search(query)
+            if result:
+                self.store.set(key, result)
+            pending.set_result(result)
+            return result
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+
+    def cache_key(self, query: str) -> str:
+        material = json.dumps({"model": self.model, "query": normalize_query(query)}, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses, "deduplicated": self.deduplicated}
+
+    def _serve_hit(self, query: str, key: str, cached: str) -> str:
+        with self._stats_lock:
+            self.hits += 1
+        print(f"[WEB_SEARCH_CACHE] Hit for '{query}' ({key[:12]}).")
+        return cached
@@ -423,6 +423,37 @@ def fake_web_search_service() -> FakeWebSearchService:
     return FakeWebSearchService()
 
 
+@pytest.fixture
+def pipeline_responses(
+    product_requirements_output: str,
+    research_scope_output: str,
+    strategic_queries_output: str,
+    knowledge_queries_output: str,
+    research_output_json: str,
+    site_structure_json: str,
+    architecture_spec_json: str,
+    design_spec_json: str,
+    development_tasks_json: str,
+    generated_files_json: str,
+    qa_approved_feedback: str,
+    devops_output: str,
+) -> dict[str, list[str]]:
+    return {
+        "product_manager": [product_requirements_output],
+        "researcher.extract_scope": [research_scope_output],
+        "researcher.strategic_queries": [strategic_queries_output],
+        "researcher.knowledge_queries": [knowledge_queries_output],
+        "researcher": [research_output_json],
+        "content_designer": [site_structure_json],
+        "architect": [architecture_spec_json],
+        "designer": [design_spec_json],
+        "planner": [development_tasks_json],
+        "developer": [generated_files_json],
+        "qa": [qa_approved_feedback],
+        "devops": [devops_output],
+    }
+
+
 def assert_product_requirements_document(output: str) -> None:
     required_sections = [
         "REQUIREMENTS_READY",
@@ -0,0 +1,26 @@
+import json
+
+from src.core.orchestration.artifacts import JSONArtifact
+from src.core.orchestration.orchestrator import Orchestrator
+from src.core.orchestration.payloads import PayloadEncoder
+
+
+def test_json_artifact_serializes_lazily_and_once() -> None:
+    artifact = JSONArtifact({"files": {"index.html": "<main></main>"}})
+
+    assert artifact._text is None
+    assert json.loads(artifact.text) == artifact.value
+    assert artifact.text is artifact.text
+
+
+def test_artifact_payload_embeds_parsed_values_without_reparsing() -> None:
+    artifact = JSONArtifact({"pages": [{"slug": "/"}]})
+
+    values = {"site_structure": artifact, "note": "plain text"}
+    encoded = PayloadEncoder().encode(
+        {name: Orchestrator._artifact_to_json_value(value) for name, value in values.items()},
+        "ArchitectAgent",
+    )
+
+    assert json.loads(encoded) == {"site_structure": {"pages": [{"slug": "/"}]}, "note": "plain text"}
+    assert artifact._text is None
@@ -0,0 +1,102 @@
+import json
+from functools import partial
+
+from src.core.mock_llm import MockLLM
+from src.core.orchestration.batch import load_batch_requirements
+from src.core.orchestration.batch import run_batch
+from src.core.orchestration.batch import write_batch_report
+from src.core.orchestration.orchestrator import Orchestrator
+from src.core.orchestration.workspace import RunWorkspace
+from tests.conftest import FakeImageGenerator
+from tests.conftest import FakeWebSearchService
+
+
+def _mock_orchestrator(responses: dict[str, list[str]]) -> Orchestrator:
+    orchestrator = Orchestrator(llm=MockLLM(responses), interactive=False)
+    orchestrator.researcher.web_search_service = FakeWebSearchService()
+    orchestrator.image_generator = FakeImageGenerator()
+    return orchestrator
+
+
+def test_load_batch_requirements_assigns_safe_unique_ids(tmp_path) -> None:
+    batch_file = tmp_path / "sites.jsonl"
+    batch_file.write_text(
+        '{"id": "bakery shop/main", "requirement": "Bakery site"}\n\n{"requirement": "Florist site"}\n',
+        encoding="utf-8",
+    )
+
+    sites = load_batch_requirements(batch_file)
+
+    assert [(site.site_id, site.requirement) for site in sites] == [
+        ("bakery-shop-main", "Bakery site"),
+        ("site-0002", "Florist site"),
+    ]
+
+
+def test_run_batch_builds_each_site_in_its_own_directory(
+    monkeypatch,
+    tmp_path,
+    pipeline_responses: dict[str, list[str]],
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    batch_file = tmp_path / "sites.jsonl"
+    batch_file.write_text(
+        '{"id": "crypto", "requirement": "Build a cryptocurrency education website"}\n'
+        '{"id": "crypto-again", "requirement": "Build a cryptocurrency education website"}\n',
+        encoding="utf-8",
+    )
+
+    results = run_batch(
+        load_batch_requirements(batch_file),
+        output_dir=tmp_path / "out",
+        max_workers=2,
+        orchestrator_factory=partial(_mock_orchestrator, pipeline_responses),
+    )
+    report = write_batch_report(results, tmp_path / "out" / "report.json", wall_time_seconds=1.0)
+
+    assert [result.status for result in results] == ["succeeded", "succeeded"]
+    assert (tmp_path / "out" / "crypto" / "workspace" / "index.html").exists()
+    assert (tmp_path / "out" / "crypto-again" / "docker" / "Dockerfile").exists()
+    assert "[ORCHESTRATOR]" in (tmp_path / "out" / "crypto" / "run.log").read_text(encoding="utf-8")
+    assert json.loads((tmp_path / "out" / "report.json").read_text())["summary"] == report["summary"]
+    assert report["summary"]["succeeded"] == 2
+
+
+def _per_run_orchestrator(responses: dict[str, list[str]]) -> Orchestrator:
+    orchestrator = _mock_orchestrator(responses)
+    orchestrator.workspace = RunWorkspace(per_run=True, keep_runs=1, cleanup="always")
+    return orchestrator
+
+
+def test_run_batch_keeps_the_factory_workspace_settings(
+    monkeypatch,
+    tmp_path,
+    pipeline_responses: dict[str, list[str]],
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    batch_file = tmp_path / "sites.jsonl"
+    batch_file.write_text('{"id": "crypto", "requirement": "Build a cryptocurrency education website"}\n')
+
+    results = run_batch(
+        load_batch_requirements(batch_file),
+        output_dir=tmp_path / "out",
+        max_workers=1,
+        orchestrator_factory=partial(_per_run_orchestrator, pipeline_responses),
+    )
+
+    assert results[0].status == "succeeded"
+    assert len(list((tmp_path / "out" / "crypto").glob("*/workspace/index.html"))) == 1
+
+
+def test_refine_requirements_does_not_prompt_when_non_interactive(
+    monkeypatch,
+    product_requirements_output: str,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("builtins.input", lambda prompt: (_ for _ in ()).throw(AssertionError(prompt)))
+    llm = MockLLM({"product_manager": ["Which colors do you prefer?", product_requirements_output]})
+    orchestrator = Orchestrator(llm=llm, interactive=False)
+
+    orchestrator._refine_requirements("Build a bakery website")
+
+    assert "Make reasonable assumptions" in llm.calls[1]["user_input"]
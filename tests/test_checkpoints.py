@@ -0,0 +1,81 @@
+import pytest
+
+from src.core.mock_llm import MockLLM
+from src.core.orchestration.checkpoints import RunCheckpoint
+from src.core.orchestration.orchestrator import Orchestrator
+
+
+@pytest.fixture
+def checkpointed_orchestrator(monkeypatch, tmp_path, fake_web_search_service, fake_image_generator_factory):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        "src.core.orchestration.orchestrator.ImageGenerator",
+        fake_image_generator_factory,
+    )
+    monkeypatch.chdir(tmp_path)
+
+    def _build(responses: dict[str, list[str]]) -> Orchestrator:
+        orchestrator = Orchestrator(llm=MockLLM(responses), checkpoint_dir=tmp_path / "runs")
+        orchestrator.researcher.web_search_service = fake_web_search_service
+        return orchestrator
+
+    return _build
+
+
+def _run_id(tmp_path) -> str:
+    (run_dir,) = (tmp_path / "runs").iterdir()
+    return run_dir.name
+
+
+def test_resume_restores_upstream_stages_after_developer_failure(
+    tmp_path,
+    checkpointed_orchestrator,
+    pipeline_responses: dict[str, list[str]],
+    fake_web_search_service,
+) -> None:
+    failing_responses = dict(pipeline_responses, developer=["not json", "still not json"])
+    with pytest.raises(ValueError):
+        checkpointed_orchestrator(failing_responses).run("Build a cryptocurrency education website")
+    searches_before_resume = len(fake_web_search_service.queries)
+
+    orchestrator = checkpointed_orchestrator(
+        {name: pipeline_responses[name] for name in ("developer", "qa", "devops")}
+    )
+    result = orchestrator.resume(_run_id(tmp_path))
+
+    assert "Deployment instructions" in result
+    assert [call["agent_name"] for call in orchestrator.llm.calls] == ["developer", "qa", "devops"]
+    assert len(fake_web_search_service.queries) == searches_before_resume
+
+
+def test_resume_from_stage_reruns_only_that_stage_and_its_consumers(
+    tmp_path,
+    checkpointed_orchestrator,
+    pipeline_responses: dict[str, list[str]],
+) -> None:
+    checkpointed_orchestrator(pipeline_responses).run("Build a cryptocurrency education website")
+
+    orchestrator = checkpointed_orchestrator({name: pipeline_responses[name] for name in ("qa", "devops")})
+    result = orchestrator.resume(_run_id(tmp_path), from_stage="QAAgent")
+
+    assert "Deployment instructions" in result
+    assert [call["agent_name"] for call in orchestrator.llm.calls] == ["qa", "devops"]
+
+
+def test_resume_rejects_unknown_stage(tmp_path, checkpointed_orchestrator, pipeline_responses) -> None:
+    checkpointed_orchestrator(pipeline_responses).run("Build a cryptocurrency education website")
+
+    with pytest.raises(ValueError, match="Unknown pipeline stage"):
+        checkpointed_orchestrator({}).resume(_run_id(tmp_path), from_stage="Nope")
+
+
+def test_restore_rejects_output_files_rewritten_by_another_run(tmp_path) -> None:
+    site_file = tmp_path / "workspace" / "index.html"
+    site_file.parent.mkdir()
+    site_file.write_text("this run", encoding="utf-8")
+    checkpoint = RunCheckpoint.create(tmp_path / "runs")
+    checkpoint.record_stage("Persist", {"generated_files": "abc"}, {"written_paths": [site_file]})
+
+    assert RunCheckpoint.open(tmp_path / "runs", checkpoint.run_id).restore_stage("Persist", {"generated_files": "abc"})
+    site_file.write_text("another run", encoding="utf-8")
+    assert RunCheckpoint.open(tmp_path / "runs", checkpoint.run_id).restore_stage("Persist", {"generated_files": "abc"}) is None
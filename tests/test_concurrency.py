@@ -0,0 +1,33 @@
+import threading
+import time
+
+from src.core.concurrency import run_concurrently
+
+
+def test_run_concurrently_overlaps_tasks_and_preserves_input_order() -> None:
+    barrier = threading.Barrier(3, timeout=2)
+
+    def _task(value: int) -> int:
+        barrier.wait()
+        time.sleep(0.01 * (3 - value))
+        return value * 10
+
+    outcomes = run_concurrently(_task, [1, 2, 3], max_workers=3)
+
+    assert [outcome.value for outcome in outcomes] == [10, 20, 30]
+    assert all(outcome.ok for outcome in outcomes)
+
+
+def test_run_concurrently_reports_failures_and_timeouts_per_task() -> None:
+    def _task(value: str) -> str:
+        if value == "boom":
+            raise RuntimeError("boom")
+        if value == "slow":
+            time.sleep(1)
+        return value
+
+    outcomes = run_concurrently(_task, ["ok", "boom", "slow"], max_workers=3, timeout=0.1)
+
+    assert outcomes[0].value == "ok"
+    assert isinstance(outcomes[1].error, RuntimeError)
+    assert isinstance(outcomes[2].error, TimeoutError)
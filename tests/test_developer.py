@@ -1,3 +1,5 @@
+import json
+
 from src.agents.developer import DeveloperAgent
 from src.core.mock_llm import MockLLM
 from src.core.orchestration.orchestrator import Orchestrator
@@ -15,4 +17,16 @@ def test_developer_returns_valid_generated_files(
         stage_output=result,
     )
     assert error is None
-    assert '"index.html"' in normalized
+    assert '"index.html"' in normalized.text
+
+
+def test_developer_streams_files_as_they_complete(
+    generated_files_json: str,
+) -> None:
+    agent = DeveloperAgent(llm=MockLLM([generated_files_json], stream_chunk_size=16))
+    streamed: list[str] = []
+
+    result = agent.run_streaming("structured inputs", on_file=lambda path, content: streamed.append(path))
+
+    assert streamed == ["index.html", "css/styles.css", "js/main.js"]
+    assert json.loads(result) == json.loads(generated_files_json)
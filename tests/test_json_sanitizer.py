@@ -18,3 +18,20 @@ def test_sanitize_json_response_allows_json_parsing(raw_response: str, expected:
     cleaned = sanitize_llm_output(raw_response)
 
     assert json.loads(cleaned) == expected
+
+
+@pytest.mark.parametrize(
+    ("raw_response", "expected"),
+    [
+        ('Use {name} placeholders.\n{"key": [1, 2,],}', {"key": [1, 2]}),
+        ('Stray { brace before {"key": "value"}', {"key": "value"}),
+        ('Quoted "{brace" then {"key": "value"}', {"key": "value"}),
+        ('{"key": "keeps ``` and , } inside strings"}', {"key": "keeps ``` and , } inside strings"}),
+        ('{"outer": broken {"inner": "value"}}', {"inner": "value"}),
+        ('```JSON\n[{"key": "value"},]\n```', [{"key": "value"}]),
+        ('Draft: {"a": [{"b": ["cut off\nFinal: {"key": "value"}', {"key": "value"}),
+        ('{"a": [1, {"b": 2}', {"b": 2}),
+    ],
+)
+def test_sanitize_llm_output_scans_past_prose_and_repairs_commas(raw_response: str, expected: object) -> None:
+    assert json.loads(sanitize_llm_output(raw_response)) == expected
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from src.core.json_stream import StreamingFilesParser
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 10_000])
+def test_streaming_files_parser_emits_each_file_when_its_value_closes(chunk_size: int) -> None:
+    files = {
+        "index.html": '<a href="css/styles.css">Say "hi" {now}</a>\n',
+        "css/styles.css": "body { content: '\\\\'; }",
+        "js/main.js": "console.log('é');",
+    }
+    payload = "```json\n" + json.dumps({"files": files, "notes": {"index.html": "ignored"}}) + "\n```"
+    parser = StreamingFilesParser()
+
+    emitted: list[tuple[str, str]] = []
+    for start in range(0, len(payload), chunk_size):
+        emitted.extend(parser.feed(payload[start : start + chunk_size]))
+
+    assert emitted == list(files.items())
+    assert parser.finished
+
+
+def test_streaming_files_parser_reports_files_before_the_stream_ends() -> None:
+    parser = StreamingFilesParser()
+
+    first = parser.feed('{"files": {"index.html": "<p>ready</p>", "css/styles.css": "bo')
+
+    assert first == [("index.html", "<p>ready</p>")]
+    assert parser.feed('dy {}"}}') == [("css/styles.css", "body {}")]
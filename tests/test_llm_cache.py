@@ -0,0 +1,65 @@
+import asyncio
+
+from src.core.cache_store import SQLiteCacheStore
+from src.core.llm_cache import CachingLLM
+from src.core.mock_llm import MockLLM
+
+
+def test_caching_llm_serves_repeated_calls_from_disk(tmp_path) -> None:
+    inner = MockLLM(["first response", "second response"])
+    cache_path = tmp_path / "llm.sqlite3"
+    llm = CachingLLM(inner, cache_path=cache_path)
+
+    first = llm.generate(system_prompt="system", user_input="same input", agent_name="architect")
+    second = llm.generate(system_prompt="system", user_input="same input", agent_name="architect")
+    reloaded = CachingLLM(MockLLM([]), cache_path=cache_path).generate(system_prompt="system", user_input="same input")
+
+    assert first == second == reloaded == "first response"
+    assert len(inner.calls) == 1
+    assert llm.stats() == {"hits": 1, "misses": 1}
+
+
+class AsyncMockLLM(MockLLM):
+    async def agenerate(self, system_prompt, user_input, tools=None, agent_name=None) -> str:
+        return self.generate(system_prompt, user_input, tools=tools, agent_name=agent_name)
+
+
+def test_caching_llm_agenerate_shares_the_cache_with_generate(tmp_path) -> None:
+    inner = AsyncMockLLM(["async response", "unused"])
+    llm = CachingLLM(inner, cache_path=tmp_path / "llm.sqlite3")
+
+    first = asyncio.run(llm.agenerate(system_prompt="system", user_input="same input", agent_name="architect"))
+    second = llm.generate(system_prompt="system", user_input="same input", agent_name="architect")
+    sync_only = CachingLLM(MockLLM(["sync response"]), cache_path=tmp_path / "sync.sqlite3")
+    for _ in range(2):
+        assert asyncio.run(sync_only.agenerate(system_prompt="system", user_input="same input")) == "sync response"
+
+    assert first == second == "async response"
+    assert len(inner.calls) == 1
+    assert llm.stats() == sync_only.stats() == {"hits": 1, "misses": 1}
+
+
+def test_caching_llm_keys_on_prompts_and_tools(tmp_path) -> None:
+    llm = CachingLLM(MockLLM([]), cache_path=tmp_path / "llm.sqlite3")
+
+    base_key = llm.cache_key(system_prompt="system", user_input="input")
+
+    assert base_key == llm.cache_key(system_prompt="system", user_input="input", tools=None)
+    assert base_key != llm.cache_key(system_prompt="system", user_input="other input")
+    assert base_key != llm.cache_key(system_prompt="system", user_input="input", tools=[{"type": "web_search_preview"}])
+
+
+def test_cache_store_expires_and_evicts_least_recently_used_entries(tmp_path) -> None:
+    expiring = SQLiteCacheStore(tmp_path / "expiring.sqlite3", ttl_seconds=-1)
+    expiring.set("key", "value")
+    assert expiring.get("key") is None
+
+    store = SQLiteCacheStore(tmp_path / "lru.sqlite3", ttl_seconds=None, max_bytes=10)
+    store.set("a", "aaaa")
+    store.set("b", "bbbb")
+    assert store.get("a") == "aaaa"
+    store.set("c", "cccc")
+
+    assert store.get("b") is None
+    assert store.get("a") == "aaaa"
+    assert store.get("c") == "cccc"
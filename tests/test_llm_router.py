@@ -0,0 +1,71 @@
+import asyncio
+
+from src.core.llm import AsyncLLM
+from src.core.llm_router import RoutingLLM
+from src.core.metrics import MetricsRecorder
+from src.core.mock_llm import MockLLM
+
+
+class FailingLLM(MockLLM):
+    def generate(self, system_prompt, user_input, tools=None, agent_name=None) -> str:
+        super().generate(system_prompt, user_input, tools=tools, agent_name=agent_name)
+        raise RuntimeError("model unavailable")
+
+
+def test_routing_llm_picks_model_by_agent_name_then_prefix() -> None:
+    llms: dict[str, MockLLM] = {}
+
+    def factory(model: str) -> MockLLM:
+        llms[model] = MockLLM(default_responses=[f"{model} response"] * 3)
+        return llms[model]
+
+    router = RoutingLLM(
+        routes={"researcher": "small", "researcher.dossier": "medium"},
+        default_model="large",
+        llm_factory=factory,
+    )
+
+    assert router.generate("system", "input", agent_name="researcher.extract_scope") == "small response"
+    assert router.generate("system", "input", agent_name="researcher.dossier") == "medium response"
+    assert router.generate("system", "input", agent_name="developer") == "large response"
+    assert [call["agent_name"] for call in llms["small"].calls] == ["researcher.extract_scope"]
+
+
+def test_routing_llm_escalates_failed_and_empty_calls() -> None:
+    metrics = MetricsRecorder()
+    llms = {
+        "small": FailingLLM(default_responses=["unused"]),
+        "medium": MockLLM(default_responses=[""]),
+        "large": MockLLM(default_responses=["large response"]),
+    }
+    router = RoutingLLM(
+        routes={"researcher": "small"},
+        default_model="large",
+        escalations={"small": "medium", "medium": "large", "large": "small"},
+        llm_factory=llms.__getitem__,
+    )
+    router.metrics = metrics
+
+    response = router.generate("system", "input", agent_name="researcher.extract_scope")
+
+    assert router.model_chain("researcher.extract_scope") == ["small", "medium", "large"]
+    assert response == "large response"
+    assert [len(llm.calls) for llm in llms.values()] == [1, 1, 1]
+    assert metrics.snapshot()["llm_calls"]["researcher.extract_scope"]["calls"] == 3
+
+
+def test_routing_llm_builds_async_llms_for_agenerate(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    router = RoutingLLM()
+    llm = router._llm("gpt-4o-mini")
+    calls: list[str] = []
+
+    async def _agenerate(system_prompt, user_input, tools=None, agent_name=None) -> str:
+        calls.append(agent_name)
+        return "async response"
+
+    monkeypatch.setattr(llm, "agenerate", _agenerate)
+
+    assert isinstance(llm, AsyncLLM)
+    assert asyncio.run(router.agenerate("system", "input", agent_name="devops")) == "async response"
+    assert calls == ["devops"]
@@ -0,0 +1,62 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from src.core.llm_transcript import RecordingLLM
+from src.core.llm_transcript import ReplayLLM
+from src.core.mock_llm import MockLLM
+from src.core.orchestration.orchestrator import Orchestrator
+
+
+def test_recorded_pipeline_replays_offline_with_identical_result(
+    monkeypatch,
+    tmp_path,
+    pipeline_responses: dict[str, list[str]],
+    fake_web_search_service,
+    fake_image_generator_factory,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    transcript_path = tmp_path / "run.jsonl.gz"
+    services = {"web_search_service": fake_web_search_service, "image_generator": fake_image_generator_factory()}
+
+    recording = Orchestrator(llm=RecordingLLM(MockLLM(pipeline_responses), transcript_path), **services)
+    recorded_result = recording.run("Build a cryptocurrency education website")
+
+    replay_llm = ReplayLLM(transcript_path, strict=True)
+    replaying = Orchestrator(llm=replay_llm, **services)
+    replayed_result = replaying.run("Build a cryptocurrency education website")
+
+    with gzip.open(transcript_path, "rt", encoding="utf-8") as transcript_file:
+        records = [json.loads(line) for line in transcript_file]
+    assert replayed_result == recorded_result
+    assert [record["agent_name"] for record in records] == [call["agent_name"] for call in replay_llm.calls]
+    assert all(record["latency_seconds"] >= 0 for record in records)
+
+
+def test_strict_replay_rejects_diverging_prompts(tmp_path) -> None:
+    transcript_path = tmp_path / "run.jsonl"
+    RecordingLLM(MockLLM(["recorded"]), transcript_path).generate("system", "input", agent_name="architect")
+
+    assert ReplayLLM(transcript_path).generate("system", "changed input", agent_name="architect") == "recorded"
+    with pytest.raises(AssertionError, match="differs from the recorded prompts"):
+        ReplayLLM(transcript_path, strict=True).generate("system", "changed input", agent_name="architect")
+
+
+class AsyncMockLLM(MockLLM):
+    async def agenerate(self, system_prompt, user_input, tools=None, agent_name=None) -> str:
+        return self.generate(system_prompt, user_input, tools=tools, agent_name=agent_name)
+
+
+def test_recording_llm_records_agenerate_calls(tmp_path) -> None:
+    transcript_path = tmp_path / "run.jsonl"
+    async_recorder = RecordingLLM(AsyncMockLLM(["async"]), transcript_path)
+    sync_recorder = RecordingLLM(MockLLM(["threaded"]), transcript_path)
+
+    assert asyncio.run(async_recorder.agenerate("system", "input", agent_name="architect")) == "async"
+    assert asyncio.run(sync_recorder.agenerate("system", "input", agent_name="qa")) == "threaded"
+
+    replay = ReplayLLM(transcript_path, strict=True)
+    assert replay.generate("system", "input", agent_name="architect") == "async"
+    assert replay.generate("system", "input", agent_name="qa") == "threaded"
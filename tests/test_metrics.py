@@ -0,0 +1,87 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.base_agent import BaseAgent
+from src.core.llm import LLM
+from src.core.metrics import MetricsRecorder
+from src.core.mock_llm import MockLLM
+from src.core.orchestration.orchestrator import Orchestrator
+
+
+def test_base_agent_records_calls_retries_and_validation_per_role() -> None:
+    metrics = MetricsRecorder()
+    agent = BaseAgent(
+        role_name="metrics_test",
+        system_prompt="Return structured JSON.",
+        llm=MockLLM(["not json", '{"label": "Header"}'], metrics=metrics),
+        output_schema={"type": "object", "required": ["label"], "properties": {"label": {"type": "string"}}},
+        output_format="json",
+    )
+
+    agent.run("Generate a label")
+
+    stats = metrics.snapshot()["llm_calls"]["metrics_test"]
+    assert (stats["calls"], stats["json_retries"], stats["validations"]) == (2, 1, 2)
+    assert 'agentic_json_retries_total{agent="metrics_test"} 1' in metrics.to_prometheus()
+
+
+def test_llm_records_response_usage_tokens(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    metrics = MetricsRecorder()
+    llm = LLM(metrics=metrics)
+    usage = SimpleNamespace(
+        input_tokens=120,
+        output_tokens=30,
+        input_tokens_details=SimpleNamespace(cached_tokens=90),
+    )
+    response = SimpleNamespace(output_text="ok", usage=usage)
+    monkeypatch.setattr(llm.client.responses, "create", lambda **_: response)
+
+    llm.generate("system", "user", agent_name="researcher.extract_scope")
+
+    stats = metrics.snapshot()["llm_calls"]["researcher.extract_scope"]
+    assert (stats["input_tokens"], stats["output_tokens"]) == (120, 30)
+    assert (stats["cached_input_tokens"], stats["cached_token_ratio"]) == (90, 0.75)
+    assert metrics.snapshot()["totals"]["cached_token_ratio"] == 0.75
+    assert llm.token_usage == {"input_tokens": 120, "output_tokens": 30}
+
+
+def test_orchestrator_exports_stage_and_agent_metrics(
+    monkeypatch,
+    tmp_path,
+    pipeline_responses: dict[str, list[str]],
+    fake_web_search_service,
+    fake_image_generator_factory,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    orchestrator = Orchestrator(
+        llm=MockLLM(pipeline_responses),
+        metrics_path=tmp_path / "metrics.json",
+        web_search_service=fake_web_search_service,
+        image_generator=fake_image_generator_factory(),
+    )
+
+    orchestrator.run("Build a cryptocurrency education website")
+
+    exported = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    assert {"researcher.extract_scope", "developer", "devops"} <= set(exported["llm_calls"])
+    assert {"ResearcherAgent", "QAAgent", "PersistGeneratedFiles"} <= set(exported["stage_seconds"])
+    assert set(exported["stage_cpu_seconds"]) == set(exported["stage_seconds"])
+    assert exported["totals"]["calls"] == sum(stats["calls"] for stats in exported["llm_calls"].values())
+    assert {"DeveloperAgent", "QAAgent", "DevOpsAgent"} <= set(exported["payload_tokens"])
+
+
+def test_orchestrators_sharing_an_llm_do_not_take_over_its_recorder(
+    fake_web_search_service,
+    fake_image_generator_factory,
+) -> None:
+    metrics = MetricsRecorder()
+    llm = MockLLM([], metrics=metrics)
+    services = {"web_search_service": fake_web_search_service, "image_generator": fake_image_generator_factory()}
+
+    assert Orchestrator(llm=llm, **services).metrics is metrics
+    with pytest.raises(ValueError, match="already has a different metrics"):
+        Orchestrator(llm=llm, metrics=MetricsRecorder(), **services)
+    assert llm.metrics is metrics
@@ -0,0 +1,46 @@
+import pytest
+from openai import OpenAI
+
+from src.core import openai_client
+from src.core.image_generator import ImageGenerator
+from src.core.llm import LLM
+from src.core.openai_client import shared_openai_client
+from src.core.web_search import WebSearchService
+
+
+def test_services_share_one_pooled_client_per_api_key(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "shared-key")
+    http_clients = []
+    build_http_client = openai_client.build_http_client
+
+    def _counting_build_http_client():
+        http_clients.append(build_http_client())
+        return http_clients[-1]
+
+    monkeypatch.setattr(openai_client, "build_http_client", _counting_build_http_client)
+
+    client = shared_openai_client()
+
+    assert LLM().client is client
+    assert WebSearchService().client is client
+    assert ImageGenerator().client is client
+    assert len(http_clients) == 1
+
+    monkeypatch.setenv("OPENAI_API_KEY", "other-key")
+    assert shared_openai_client() is not client
+
+
+def test_services_accept_an_explicit_client(monkeypatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    client = OpenAI(api_key="explicit-key")
+
+    assert LLM(client=client).client is client
+    assert WebSearchService(client=client).client is client
+    with pytest.raises(ValueError, match="OPENAI_API_KEY is not set"):
+        ImageGenerator()
+
+
+def test_http2_is_enabled_only_when_h2_is_installed(monkeypatch) -> None:
+    monkeypatch.setattr(openai_client.importlib.util, "find_spec", lambda name: None)
+    assert openai_client.http2_available() is False
+    openai_client.build_http_client().close()
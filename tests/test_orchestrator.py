@@ -1,55 +1,258 @@
+import asyncio
+import json
+import threading
+import time
+
+from src.core.orchestration.artifacts import JSONArtifact
 from src.core.orchestration.orchestrator import Orchestrator
+from src.core.orchestration.orchestrator import _PipelineArtifacts
+from src.core.orchestration.workspace import RunWorkspace
 from src.core.mock_llm import MockLLM
 
 
 def test_orchestrator_runs_full_pipeline_with_mocked_dependencies(
     monkeypatch,
     tmp_path,
-    product_requirements_output: str,
-    research_scope_output: str,
-    strategic_queries_output: str,
-    knowledge_queries_output: str,
-    research_output_json: str,
-    site_structure_json: str,
-    architecture_spec_json: str,
-    design_spec_json: str,
-    development_tasks_json: str,
-    generated_files_json: str,
-    qa_approved_feedback: str,
-    devops_output: str,
+    pipeline_responses: dict[str, list[str]],
     fake_web_search_service,
     fake_image_generator_factory,
 ) -> None:
-    llm = MockLLM(
-        {
-            "product_manager": [product_requirements_output],
-            "researcher.extract_scope": [research_scope_output],
-            "researcher.strategic_queries": [strategic_queries_output],
-            "researcher.knowledge_queries": [knowledge_queries_output],
-            "researcher": [research_output_json],
-            "content_designer": [site_structure_json],
-            "architect": [architecture_spec_json],
-            "designer": [design_spec_json],
-            "planner": [development_tasks_json],
-            "developer": [generated_files_json],
-            "qa": [qa_approved_feedback],
-            "devops": [devops_output],
-        }
+    monkeypatch.chdir(tmp_path)
+    orchestrator = Orchestrator(
+        llm=MockLLM(pipeline_responses),
+        web_search_service=fake_web_search_service,
+        image_generator=fake_image_generator_factory(),
     )
 
+    result = orchestrator.run("Build a cryptocurrency education website")
+
+    assert "Deployment instructions" in result
+    assert (tmp_path / "output" / "workspace" / "index.html").exists()
+    assert (tmp_path / "output" / "workspace" / "assets" / "images" / "hero.png").exists()
+    assert not list((tmp_path / "output" / ".staging").iterdir())
+    assert fake_web_search_service.queries
+    assert fake_image_generator_factory.instances[0].prompts
+
+
+class _FlakyImageGenerator:
+    def __init__(self) -> None:
+        self.attempts: dict[str, int] = {}
+
+    def generate_image(self, prompt: str) -> bytes:
+        self.attempts[prompt] = self.attempts.get(prompt, 0) + 1
+        if "blockchain" in prompt and self.attempts[prompt] == 1:
+            raise RuntimeError("transient image failure")
+        if "adoption" in prompt:
+            raise RuntimeError("permanent image failure")
+        return prompt.encode("utf-8")
+
+
+def test_generate_design_images_retries_and_skips_failed_images(
+    monkeypatch,
+    tmp_path,
+    design_spec_json: str,
+    fake_image_generator_factory,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
     monkeypatch.setattr(
         "src.core.orchestration.orchestrator.ImageGenerator",
         fake_image_generator_factory,
     )
-    monkeypatch.chdir(tmp_path)
+    orchestrator = Orchestrator(llm=MockLLM([]), image_concurrency=3, image_retries=1)
+    orchestrator.image_generator = _FlakyImageGenerator()
+
+    image_paths = orchestrator._generate_design_images(design_spec_json, tmp_path / "workspace")
+
+    images_dir = tmp_path / "workspace" / "assets" / "images"
+    assert [path.name for path in image_paths] == ["hero.png", "blockchain.png"]
+    assert (images_dir / "blockchain.png").read_bytes().startswith(b"Diagram-style")
+    assert not (images_dir / "adoption.png").exists()
+    assert not list(images_dir.glob("*.partial"))
+
 
+class _SlowImageGenerator:
+    def __init__(self) -> None:
+        self.finished = threading.Event()
+
+    def generate_image(self, prompt: str) -> bytes:
+        time.sleep(0.2)
+        self.finished.set()
+        return prompt.encode("utf-8")
+
+
+def test_timed_out_image_is_not_written_after_its_warning(
+    monkeypatch,
+    tmp_path,
+    design_spec_json: str,
+    fake_image_generator_factory,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        "src.core.orchestration.orchestrator.ImageGenerator",
+        fake_image_generator_factory,
+    )
+    orchestrator = Orchestrator(llm=MockLLM([]), image_timeout=0.05)
+    generator = orchestrator.image_generator = _SlowImageGenerator()
+
+    image_paths = orchestrator._generate_design_images(design_spec_json, tmp_path / "workspace")
+    generator.finished.wait(timeout=5)
+    time.sleep(0.1)
+
+    images_dir = tmp_path / "workspace" / "assets" / "images"
+    assert image_paths == []
+    assert not list(images_dir.iterdir())
+
+
+def test_orchestrator_arun_runs_full_pipeline_on_event_loop(
+    monkeypatch,
+    tmp_path,
+    pipeline_responses: dict[str, list[str]],
+    fake_web_search_service,
+    fake_image_generator_factory,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        "src.core.orchestration.orchestrator.ImageGenerator",
+        fake_image_generator_factory,
+    )
+    monkeypatch.chdir(tmp_path)
+    llm = MockLLM(pipeline_responses)
     orchestrator = Orchestrator(llm=llm)
     orchestrator.researcher.web_search_service = fake_web_search_service
 
+    result = asyncio.run(orchestrator.arun("Build a cryptocurrency education website"))
+
+    assert "Deployment instructions" in result
+    assert (tmp_path / "output" / "workspace" / "index.html").exists()
+    assert len(fake_web_search_service.queries) == 10
+    assert [call["agent_name"] for call in llm.calls][-1] == "devops"
+
+
+def test_qa_revision_loop_applies_patch_with_only_changed_files(
+    monkeypatch,
+    site_structure_json: str,
+    generated_files_json: str,
+    qa_approved_feedback: str,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    complete_files = json.loads(generated_files_json)["files"]
+    missing_point = "<li>The network launched in January 2009.</li>"
+    initial_files = dict(complete_files, **{"index.html": complete_files["index.html"].replace(missing_point, "")})
+    llm = MockLLM(
+        {
+            "qa": ["- Missing content.\nNEEDS_CHANGES", qa_approved_feedback],
+            "developer.revise": [json.dumps({"files": {"index.html": complete_files["index.html"]}})],
+        }
+    )
+    orchestrator = Orchestrator(llm=llm)
+    artifacts = _PipelineArtifacts(
+        site_structure=JSONArtifact(json.loads(site_structure_json)),
+        generated_files=JSONArtifact({"files": initial_files}),
+    )
+
+    generated_files, qa_feedback = orchestrator._run_qa_revision_loop(artifacts)
+
+    assert qa_feedback.endswith("APPROVED")
+    assert generated_files.value == {"files": complete_files}
+    assert [call["agent_name"] for call in llm.calls] == ["qa", "developer.revise", "qa"]
+
+
+def test_persist_publishes_only_the_final_generated_files(
+    monkeypatch,
+    tmp_path,
+    generated_files_json: str,
+    fake_web_search_service,
+    fake_image_generator_factory,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    orchestrator = Orchestrator(
+        llm=MockLLM({}),
+        web_search_service=fake_web_search_service,
+        image_generator=fake_image_generator_factory(),
+    )
+    staged = RunWorkspace(tmp_path).begin("run-1")
+    orchestrator._write_streamed_file(staged.site_dir, "pages/draft.html", "<p>dropped by the final output</p>")
+    image_path = staged.site_dir / "assets" / "images" / "hero.png"
+    image_path.parent.mkdir(parents=True)
+    image_path.write_bytes(b"image")
+    artifacts = _PipelineArtifacts(
+        generated_files=JSONArtifact(json.loads(generated_files_json)),
+        generated_image_paths=[image_path],
+    )
+
+    assert orchestrator._run_persist_stage(artifacts, staged) is None
+
+    site_dir = tmp_path / "workspace"
+    published = sorted(str(path.relative_to(site_dir)) for path in site_dir.rglob("*") if path.is_file())
+    assert published == sorted([*json.loads(generated_files_json)["files"], "assets/images/hero.png"])
+    assert not (site_dir / "pages").exists()
+
+
+def test_deterministic_qa_matches_normalized_content_once_per_document(
+    site_structure_json: str,
+    generated_files_json: str,
+) -> None:
+    files = json.loads(generated_files_json)["files"]
+    files["index.html"] = files["index.html"].replace("published in 2008.", "PUBLISHED   in 2008!")
+    documents = Orchestrator._extract_html_documents(files)
+
+    feedback, has_failures = Orchestrator._build_deterministic_qa_feedback(
+        site_structure=JSONArtifact(json.loads(site_structure_json)),
+        generated_files=JSONArtifact({"files": files}),
+    )
+
+    assert not has_failures, feedback
+    assert documents["index.html"].normalized_title == "crypto explained"
+    assert "the bitcoin white paper was published in 2008" in documents["index.html"].normalized_text
+
+
+def test_speculative_design_keeps_the_design_when_the_architecture_is_compatible(
+    monkeypatch,
+    tmp_path,
+    pipeline_responses: dict[str, list[str]],
+    fake_web_search_service,
+    fake_image_generator_factory,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    llm = MockLLM(pipeline_responses)
+    orchestrator = Orchestrator(
+        llm=llm,
+        speculative_design=True,
+        web_search_service=fake_web_search_service,
+        image_generator=fake_image_generator_factory(),
+    )
+
     result = orchestrator.run("Build a cryptocurrency education website")
 
     assert "Deployment instructions" in result
-    assert (tmp_path / "workspace" / "index.html").exists()
-    assert (tmp_path / "workspace" / "assets" / "images" / "hero.png").exists()
-    assert fake_web_search_service.queries
-    assert fake_image_generator_factory.instances[0].prompts
+    designer_calls = [call for call in llm.calls if call["agent_name"] == "designer"]
+    assert len(designer_calls) == 1
+    assert "provisional_architecture_spec" in designer_calls[0]["user_input"]
+
+
+def test_speculative_design_reruns_the_designer_when_the_architecture_conflicts(
+    architecture_spec_json: str,
+    design_spec_json: str,
+    fake_web_search_service,
+    fake_image_generator_factory,
+) -> None:
+    architecture = json.loads(architecture_spec_json)
+    architecture["architecture_spec"]["asset_structure"][-1]["files"].append("team.png")
+    llm = MockLLM({"designer": [design_spec_json]})
+    orchestrator = Orchestrator(
+        llm=llm,
+        speculative_design=True,
+        web_search_service=fake_web_search_service,
+        image_generator=fake_image_generator_factory(),
+    )
+    artifacts = _PipelineArtifacts(
+        architecture_spec=JSONArtifact(architecture),
+        speculative_design_spec=JSONArtifact(json.loads(design_spec_json)),
+    )
+
+    error = orchestrator._run_design_reconcile_stage(artifacts, staged=None)
+
+    assert error is None
+    assert [call["agent_name"] for call in llm.calls] == ["designer"]
+    assert '"architecture_spec"' in llm.calls[0]["user_input"]
+    assert artifacts.design_spec is not artifacts.speculative_design_spec
@@ -0,0 +1,42 @@
+import json
+
+from src.core.orchestration.payloads import PayloadEncoder
+
+
+def test_encoder_puts_stable_artifacts_first_in_canonical_order() -> None:
+    payload = PayloadEncoder().encode(
+        {
+            "qa_feedback": "Fix the footer.",
+            "generated_files": {"files": {"index.html": "<html></html>"}},
+            "site_structure": {"site_structure": {"pages": []}},
+            "architecture_spec": {"architecture_spec": {}},
+        }
+    )
+
+    assert list(json.loads(payload)) == ["site_structure", "architecture_spec", "generated_files", "qa_feedback"]
+
+
+def test_repeated_calls_share_a_byte_identical_prefix() -> None:
+    encoder = PayloadEncoder()
+    stable = {"architecture_spec": {"architecture_spec": {"css_strategy": "One file."}}}
+    first = encoder.encode({"qa_feedback": "Fix the footer.", **stable})
+    second = encoder.encode({**stable, "qa_feedback": "Fix the header and the navigation."})
+
+    prefix = encoder.encode(stable).removesuffix("}")
+    assert first.startswith(prefix) and second.startswith(prefix)
+
+
+def test_encoder_minifies_sorts_keys_and_prunes_per_stage() -> None:
+    design_spec = {
+        "images": [{"prompt": "A warm bakery storefront", "filename": "hero.png", "alt": "Bakery"}],
+        "design_system": {"spacing_system": {"base_unit": "8px"}},
+    }
+
+    encoded = PayloadEncoder().encode({"design_spec": design_spec, "note": "café"}, "DeveloperAgent")
+
+    assert encoded == (
+        '{"design_spec":{"design_system":{"spacing_system":{"base_unit":"8px"}},'
+        '"images":[{"alt":"Bakery","filename":"hero.png"}]},"note":"café"}'
+    )
+    assert design_spec["images"][0]["prompt"] == "A warm bakery storefront"
+    assert "prompt" in PayloadEncoder().encode({"design_spec": design_spec}, "QAAgent")
@@ -0,0 +1,105 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APITimeoutError
+from openai import InternalServerError
+from openai import RateLimitError
+
+from src.core.llm import LLM
+from src.core.rate_limiter import RateLimiter
+from src.core.rate_limiter import priority_lane
+
+
+def _rate_limit_error(headers: dict[str, str] | None = None) -> RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def test_call_pauses_for_retry_after_then_gives_up_after_max_retries() -> None:
+    limiter = RateLimiter(max_retries=2)
+    attempts: list[float] = []
+
+    def flaky() -> str:
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise _rate_limit_error({"retry-after-ms": "50"})
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert attempts[1] - attempts[0] >= 0.05
+
+    def always_limited() -> str:
+        raise _rate_limit_error()
+
+    with pytest.raises(RateLimitError):
+        RateLimiter(max_retries=1, base_delay=0.01).call(always_limited)
+
+
+def test_call_retries_server_errors_and_timeouts_without_pausing_other_callers() -> None:
+    limiter = RateLimiter(max_retries=2, base_delay=0.01)
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    errors = [
+        InternalServerError("Bad gateway", response=httpx.Response(502, request=request), body=None),
+        APITimeoutError(request=request),
+    ]
+
+    def flaky() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert limiter._paused_until == 0.0
+    assert limiter._rate_scale == 1.0
+
+    def always_timing_out() -> str:
+        raise APITimeoutError(request=request)
+
+    with pytest.raises(APITimeoutError):
+        RateLimiter(max_retries=1, base_delay=0.01).call(always_timing_out)
+
+
+def test_interactive_lane_is_admitted_before_waiting_batch_calls() -> None:
+    limiter = RateLimiter(requests_per_minute=600)
+    for _ in range(600):
+        limiter.acquire()
+    admitted: list[str] = []
+
+    def _acquire_in(lane: str) -> None:
+        with priority_lane(lane):
+            limiter.acquire()
+        admitted.append(lane)
+
+    batch = threading.Thread(target=_acquire_in, args=("batch",))
+    batch.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=_acquire_in, args=("interactive",))
+    interactive.start()
+    batch.join(timeout=2)
+    interactive.join(timeout=2)
+
+    assert admitted == ["interactive", "batch"]
+
+
+def test_llm_retries_rate_limited_requests_through_the_limiter(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    limiter = RateLimiter(tokens_per_minute=10_000, base_delay=0.01)
+    llm = LLM(rate_limiter=limiter)
+    usage = SimpleNamespace(input_tokens=900, output_tokens=100)
+    responses = [_rate_limit_error(), SimpleNamespace(output_text="done", usage=usage)]
+
+    def _create(**_: object) -> object:
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(llm.client.responses, "create", _create)
+
+    assert llm.generate("system", "user input", agent_name="architect") == "done"
+    assert llm.client.max_retries == 0
+    assert limiter._available_tokens < 10_000 - 900
@@ -1,4 +1,5 @@
 import json
+import time
 
 from src.agents.researcher import ResearcherAgent
 from src.core.mock_llm import MockLLM
@@ -31,3 +32,46 @@ def test_researcher_returns_valid_research_output(
     assert parsed["knowledge_base"]["topics"]
     assert parsed["strategic_insights"]["competitor_patterns"][0]["platform"]
     assert len(fake_web_search_service.queries) == 10
+
+
+class _SlowFlakyWebSearchService:
+    def __init__(self, failing_query: str) -> None:
+        self.failing_query = failing_query
+
+    def search(self, query: str) -> str:
+        # Earlier queries finish last so completion order differs from dispatch order.
+        time.sleep(0.05 if "overview" in query or "top " in query else 0)
+        if query == self.failing_query:
+            raise RuntimeError("search backend unavailable")
+        return f"Result for {query}"
+
+
+def test_researcher_keeps_query_order_and_partial_results_when_a_search_fails(
+    product_requirements_output: str,
+    research_scope_output: str,
+    strategic_queries_output: str,
+    knowledge_queries_output: str,
+    research_output_json: str,
+) -> None:
+    llm = MockLLM(
+        [
+            research_scope_output,
+            strategic_queries_output,
+            knowledge_queries_output,
+            research_output_json,
+        ]
+    )
+    failing_query = strategic_queries_output.splitlines()[1]
+    agent = ResearcherAgent(llm=llm, web_search_service=_SlowFlakyWebSearchService(failing_query))
+
+    agent.run(product_requirements_output)
+
+    dossier = str(llm.calls[-1]["user_input"])
+    expected_queries = [
+        query
+        for query in strategic_queries_output.splitlines() + knowledge_queries_output.splitlines()
+        if query != failing_query
+    ]
+    positions = [dossier.index(f"Result for {query}") for query in expected_queries]
+    assert positions == sorted(positions)
+    assert f"Result for {failing_query}" not in dossier
@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 from src.core.base_agent import BaseAgent
@@ -122,3 +123,53 @@ def test_sanitize_llm_output_removes_trailing_commas() -> None:
     cleaned = sanitize_llm_output('{"label": "Header",}')
 
     assert json.loads(cleaned) == {"label": "Header"}
+
+
+class _AsyncOnlyLLM:
+    def __init__(self, responses: list[str]) -> None:
+        self.responses = responses
+        self.calls: list[str] = []
+
+    def generate(self, **kwargs: object) -> str:
+        raise AssertionError("arun must use agenerate when the LLM provides it")
+
+    async def agenerate(self, system_prompt: str, user_input: str, tools=None, agent_name=None) -> str:
+        self.calls.append(user_input)
+        return self.responses.pop(0)
+
+
+def test_safe_output_layer_arun_retries_once_after_validation_failure() -> None:
+    schema = {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["label"],
+        "properties": {"label": {"type": "string"}},
+    }
+    llm = _AsyncOnlyLLM(['{"unexpected": "value"}', '```json\n{"label": "Recovered"}\n```'])
+    agent = BaseAgent(
+        role_name="safe_output_test",
+        system_prompt="Return structured JSON.",
+        llm=llm,
+        output_schema=schema,
+        output_format="json",
+    )
+
+    result = asyncio.run(agent.arun("Generate a label"))
+
+    assert json.loads(result) == {"label": "Recovered"}
+    assert len(llm.calls) == 2
+    assert "failed schema validation" in llm.calls[1].lower()
+
+
+def test_safe_output_layer_arun_falls_back_to_sync_llm() -> None:
+    schema = {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["label"],
+        "properties": {"label": {"type": "string"}},
+    }
+    agent = _build_json_agent(schema, ['{"label": "Header"}'])
+
+    result = asyncio.run(agent.arun("Generate a label"))
+
+    assert json.loads(result) == {"label": "Header"}
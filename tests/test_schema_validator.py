@@ -0,0 +1,24 @@
+import pytest
+
+from src.core.schema_validator import SchemaValidationError
+from src.core.schema_validator import _compiled_validator
+from src.core.schema_validator import validate_schema
+from src.core.schemas import GENERATED_FILES_SCHEMA
+
+
+def test_compiled_validator_is_reused_for_the_same_schema() -> None:
+    assert _compiled_validator(GENERATED_FILES_SCHEMA) is _compiled_validator(GENERATED_FILES_SCHEMA)
+    assert _compiled_validator({"type": "string"}) is not _compiled_validator({"type": "integer"})
+
+
+def test_validate_schema_reports_the_first_error_by_path() -> None:
+    schema = {
+        "type": "object",
+        "properties": {
+            "a": {"type": "string"},
+            "b": {"type": "array", "items": {"type": "integer"}},
+        },
+    }
+
+    with pytest.raises(SchemaValidationError, match=r"failed at a: 1 is not of type 'string'"):
+        validate_schema({"b": ["x", "y"], "a": 1}, schema)
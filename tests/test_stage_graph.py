@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from src.core.orchestration.stage_graph import PipelineStage
+from src.core.orchestration.stage_graph import StageGraph
+
+
+def test_stage_graph_runs_independent_stages_concurrently() -> None:
+    barrier = threading.Barrier(2, timeout=2)
+    order: list[str] = []
+
+    def _parallel(name: str) -> str | None:
+        barrier.wait()
+        order.append(name)
+        return None
+
+    graph = StageGraph(
+        [
+            PipelineStage("design", ("site",), ("design_spec",), lambda: order.append("design")),
+            PipelineStage("planner", ("design_spec",), ("tasks",), lambda: _parallel("planner")),
+            PipelineStage("images", ("design_spec",), ("images",), lambda: _parallel("images")),
+            PipelineStage("persist", ("tasks", "images"), ("written",), lambda: order.append("persist")),
+        ],
+        initial_artifacts=("site",),
+    )
+
+    assert graph.run(max_workers=2) is None
+    assert order[0] == "design"
+    assert sorted(order[1:3]) == ["images", "planner"]
+    assert order[3] == "persist"
+
+
+def test_stage_graph_fails_fast_and_skips_dependent_stages() -> None:
+    ran: list[str] = []
+    graph = StageGraph(
+        [
+            PipelineStage("architect", (), ("architecture_spec",), lambda: "ERROR: architect failed"),
+            PipelineStage("designer", ("architecture_spec",), ("design_spec",), lambda: ran.append("designer")),
+        ]
+    )
+
+    assert graph.run(max_workers=2) == "ERROR: architect failed"
+    assert ran == []
+
+
+def test_stage_graph_rejects_stages_with_unproducible_inputs() -> None:
+    with pytest.raises(ValueError, match="designer"):
+        StageGraph([PipelineStage("designer", ("architecture_spec",), ("design_spec",), lambda: None)])
@@ -0,0 +1,77 @@
+import json
+
+from src.core.metrics import MetricsRecorder
+from src.core.mock_llm import MockLLM
+from src.core.orchestration.artifacts import JSONArtifact
+from src.core.orchestration.orchestrator import Orchestrator
+from src.core.token_budget import TokenBudget
+from src.core.token_budget import summarize_search_results
+from src.core.token_budget import truncate_log
+from tests.conftest import FakeWebSearchService
+
+
+def test_budget_looks_up_agent_limits_and_warns_before_oversized_calls() -> None:
+    metrics = MetricsRecorder()
+    budget = TokenBudget(max_input_tokens=1_000, agent_limits={"researcher": 50, "researcher.extract_scope": 500})
+    llm = MockLLM(["ok", "ok"], metrics=metrics, token_budget=budget)
+
+    llm.generate("system", "scope " * 100, agent_name="researcher.extract_scope")
+    llm.generate("system", "query " * 100, agent_name="researcher.strategic_queries")
+
+    assert budget.limit_for("researcher.extract_scope") == 500
+    assert budget.limit_for("researcher.strategic_queries") == 50
+    assert budget.limit_for("qa") == 1_000
+    warnings = {name: stats["budget_warnings"] for name, stats in metrics.snapshot()["llm_calls"].items()}
+    assert warnings == {"researcher.extract_scope": 0, "researcher.strategic_queries": 1}
+
+
+def test_trimming_policies_keep_queries_urls_and_log_edges() -> None:
+    results = "\n\n".join(
+        f"Query: bakery trends {index}\n"
+        f"Title: Result {index}\nURL: https://example.com/{index}\n"
+        f"Short summary: First sentence {index}. " + "Padding sentence. " * 40
+        for index in range(3)
+    )
+    log = "\n".join(f"line {index}" for index in range(500))
+
+    summarized = summarize_search_results(results, max_tokens=120)
+    truncated = truncate_log(log, max_tokens=40)
+
+    assert summarized.count("Query: bakery trends") == 3
+    assert "URL: https://example.com/2" in summarized and "Padding" not in summarized
+    assert truncated.startswith("line 0\n") and truncated.endswith("line 499")
+    assert "characters truncated" in truncated
+
+
+def test_orchestrator_omits_unmentioned_files_only_where_feedback_covers_them(fake_image_generator_factory) -> None:
+    budget = TokenBudget(agent_limits={"developer": 1_000, "qa": 1_000})
+    orchestrator = Orchestrator(
+        llm=MockLLM([]),
+        web_search_service=FakeWebSearchService(),
+        image_generator=fake_image_generator_factory(),
+        token_budget=budget,
+    )
+    files = {path: "<p>content</p>" * 500 for path in ("index.html", "about.html", "contact.html")}
+    generated_files = JSONArtifact({"files": files})
+
+    revision = json.loads(
+        orchestrator._artifact_payload(
+            "DeveloperAgentRevision",
+            orchestrator.developer.reviser,
+            generated_files=generated_files,
+            qa_feedback="about.html is missing a heading.",
+        )
+    )
+    qa = json.loads(
+        orchestrator._artifact_payload(
+            "QAAgent",
+            orchestrator.qa,
+            generated_files=generated_files,
+            deterministic_validation="about.html is missing a heading.",
+        )
+    )
+
+    assert list(revision["generated_files"]["files"]) == ["about.html"]
+    assert revision["generated_files"]["omitted_files"] == ["contact.html", "index.html"]
+    assert len(qa["generated_files"]["files"]) == 3
+    assert len(files) == 3
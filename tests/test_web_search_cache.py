@@ -0,0 +1,59 @@
+import threading
+import time
+
+from src.core.concurrency import run_concurrently
+from src.core.web_search_cache import CachingWebSearchService
+from src.core.web_search_cache import normalize_query
+from tests.conftest import FakeWebSearchService
+
+
+class BlockingWebSearchService(FakeWebSearchService):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def search(self, query: str) -> str:
+        self.release.wait(timeout=5)
+        return super().search(query)
+
+
+def test_caching_web_search_serves_normalized_queries_from_disk(tmp_path) -> None:
+    inner = FakeWebSearchService()
+    cache_path = tmp_path / "search.sqlite3"
+    service = CachingWebSearchService(inner, cache_path=cache_path)
+
+    first = service.search("Best bakery websites?")
+    second = service.search("  best   BAKERY websites ")
+    reloaded = CachingWebSearchService(FakeWebSearchService(), cache_path=cache_path).search("best bakery websites")
+
+    assert normalize_query("Best bakery websites?") == "best bakery websites"
+    assert first == second == reloaded
+    assert inner.queries == ["Best bakery websites?"]
+    assert service.stats() == {"hits": 1, "misses": 1, "deduplicated": 0}
+
+
+def test_normalize_query_keeps_punctuation_that_changes_the_search(tmp_path) -> None:
+    queries = ["C++ tutorials", "C# tutorials", "C tutorials", "bakery site:example.com", "bakery -bread"]
+    service = CachingWebSearchService(FakeWebSearchService(), cache_path=tmp_path / "search.sqlite3")
+
+    assert normalize_query("bakery site:example.com") == "bakery site:example.com"
+    assert normalize_query("Bakery  -Bread ?") == "bakery -bread"
+    assert len({service.cache_key(query) for query in queries}) == len(queries)
+
+
+def test_caching_web_search_deduplicates_in_flight_queries(tmp_path) -> None:
+    inner = BlockingWebSearchService()
+    service = CachingWebSearchService(inner, cache_path=tmp_path / "search.sqlite3")
+
+    def release_when_all_waiting() -> None:
+        while service.stats()["deduplicated"] < 3:
+            time.sleep(0.01)
+        inner.release.set()
+
+    threading.Thread(target=release_when_all_waiting, daemon=True).start()
+    outcomes = run_concurrently(service.search, ["bakery trends"] * 4, max_workers=4)
+
+    assert all(outcome.ok for outcome in outcomes)
+    assert len({outcome.value for outcome in outcomes}) == 1
+    assert inner.queries == ["bakery trends"]
+    assert service.stats() == {"hits": 0, "misses": 1, "deduplicated": 3}
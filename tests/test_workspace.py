@@ -0,0 +1,98 @@
+import pytest
+
+from src.core.orchestration.workspace import RunWorkspace
+
+
+def test_publish_replaces_previous_site_atomically(tmp_path) -> None:
+    workspace = RunWorkspace(tmp_path)
+    with workspace.begin("run-0") as staged:
+        (staged.site_dir / "stale.html").write_text("old", encoding="utf-8")
+        staged.publish()
+
+    with workspace.begin("run-1") as staged:
+        (staged.site_dir / "index.html").write_text("new", encoding="utf-8")
+        (staged.docker_dir / "Dockerfile").write_text("FROM nginx", encoding="utf-8")
+        staged.publish()
+
+    assert (tmp_path / "workspace" / "index.html").read_text(encoding="utf-8") == "new"
+    assert not (tmp_path / "workspace" / "stale.html").exists()
+    assert staged.published_path(staged.docker_dir / "Dockerfile") == tmp_path / "docker" / "Dockerfile"
+    assert (tmp_path / "workspace").is_symlink()
+    assert (tmp_path / ".current").resolve().name in [path.name for path in (tmp_path / ".releases").iterdir()]
+    assert not list((tmp_path / ".staging").iterdir())
+
+
+def test_publish_refuses_to_replace_real_workspace_and_docker_directories(tmp_path) -> None:
+    (tmp_path / "workspace").mkdir()
+    (tmp_path / "workspace" / "index.html").write_text("tracked", encoding="utf-8")
+    (tmp_path / "docker").mkdir()
+    workspace = RunWorkspace(tmp_path)
+
+    with pytest.raises(FileExistsError, match="is a real directory"):
+        workspace.begin("run-1")
+
+    (tmp_path / "workspace").rename(tmp_path / "sample-site")
+    (tmp_path / "docker").rmdir()
+    staged = workspace.begin("run-1")
+    (tmp_path / "workspace").mkdir()
+    (tmp_path / "workspace" / "index.html").write_text("created meanwhile", encoding="utf-8")
+    with pytest.raises(FileExistsError, match="workspace is a real directory"):
+        staged.publish()
+
+    assert (tmp_path / "workspace" / "index.html").read_text(encoding="utf-8") == "created meanwhile"
+    assert (tmp_path / "sample-site" / "index.html").read_text(encoding="utf-8") == "tracked"
+    assert staged.site_dir.is_dir()
+    assert not (tmp_path / ".releases").exists()
+
+
+def test_interleaved_publishes_into_one_root_switch_site_and_docker_together(tmp_path) -> None:
+    workspace = RunWorkspace(tmp_path)
+    first, second = workspace.begin("run-1"), workspace.begin("run-2")
+    for staged in (first, second):
+        (staged.site_dir / "index.html").write_text(staged.run_key, encoding="utf-8")
+        (staged.docker_dir / "Dockerfile").write_text(staged.run_key, encoding="utf-8")
+
+    second.publish()
+    first.publish()
+
+    assert (tmp_path / "workspace" / "index.html").read_text(encoding="utf-8") == "run-1"
+    assert (tmp_path / "docker" / "Dockerfile").read_text(encoding="utf-8") == "run-1"
+    assert len(list((tmp_path / ".releases").iterdir())) == 2
+
+
+def test_resume_seeds_staging_only_from_its_own_release(tmp_path) -> None:
+    workspace = RunWorkspace(tmp_path)
+    for run_key in ("run-1", "run-2"):
+        with workspace.begin(run_key) as staged:
+            (staged.site_dir / "index.html").write_text(run_key, encoding="utf-8")
+            staged.publish()
+
+    resumed = workspace.begin("run-1", seed_from_published=True)
+    fresh = workspace.begin("run-3", seed_from_published=True)
+
+    assert (resumed.site_dir / "index.html").read_text(encoding="utf-8") == "run-1"
+    assert not (fresh.site_dir / "index.html").exists()
+
+
+@pytest.mark.parametrize(("cleanup", "kept"), [("keep_failed", True), ("always", False)])
+def test_failed_run_leaves_published_site_and_applies_cleanup_policy(tmp_path, cleanup: str, kept: bool) -> None:
+    workspace = RunWorkspace(tmp_path, cleanup=cleanup)
+
+    with workspace.begin("run-1") as staged:
+        (staged.site_dir / "index.html").write_text("partial", encoding="utf-8")
+        staged.failed = True
+
+    assert not (tmp_path / "workspace").exists()
+    assert staged.staging_dir.exists() is kept
+
+
+def test_per_run_workspaces_keep_only_the_newest_runs(tmp_path) -> None:
+    workspace = RunWorkspace(tmp_path, per_run=True, keep_runs=2)
+
+    for run_key in ("run-1", "run-2", "run-3"):
+        with workspace.begin(run_key) as staged:
+            (staged.site_dir / "index.html").write_text(run_key, encoding="utf-8")
+            staged.publish()
+
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.startswith(".")) == ["run-2", "run-3"]
+    assert (tmp_path / "run-3" / "workspace" / "index.html").read_text(encoding="utf-8") == "run-3"